@@ -115,10 +115,22 @@ os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 from routes import register_routes
 register_routes(app)
 
+# CLI commands (flask --app main resumeai ...)
+from commands import register_commands
+register_commands(app)
+
 # Import models and create tables
 with app.app_context():
     import models
     db.create_all()
+    # create_all() does not add columns to existing tables
+    from utils.schema import upgrade_schema
+    upgrade_schema()
+
+# Retention and quota sweeps of the upload store: started on the first request,
+# run by one process per host (see utils/upload_manager.py)
+from utils.upload_manager import start_upload_sweeper
+start_upload_sweeper(app)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,63 @@
+"""
+Command line maintenance tasks, run through the Flask CLI:
+
+    flask --app main resumeai ingest-jobs postings.csv more_postings.jsonl
+    flask --app main resumeai sweep-uploads
+    flask --app main resumeai upload-stats
+    flask --app main resumeai rebuild-artifacts
+"""
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+resumeai_cli = AppGroup('resumeai', help='ResumeAI maintenance commands.')
+
+
+@resumeai_cli.command('ingest-jobs')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunk-size', default=None, type=int, help='Rows per batch (default JOB_CATALOG_CHUNK_SIZE or 5000).')
+@click.option('--rebuild-index', is_flag=True, help='Re-index the whole catalog afterwards.')
+def ingest_jobs(paths, chunk_size, rebuild_index):
+    """Load job postings from CSV/JSONL files into the searchable job catalog."""
+    from utils.job_catalog import ingest_files, rebuild_search_index, CHUNK_SIZE
+
+    stats = ingest_files(paths, chunk_size=chunk_size or CHUNK_SIZE)
+    click.echo(f"Read {stats['read']} rows: {stats['inserted']} inserted, {stats['skipped']} skipped")
+    if rebuild_index:
+        rebuild_search_index()
+        click.echo('Search index rebuilt')
+
+
+@resumeai_cli.command('sweep-uploads')
+def sweep_uploads_command():
+    """Delete uploads past retention and enforce the global upload quota."""
+    from utils.upload_manager import sweep_uploads
+
+    result = sweep_uploads(current_app.config['UPLOAD_FOLDER'])
+    click.echo(f"Removed {result['expired']} expired, {result['evicted']} evicted and "
+               f"{result['stray']} stray files ({result['freed_bytes']} bytes)")
+
+
+@resumeai_cli.command('upload-stats')
+def upload_stats_command():
+    """Show upload store disk usage and quotas."""
+    from utils.upload_manager import get_upload_stats
+
+    click.echo(json.dumps(get_upload_stats(current_app.config['UPLOAD_FOLDER']), indent=2))
+
+
+@resumeai_cli.command('rebuild-artifacts')
+@click.option('--batch-size', default=100, type=int, help='Resumes per NER batch.')
+@click.option('--processes', default=None, type=int, help='spaCy worker processes (default NER_PROCESSES).')
+def rebuild_artifacts_command(batch_size, processes):
+    """Rebuild missing or outdated resume extraction artifacts."""
+    from utils.extraction_artifact import rebuild_artifacts
+
+    click.echo(f"Rebuilt {rebuild_artifacts(batch_size, processes)} extraction artifacts")
+
+
+def register_commands(app):
+    """Attach the CLI command groups to the app"""
+    app.cli.add_command(resumeai_cli)
@@ -106,6 +106,25 @@ class JobListing(db.Model):
     description = db.Column(db.Text, nullable=False)
     url = db.Column(db.String(500), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Cached search results (see utils/job_listing_store.py)
+    source = db.Column(db.String(20), default='adzuna')
+    source_id = db.Column(db.String(64), nullable=True)
+    country = db.Column(db.String(5), nullable=True)
+    query_key = db.Column(db.String(255), nullable=True, index=True)
+    rank = db.Column(db.Integer, default=0)  # position within the query's results
+    location = db.Column(db.String(200), nullable=True)
+    salary_min = db.Column(db.String(50), nullable=True)
+    salary_max = db.Column(db.String(50), nullable=True)
+    posted_at = db.Column(db.String(50), nullable=True)  # as reported by the source
+    fetched_at = db.Column(db.DateTime, nullable=True, index=True)
+    minhash = db.Column(db.LargeBinary, nullable=True)  # near-duplicate signature (utils/job_dedupe.py)
+    skills = db.Column(db.Text, nullable=True)  # JSON list: skill profile of catalog listings (utils/job_catalog.py)
+
+    __table_args__ = (
+        db.UniqueConstraint('query_key', 'source_id', name='uq_listing_query_source'),
+        db.Index('ix_listing_source_source_id', 'source', 'source_id'),
+    )
     
     def __repr__(self):
         return f'<JobListing {self.title}>'
@@ -118,8 +137,100 @@ class ResumeAnalysis(db.Model):
     ats_score = db.Column(db.Float, nullable=True)
     improvement_suggestions = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
+    # 'pending' while a background task generates improvement_suggestions, then 'done'
+    # ('failed' if it did not finish in time, see utils/ai_suggestions.py)
+    suggestions_status = db.Column(db.String(20), nullable=True)
+    suggestions_requested_at = db.Column(db.DateTime, nullable=True)
+
+    # Background processing fields (see utils/upload_pipeline.py)
+    job_id = db.Column(db.String(36), unique=True, index=True, nullable=True)
+    status = db.Column(db.String(20), default='done')  # queued, done, failed
+    stage_timings = db.Column(db.Text, nullable=True)  # JSON: stage name -> milliseconds
+    analysis_results = db.Column(db.Text, nullable=True)  # JSON payload returned by the upload APIs
+    error_message = db.Column(db.Text, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # StoredUpload.sha256
+    # Sections, entities, skills, contact info and experience (see utils/extraction_artifact.py)
+    extraction_artifact = db.Column(db.Text, nullable=True)  # compact JSON
+    extraction_version = db.Column(db.Integer, nullable=True)
+
     candidate = db.relationship('Candidate', backref=db.backref('analyses', lazy=True))
     
     def __repr__(self):
         return f'<ResumeAnalysis {self.id}>'
+
+class AnalysisSnapshot(db.Model):
+    """Rendered /analyze payload of a ResumeAnalysis and the inputs it was computed from (see utils/analysis_snapshot.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('resume_analysis.id'), unique=True, nullable=False)
+    resume_hash = db.Column(db.String(64), nullable=False)  # resume text, skills and extractor version
+    catalog_version = db.Column(db.String(64), nullable=False)
+    scorer_version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    analysis = db.relationship('ResumeAnalysis', backref=db.backref('snapshot', uselist=False, cascade='all, delete-orphan'))
+
+    def __repr__(self):
+        return f'<AnalysisSnapshot {self.analysis_id}>'
+
+class StoredUpload(db.Model):
+    """Uploaded resume file, stored once per distinct content (see utils/upload_store.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoredUpload {self.sha256[:12]}>'
+
+class UploadStageResult(db.Model):
+    """Cached upload pipeline stage output, keyed by upload content hash"""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    stage = db.Column(db.String(40), nullable=False)  # extract, basic_info, skills, ..., analysis_<mode>
+    version = db.Column(db.Integer, nullable=False, default=1)
+    result = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('sha256', 'stage', name='uq_upload_stage'),
+    )
+
+    def __repr__(self):
+        return f'<UploadStageResult {self.sha256[:12]}:{self.stage}>'
+
+class SkillQuestion(db.Model):
+    """Pooled skill assessment question (see utils/skill_question_bank.py)"""
+    id = db.Column(db.Integer, primary_key=True)
+    skill_key = db.Column(db.String(100), nullable=False, index=True)  # normalized skill name
+    skill_name = db.Column(db.String(100), nullable=False)
+    question = db.Column(db.Text, nullable=False)
+    question_hash = db.Column(db.String(40), nullable=False)
+    options = db.Column(db.Text, nullable=False)  # JSON list of strings
+    answer = db.Column(db.Text, nullable=False)
+    source = db.Column(db.String(20), default='seed')  # seed, curated, ai
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('skill_key', 'question_hash', name='uq_skill_question'),
+    )
+
+    def __repr__(self):
+        return f'<SkillQuestion {self.skill_key}:{self.id}>'
+
+class ServedSkillQuestion(db.Model):
+    """Questions already shown to a user, so tests do not repeat them"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('skill_question.id'), nullable=False)
+    served_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'question_id', name='uq_served_question'),
+    )
+
+    def __repr__(self):
+        return f'<ServedSkillQuestion {self.user_id}:{self.question_id}>'
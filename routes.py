@@ -1,25 +1,28 @@
 import os
 import uuid
 import json
+import time
 import logging
 import re
-import pandas as pd
 from flask import render_template, request, redirect, url_for, flash, jsonify, session
 from werkzeug.utils import secure_filename
 from flask_login import login_user, logout_user, login_required, current_user
 from models import db, User, Candidate, CandidateSkill, JobListing, ResumeAnalysis
 from forms import LoginForm, RegistrationForm
-from utils.resume_analyzer import analyze_resume, extract_basic_info, preprocess_and_segment, extract_entities
+from utils.resume_analyzer import analyze_resume_document, extract_basic_info, preprocess_and_segment, extract_entities
 from utils.ats_scorer import calculate_ats_score
 from utils.job_matcher import find_matching_jobs
-from utils.skills_extractor import extract_skills, generate_skill_test_questions
+from utils.skills_extractor import extract_skills
+from utils.analysis_snapshot import load_snapshot, save_snapshot, snapshot_inputs
+from utils.extraction_artifact import ARTIFACT_VERSION, build_artifact, dump_artifact, get_artifact, section_texts
 # Import OpenAI helper
 from utils.openai_helper import (
     generate_improvement_suggestions,
     analyze_resume_strengths_weaknesses,
     generate_skill_questions,
     generate_cover_letter,
-    create_resume_chatbot_response
+    create_resume_chatbot_response,
+    fallback_improvement_suggestions
 )
 # Import job search tips and resume suggestions generators
 from utils.job_search_tips import generate_unique_job_search_tips
@@ -27,14 +30,34 @@ from utils.resume_suggestions import generate_resume_suggestions
 # Import enhanced Adzuna API
 from utils.adzuna_enhanced import recommend_jobs_from_similarity_scores
 from utils.adzuna_api import search_jobs, calculate_job_match_score
-from utils.advanced_analyzer import (
-    calculate_job_match_scores,
-    calculate_ats_score as advanced_ats_score,
-    get_improvement_suggestions,
-    analyze_resume as advanced_analyze_resume
-)
 # Import maang_ats_scorer 
 from utils.maang_ats_scorer import calculate_resume_ats_score
+# Background runner for deferred LLM work
+from utils.background_tasks import submit_task, get_task
+from utils.skill_question_bank import get_questions_for_user
+from utils.job_catalog import get_candidate_jobs
+from utils.job_title_catalog import get_title_catalog
+from utils.job_recommendations import (
+    get_resume_features,
+    get_recommendation_page,
+    decode_cursor
+)
+# Background upload processing
+from utils.upload_pipeline import (
+    submit_upload_job,
+    complete_from_cache,
+    is_fully_cached,
+    is_queue_full,
+    job_pending,
+    QueueFullError,
+    RETRY_AFTER_SECONDS,
+    MODE_BASIC,
+    MODE_STANDARD,
+    MODE_ENHANCED
+)
+from utils.upload_store import load_stage_results
+from utils.upload_manager import accept_upload, QuotaExceededError
+from utils.ai_suggestions import queue_suggestions, suggestions_pending
 
 # Define allowed file extensions for uploads
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'}
@@ -42,6 +65,300 @@ ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'bmp'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def _compute_resume_analysis(app, analysis, skills):
+    """
+    Match, score and segment a resume for the /analyze page
+
+    Starts the AI suggestions in the background; they are saved on the analysis.
+
+    Returns:
+        dict: template variables, including suggestions_task_id (or None)
+    """
+    # Load job descriptions
+    suggestions_task_id = None
+    matched_keywords = []
+    try:
+        catalog = get_title_catalog()
+        job_titles = list(catalog.titles[:5])  # Just get first 5 for demo
+        job_descriptions = list(catalog.descriptions[:5])  # Just get first 5 for demo
+
+        # Use our new ATS scoring system
+        if job_descriptions:
+            logging.info("Calculating ATS scores with new ATS scoring system...")
+            
+            try:
+                from utils.ats_scorer import calculate_ats_score, calculate_role_specific_ats_scores
+                from utils.job_matcher import find_matching_jobs
+                
+                # Find top matching jobs using our ATS scoring and TF-IDF
+                job_matches = find_matching_jobs(
+                    analysis.resume_text, get_candidate_jobs(analysis.resume_text, skills), skills=skills, top_n=5
+                )
+                
+                # Extract updated job titles and descriptions from matches
+                job_titles = [match[0] for match in job_matches]
+                job_descriptions = [match[2] for match in job_matches]
+                
+                # Log the matched job titles
+                logging.info(f"Top 5 matched jobs based on ATS scoring: {job_titles}")
+                
+                # Use the first match for the primary ATS score
+                if job_matches:
+                    # Get the primary ATS score from the first match
+                    primary_ats_details = job_matches[0][3]
+                    primary_ats_score = primary_ats_details.get('score', 65)
+                    matched_keywords = primary_ats_details.get('matched_keywords', [])
+                    total_keywords = primary_ats_details.get('total', 0)
+                    
+                    logging.info(f"Primary ATS Score: {primary_ats_score}%")
+                    logging.info(f"Matched keywords: {matched_keywords[:10]} ({len(matched_keywords)}/{total_keywords})")
+                    
+                    # Generate improvement suggestions based on matched keywords
+                    missing_keywords = []
+                    job_description_tokens = []
+                    if job_descriptions:
+                        # Extract important keywords from the job description
+                        job_doc = re.findall(r'\b[A-Za-z][A-Za-z0-9\+\#\.]+\b', job_descriptions[0].lower())
+                        job_description_tokens = [token for token in job_doc if len(token) > 3]
+                        
+                    for token in job_description_tokens:
+                        if token not in matched_keywords and token not in missing_keywords:
+                            missing_keywords.append(token)
+                    
+                    # Limit to top 5 missing keywords
+                    missing_keywords = missing_keywords[:5]
+                    
+                    # Basic suggestions shown if the AI suggestions cannot be generated
+                    fallback_suggestions = f"""
+## Resume Suggestions
+
+### Keyword Optimization
+- Add these missing keywords to improve your resume: {', '.join(missing_keywords) if missing_keywords else "Your resume contains many keywords from the job description."}
+- Customize your resume for each application by matching terms from the job listing
+
+### Experience & Impact
+- Use strong action verbs at the beginning of each bullet point
+- Include metrics and quantifiable achievements whenever possible
+- Focus on results rather than just listing responsibilities
+
+### Format & Organization  
+- Ensure your resume uses a clean, ATS-friendly format
+- Use standard section headings that are easily recognized
+- Keep your most relevant experience and skills prominent
+"""
+                    # Generate AI-powered resume suggestions in the background so the
+                    # deterministic scores render without waiting on OpenAI
+                    target_job = job_titles[0] if job_titles else None
+                    suggestions_task_id = queue_suggestions(
+                        app,
+                        analysis,
+                        fallback_suggestions,
+                        generate_resume_suggestions,
+                        analysis.resume_text,
+                        skills=skills,
+                        job_title=target_job
+                    )
+                    improvement_suggestions = None
+                    
+                    # Set the primary ATS score
+                    ats_score = primary_ats_score
+                else:
+                    # Fallback if no job matches available
+                    logging.warning("No job matches available for ATS scoring")
+                    ats_score = 65  # Default score
+                    improvement_suggestions = """
+# Resume Improvement Suggestions
+
+## Skills
+Add more specific skills relevant to your target role.
+
+## Experience
+Include quantifiable achievements in your experience section.
+
+## Formatting
+Ensure your contact information is clearly visible.
+"""
+            except Exception as e:
+                logging.error(f"Error using new ATS scorer: {str(e)}")
+                # Fallback to MAANG ATS scorer
+                try:
+                    from utils.advanced_analyzer import job_specific_ats_score
+                    ats_score, score_breakdown = job_specific_ats_score(
+                        analysis.resume_text,
+                        job_titles[0],  # Use first job title 
+                        skills
+                    )
+                    logging.info(f"MAANG ATS Score: {ats_score}")
+                    logging.info(f"Score breakdown: {score_breakdown}")
+                        
+                    # Generate improvement suggestions in the background
+                    suggestions_task_id = queue_suggestions(
+                        app,
+                        analysis,
+                        fallback_improvement_suggestions(),
+                        generate_improvement_suggestions,
+                        analysis.resume_text,
+                        job_descriptions[0],
+                        skills
+                    )
+                    improvement_suggestions = None
+                except Exception as e2:
+                    logging.error(f"Error using MAANG ATS scorer: {str(e2)}")
+                    ats_score = 65  # Default score
+                    
+                    # Default improvement suggestions
+                    improvement_suggestions = """
+# Resume Improvement Suggestions
+
+## Skills
+Add more specific skills relevant to your target role.
+
+## Experience
+Include quantifiable achievements in your experience section.
+
+## Formatting
+Ensure your contact information is clearly visible.
+"""
+            
+            # Update the analysis record; AI suggestions are stored by the background task
+            analysis.ats_score = ats_score
+            if improvement_suggestions is not None:
+                analysis.improvement_suggestions = improvement_suggestions
+                analysis.suggestions_status = 'done'
+            db.session.commit()
+    except Exception as e:
+        logging.error(f"Error processing job data: {str(e)}")
+        job_titles = []
+        job_descriptions = []
+        # Don't overwrite the score if it's already set
+        if not analysis.ats_score:
+            analysis.ats_score = 65.0  # Fallback score
+            db.session.commit()
+
+    # Log the score for debugging
+    logging.info(f"Final ATS score: {analysis.ats_score}")
+    logging.info(f"Job titles: {job_titles}")
+    
+    # Extract resume sections and entities for the tabbed interface
+    try:
+        # Sections and entities were extracted once by the upload pipeline
+        artifact = get_artifact(analysis)
+        resume_sections = section_texts(artifact, analysis.resume_text)
+        entities = artifact["entities"]
+        
+        # Calculate skill distribution for the Skills tab
+        skill_categories = {
+            "Programming": ["python", "java", "javascript", "c++", "c#", "php", "ruby", "golang", "swift"],
+            "Data Science": ["machine learning", "deep learning", "data analysis", "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn"],
+            "Web Development": ["html", "css", "react", "angular", "vue", "node.js", "django", "flask", "express"],
+            "Database": ["sql", "mysql", "postgresql", "mongodb", "oracle", "sqlite", "nosql", "redis"],
+            "DevOps": ["docker", "kubernetes", "aws", "azure", "gcp", "ci/cd", "jenkins", "terraform"]
+        }
+        
+        # Initialize skill distribution
+        skill_distribution = {
+            "Programming": 0,
+            "Data Science": 0,
+            "Web Development": 0,
+            "Database": 0,
+            "DevOps": 0,
+            "Others": 0
+        }
+        
+        # Count skills in each category
+        total_skills = len(skills)
+        categorized_count = 0
+        
+        if total_skills > 0:
+            for skill in skills:
+                skill_lower = skill.lower()
+                categorized = False
+                
+                for category, keywords in skill_categories.items():
+                    if any(keyword in skill_lower for keyword in keywords):
+                        skill_distribution[category] += 1
+                        categorized = True
+                        categorized_count += 1
+                        break
+                
+                if not categorized:
+                    skill_distribution["Others"] += 1
+                    categorized_count += 1
+        
+        # Convert counts to percentages
+        for category in skill_distribution:
+            if total_skills > 0:
+                skill_distribution[category] = round((skill_distribution[category] / total_skills) * 100)
+            else:
+                skill_distribution[category] = 0
+                
+        # Make sure percentages add up to 100%
+        total_percentage = sum(skill_distribution.values())
+        if total_percentage < 100 and total_percentage > 0:
+            # Add the difference to "Others"
+            skill_distribution["Others"] += (100 - total_percentage)
+        elif total_percentage > 100:
+            # Normalize to 100%
+            factor = 100 / total_percentage
+            for category in skill_distribution:
+                skill_distribution[category] = round(skill_distribution[category] * factor)
+        
+        # If no skills detected, set default distribution
+        if total_skills == 0:
+            skill_distribution = {
+                "Programming": 40,
+                "Data Science": 25,
+                "Web Development": 20,
+                "Database": 10,
+                "DevOps": 0,
+                "Others": 5
+            }
+        
+        logging.info(f"Skill distribution: {skill_distribution}")
+    except Exception as e:
+        logging.error(f"Error extracting sections and entities: {str(e)}")
+        resume_sections = {}
+        entities = {}
+        skill_distribution = {
+            "Programming": 40,
+            "Data Science": 25,
+            "Web Development": 20,
+            "Database": 10,
+            "DevOps": 0,
+            "Others": 5
+        }
+
+    # Calculate variable scores based on resume's ATS score while maintaining differentiation
+    role_ats_scores = {}
+    
+    # Use the actual ATS score as base, then create proper spacing
+    base_score = int(analysis.ats_score)
+    # Ensure base score is in reasonable range
+    base_score = max(70, min(95, base_score))
+    
+    # Create score spacing that's unique to this resume but with clear differences
+    spacing = [0, -7, -14, -21, -28]  # Decreasing score differentials 
+    
+    # Apply scores to job titles based on calculated score with spacing
+    for i, title in enumerate(job_titles[:min(5, len(job_titles))]):
+        if i < len(spacing):
+            # Calculated score based on resume's unique ATS score with proper spacing
+            role_ats_scores[title] = max(65, base_score + spacing[i])
+        else:
+            # Fallback for additional titles
+            role_ats_scores[title] = max(60, base_score - 30)
+
+    payload = {
+        'job_titles': job_titles,
+        'resume_sections': resume_sections,
+        'entities': entities,
+        'skill_distribution': skill_distribution,
+        'role_ats_scores': role_ats_scores,
+        'matched_keywords': matched_keywords,
+        'suggestions_task_id': suggestions_task_id
+    }
+    return payload
+
 def register_routes(app):
     @app.route('/login', methods=['GET', 'POST'])
     def login():
@@ -93,6 +410,88 @@ def register_routes(app):
         """Advanced resume analysis page using the new UI and functionality"""
         
 
+    def _enqueue_upload(file, mode):
+        """Save an upload, create placeholder rows and queue it for background processing.
+
+        A re-upload of a file whose stages are all cached is completed immediately
+        instead of queued. Returns the ResumeAnalysis, or None if the queue is full.
+        Raises QuotaExceededError if the file does not fit in the upload quotas.
+        """
+        # Store the file under its content hash; identical re-uploads reuse the stored copy
+        save_start = time.perf_counter()
+        filename = secure_filename(file.filename)
+        upload = accept_upload(file, filename, current_user.id, app.config['UPLOAD_FOLDER'])
+        content_hash, file_path = upload.sha256, upload.path
+        cached = load_stage_results(content_hash)
+        save_ms = round((time.perf_counter() - save_start) * 1000, 1)
+
+        from_cache = is_fully_cached(mode, cached)
+        if not from_cache and is_queue_full():
+            return None
+
+        # Generate a unique ID for this session (also used as the job id)
+        session_id = str(uuid.uuid4())
+        session['session_id'] = session_id
+
+        # Create placeholder candidate and analysis records; the pipeline fills them in
+        candidate = Candidate(uuid=session_id, user_id=current_user.id)
+        db.session.add(candidate)
+        db.session.flush()  # Get an ID for the candidate without committing
+
+        analysis = ResumeAnalysis(
+            candidate_id=candidate.id,
+            resume_filename=filename,
+            job_id=session_id,
+            status='queued',
+            stage_timings=json.dumps({'save': save_ms}),
+            content_hash=content_hash
+        )
+        db.session.add(analysis)
+        db.session.commit()
+
+        if from_cache:
+            complete_from_cache(analysis.id, file_path, mode, cached)
+            session['analysis_id'] = analysis.id
+            logging.info(f"Completed resume {filename} as job {session_id} ({mode}) from cached results")
+            return analysis
+
+        try:
+            submit_upload_job(app, analysis.id, file_path, mode, cached, upload.data)
+        except QueueFullError:
+            # The stored file stays; a retry of the same content reuses it
+            db.session.delete(analysis)
+            db.session.delete(candidate)
+            db.session.commit()
+            return None
+
+        # Store analysis ID in session
+        session['analysis_id'] = analysis.id
+        logging.info(f"Queued resume {filename} as job {session_id} ({mode}, {len(cached)} stages cached)")
+        return analysis
+
+    def _queue_full_response():
+        response = jsonify({
+            'success': False,
+            'error': 'The server is busy processing other resumes. Please try again shortly.',
+            'retry_after': RETRY_AFTER_SECONDS
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+        return response
+
+    def _quota_exceeded_response(error):
+        return jsonify({'success': False, 'error': str(error)}), 413
+
+    def _job_accepted_response(analysis):
+        response = jsonify({
+            'success': True,
+            'job_id': analysis.job_id,
+            'status': analysis.status,
+            'status_url': url_for('upload_job_status', job_id=analysis.job_id)
+        })
+        response.status_code = 202
+        return response
+
     @app.route('/upload', methods=['POST'])
     @login_required
     def upload_resume():
@@ -107,57 +506,51 @@ def register_routes(app):
             return redirect(url_for('index'))
 
         if file and allowed_file(file.filename):
-            # Generate a unique ID for this session
-            session_id = str(uuid.uuid4())
-            session['session_id'] = session_id
-
-            # Save the file
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{session_id}_{filename}")
-            file.save(file_path)
-
-            # Process the resume (PDF or image) - Now using a single function that handles both
-            resume_text = analyze_resume(file_path)
-
-            # Extract basic information
-            basic_info = extract_basic_info(resume_text)
-
-            # Create new candidate and associate with current user
-            candidate = Candidate(
-                uuid=session_id,
-                name=basic_info.get('name', ''),
-                email=basic_info.get('email', ''),
-                phone=basic_info.get('phone', ''),
-                user_id=current_user.id  # Associate with logged-in user
-            )
-            db.session.add(candidate)
-            db.session.flush()  # Get an ID for the candidate without committing
-
-            # Extract and save skills
-            for skill in basic_info.get('skills', []):
-                candidate_skill = CandidateSkill(
-                    candidate_id=candidate.id,
-                    skill_name=skill
-                )
-                db.session.add(candidate_skill)
-
-            # Create resume analysis record
-            analysis = ResumeAnalysis(
-                candidate_id=candidate.id,
-                resume_text=resume_text,
-                resume_filename=filename
-            )
-            db.session.add(analysis)
-            db.session.commit()
-
-            # Store analysis ID in session
-            session['analysis_id'] = analysis.id
-
+            try:
+                analysis = _enqueue_upload(file, MODE_BASIC)
+            except QuotaExceededError as e:
+                flash(str(e), 'warning')
+                return redirect(url_for('index'))
+            if not analysis:
+                flash('The server is busy processing other resumes. Please try again in a moment.', 'warning')
+                return redirect(url_for('index'))
+
+            # The analysis page shows a progress view until the job finishes
             return redirect(url_for('resume_analysis'))
 
         flash('Invalid file type. Please upload a PDF or image file.', 'danger')
         return redirect(url_for('index'))
 
+    @app.route('/api/jobs/<job_id>')
+    @login_required
+    def upload_job_status(job_id):
+        """Status, per-stage timings and results of a background upload job"""
+        analysis = ResumeAnalysis.query.join(
+            Candidate, ResumeAnalysis.candidate_id == Candidate.id
+        ).filter(
+            ResumeAnalysis.job_id == job_id,
+            Candidate.user_id == current_user.id
+        ).first()
+
+        if not analysis:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+        # Marks a job that ran past its timeout as failed
+        job_pending(analysis)
+        response = {
+            'success': True,
+            'job_id': job_id,
+            'status': analysis.status,
+            'stage_timings': json.loads(analysis.stage_timings or '{}'),
+            'analysis_url': url_for('resume_analysis')
+        }
+        if analysis.status == 'done' and analysis.analysis_results:
+            response['results'] = json.loads(analysis.analysis_results)
+        elif analysis.status == 'failed':
+            response['error'] = analysis.error_message
+
+        return jsonify(response)
+
     @app.route('/analyze', methods=['GET'])
     @login_required
     def resume_analysis():
@@ -178,6 +571,13 @@ def register_routes(app):
             flash('Analysis not found or unauthorized access', 'danger')
             return redirect(url_for('index'))
 
+        # The upload may still be processing in the background
+        if job_pending(analysis):
+            return render_template('processing.html', analysis=analysis)
+        if analysis.status == 'failed':
+            flash(analysis.error_message or 'Error processing resume', 'danger')
+            return redirect(url_for('index'))
+
         # Ensure we only access candidates belonging to current user
         candidate = Candidate.query.filter_by(
             id=analysis.candidate_id, 
@@ -190,338 +590,52 @@ def register_routes(app):
         logging.info(f"Resume text length: {len(analysis.resume_text)} characters")
         logging.info(f"Extracted skills: {skills}")
 
-        # Load job descriptions
-        try:
-            job_df = pd.read_csv('attached_assets/job_title_des.csv')
-            job_titles = job_df['Job Title'].tolist()[:5]  # Just get first 5 for demo
-            job_descriptions = job_df['Job Description'].tolist()[:5]  # Just get first 5 for demo
-
-            # Use our new ATS scoring system
-            if job_descriptions:
-                logging.info("Calculating ATS scores with new ATS scoring system...")
-                
-                try:
-                    from utils.ats_scorer import calculate_ats_score, calculate_role_specific_ats_scores
-                    from utils.job_matcher import find_matching_jobs
-                    
-                    # Find top matching jobs using our ATS scoring and TF-IDF
-                    job_matches = find_matching_jobs(analysis.resume_text, job_df, skills=skills, top_n=5)
-                    
-                    # Extract updated job titles and descriptions from matches
-                    job_titles = [match[0] for match in job_matches]
-                    job_descriptions = [match[2] for match in job_matches]
-                    
-                    # Log the matched job titles
-                    logging.info(f"Top 5 matched jobs based on ATS scoring: {job_titles}")
-                    
-                    # Calculate role-specific ATS scores
-                    role_ats_scores = {}
-                    
-                    # Store the original similarity scores for each job directly from job_matches
-                    for match in job_matches:
-                        job_title = match[0]
-                        # Use the original score without artificial boosting for more accurate recommendations
-                        raw_score = match[1]  # This is the original similarity score from the 70/30 formula
-                        # Store the raw score directly in our role_ats_scores dict
-                        role_ats_scores[job_title] = raw_score
-                    
-                    logging.info(f"Role-specific ATS scores with similarity: {role_ats_scores}")
-                    
-                    # Use the first match for the primary ATS score
-                    if job_matches:
-                        # Get the primary ATS score from the first match
-                        primary_ats_details = job_matches[0][3]
-                        primary_ats_score = primary_ats_details.get('score', 65)
-                        matched_keywords = primary_ats_details.get('matched_keywords', [])
-                        total_keywords = primary_ats_details.get('total', 0)
-                        
-                        logging.info(f"Primary ATS Score: {primary_ats_score}%")
-                        logging.info(f"Matched keywords: {matched_keywords[:10]} ({len(matched_keywords)}/{total_keywords})")
-                        
-                        # Generate improvement suggestions based on matched keywords
-                        missing_keywords = []
-                        job_description_tokens = []
-                        if job_descriptions:
-                            # Extract important keywords from the job description
-                            job_doc = re.findall(r'\b[A-Za-z][A-Za-z0-9\+\#\.]+\b', job_descriptions[0].lower())
-                            job_description_tokens = [token for token in job_doc if len(token) > 3]
-                            
-                        for token in job_description_tokens:
-                            if token not in matched_keywords and token not in missing_keywords:
-                                missing_keywords.append(token)
-                        
-                        # Limit to top 5 missing keywords
-                        missing_keywords = missing_keywords[:5]
-                        
-                        # Generate AI-powered resume suggestions using OpenAI
-                        try:
-                            # Get the top matched job title (if available)
-                            target_job = job_titles[0] if job_titles else None
-                            
-                            # Generate personalized suggestions with our new module
-                            improvement_suggestions = generate_resume_suggestions(
-                                analysis.resume_text,
-                                skills=skills,
-                                job_title=target_job
-                            )
-                            logging.info("Successfully generated AI resume suggestions")
-                        except Exception as sugg_error:
-                            logging.error(f"Error generating AI resume suggestions: {sugg_error}")
-                            # Fallback to basic suggestions
-                            improvement_suggestions = f"""
-## Resume Suggestions
-
-### Keyword Optimization
-- Add these missing keywords to improve your resume: {', '.join(missing_keywords) if missing_keywords else "Your resume contains many keywords from the job description."}
-- Customize your resume for each job application by matching terms from the job listing
-
-### Experience & Impact
-- Use strong action verbs at the beginning of each bullet point
-- Include metrics and quantifiable achievements whenever possible
-- Focus on results rather than just listing responsibilities
-
-### Format & Organization  
-- Ensure your resume uses a clean, ATS-friendly format
-- Use standard section headings that are easily recognized
-- Keep your most relevant experience and skills prominent
-"""
-                        
-                        # Set the primary ATS score
-                        ats_score = primary_ats_score
-                    else:
-                        # Fallback if no job matches available
-                        logging.warning("No job matches available for ATS scoring")
-                        ats_score = 65  # Default score
-                        improvement_suggestions = """
-# Resume Improvement Suggestions
-
-## Skills
-Add more specific skills relevant to your target role.
-
-## Experience
-Include quantifiable achievements in your experience section.
-
-## Formatting
-Ensure your contact information is clearly visible.
-"""
-                        # Create default role_ats_scores with properly differentiated values
-                        role_ats_scores = {
-                            "Software Engineer": 95,
-                            "Web Developer": 88,
-                            "Full Stack Developer": 82,
-                            "Backend Developer": 75, 
-                            "Frontend Developer": 68
-                        }
-                except Exception as e:
-                    logging.error(f"Error using new ATS scorer: {str(e)}")
-                    # Fallback to MAANG ATS scorer
-                    try:
-                        from utils.advanced_analyzer import job_specific_ats_score
-                        ats_score, score_breakdown = job_specific_ats_score(
-                            analysis.resume_text,
-                            job_titles[0],  # Use first job title 
-                            skills
-                        )
-                        logging.info(f"MAANG ATS Score: {ats_score}")
-                        logging.info(f"Score breakdown: {score_breakdown}")
-                        
-                        # Variable scores calculated from actual MAANG ATS score results
-                        role_ats_scores = {}
-                        
-                        # Use the actual ATS score as the base for calculations
-                        # Ensure the base score is in a reasonable range
-                        base_score = max(75, min(96, ats_score + 5))  # Slight boost to show positive results
-                        
-                        # Create score spacing that's unique to this resume but consistent
-                        spacing = [0, -7, -14, -21, -28]  # Decreasing score differentials
-                        
-                        # Apply variable scores based on original ATS score with consistent spacing
-                        for i, title in enumerate(job_titles[:min(5, len(job_titles))]):
-                            if i < len(spacing):
-                                # Each role gets progressively lower score from base
-                                role_ats_scores[title] = max(65, base_score + spacing[i])
-                            else:
-                                # Further roles get significantly lower scores
-                                role_ats_scores[title] = max(60, base_score - 30)
-                            
-                        # Generate improvement suggestions
-                        improvement_suggestions = generate_improvement_suggestions(
-                            analysis.resume_text,
-                            job_descriptions[0],
-                            skills
-                        )
-                    except Exception as e2:
-                        logging.error(f"Error using MAANG ATS scorer: {str(e2)}")
-                        # Variable scores fallback based on resume's characteristics
-                        ats_score = 65  # Default score
-                        role_ats_scores = {}
-                        
-                        # Use a base score as foundation, ensuring it's reasonable
-                        base_score = max(70, min(90, ats_score + 10))  # Slightly boost for better presentation
-                        
-                        # Create variable but consistent spacing between job types
-                        spacing = [0, -7, -14, -21, -28]  # Decreasing score differentials
-                        
-                        # Apply variable scores based on adjusted base score with spacing
-                        for i, title in enumerate(job_titles[:min(5, len(job_titles))]):
-                            if i < len(spacing):
-                                role_ats_scores[title] = max(65, base_score + spacing[i])
-                            else:
-                                role_ats_scores[title] = max(60, base_score - 30)
-                        
-                        # Default improvement suggestions
-                        improvement_suggestions = """
-# Resume Improvement Suggestions
-
-## Skills
-Add more specific skills relevant to your target role.
-
-## Experience
-Include quantifiable achievements in your experience section.
-
-## Formatting
-Ensure your contact information is clearly visible.
-"""
-                
-                # Update the analysis record
-                analysis.ats_score = ats_score
-                analysis.improvement_suggestions = improvement_suggestions
-                db.session.commit()
-        except Exception as e:
-            logging.error(f"Error processing job data: {str(e)}")
-            job_titles = []
-            job_descriptions = []
-            # Don't overwrite the score if it's already set
-            if not analysis.ats_score:
-                analysis.ats_score = 65.0  # Fallback score
-                db.session.commit()
-
-        # Log the score for debugging
-        logging.info(f"Final ATS score: {analysis.ats_score}")
-        logging.info(f"Job titles: {job_titles}")
-        
-        # Extract resume sections and entities for the tabbed interface
-        try:
-            # Process the resume text to extract sections
-            resume_sections = preprocess_and_segment(analysis.resume_text)
-            
-            # Extract entities from the resume text
-            entities = extract_entities(analysis.resume_text)
-            
-            # Calculate skill distribution for the Skills tab
-            skill_categories = {
-                "Programming": ["python", "java", "javascript", "c++", "c#", "php", "ruby", "golang", "swift"],
-                "Data Science": ["machine learning", "deep learning", "data analysis", "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn"],
-                "Web Development": ["html", "css", "react", "angular", "vue", "node.js", "django", "flask", "express"],
-                "Database": ["sql", "mysql", "postgresql", "mongodb", "oracle", "sqlite", "nosql", "redis"],
-                "DevOps": ["docker", "kubernetes", "aws", "azure", "gcp", "ci/cd", "jenkins", "terraform"]
-            }
-            
-            # Initialize skill distribution
-            skill_distribution = {
-                "Programming": 0,
-                "Data Science": 0,
-                "Web Development": 0,
-                "Database": 0,
-                "DevOps": 0,
-                "Others": 0
-            }
-            
-            # Count skills in each category
-            total_skills = len(skills)
-            categorized_count = 0
-            
-            if total_skills > 0:
-                for skill in skills:
-                    skill_lower = skill.lower()
-                    categorized = False
-                    
-                    for category, keywords in skill_categories.items():
-                        if any(keyword in skill_lower for keyword in keywords):
-                            skill_distribution[category] += 1
-                            categorized = True
-                            categorized_count += 1
-                            break
-                    
-                    if not categorized:
-                        skill_distribution["Others"] += 1
-                        categorized_count += 1
-            
-            # Convert counts to percentages
-            for category in skill_distribution:
-                if total_skills > 0:
-                    skill_distribution[category] = round((skill_distribution[category] / total_skills) * 100)
-                else:
-                    skill_distribution[category] = 0
-                    
-            # Make sure percentages add up to 100%
-            total_percentage = sum(skill_distribution.values())
-            if total_percentage < 100 and total_percentage > 0:
-                # Add the difference to "Others"
-                skill_distribution["Others"] += (100 - total_percentage)
-            elif total_percentage > 100:
-                # Normalize to 100%
-                factor = 100 / total_percentage
-                for category in skill_distribution:
-                    skill_distribution[category] = round(skill_distribution[category] * factor)
-            
-            # If no skills detected, set default distribution
-            if total_skills == 0:
-                skill_distribution = {
-                    "Programming": 40,
-                    "Data Science": 25,
-                    "Web Development": 20,
-                    "Database": 10,
-                    "DevOps": 0,
-                    "Others": 5
-                }
-            
-            logging.info(f"Skill distribution: {skill_distribution}")
-        except Exception as e:
-            logging.error(f"Error extracting sections and entities: {str(e)}")
-            resume_sections = {}
-            entities = {}
-            skill_distribution = {
-                "Programming": 40,
-                "Data Science": 25,
-                "Web Development": 20,
-                "Database": 10,
-                "DevOps": 0,
-                "Others": 5
-            }
-
-        # Calculate variable scores based on resume's ATS score while maintaining differentiation
-        role_ats_scores = {}
-        
-        # Use the actual ATS score as base, then create proper spacing
-        base_score = int(analysis.ats_score)
-        # Ensure base score is in reasonable range
-        base_score = max(70, min(95, base_score))
-        
-        # Create score spacing that's unique to this resume but with clear differences
-        spacing = [0, -7, -14, -21, -28]  # Decreasing score differentials 
-        
-        # Apply scores to job titles based on calculated score with spacing
-        for i, title in enumerate(job_titles[:min(5, len(job_titles))]):
-            if i < len(spacing):
-                # Calculated score based on resume's unique ATS score with proper spacing
-                role_ats_scores[title] = max(65, base_score + spacing[i])
-            else:
-                # Fallback for additional titles
-                role_ats_scores[title] = max(60, base_score - 30)
+        # Serve the stored payload unless the resume, job catalog or scorer changed since
+        inputs = snapshot_inputs(analysis, skills)
+        payload = load_snapshot(analysis, inputs)
+        if payload is None:
+            payload = _compute_resume_analysis(app, analysis, skills)
+            save_snapshot(analysis, inputs, payload)
+        else:
+            logging.info(f"Serving stored analysis snapshot for resume ID: {analysis_id}")
+            if not suggestions_pending(analysis):
+                # The suggestions are stored (or gave up); no need to poll for them.
+                # Otherwise the poll endpoint reads the pending state from the analysis.
+                payload['suggestions_task_id'] = None
 
         return render_template(
             'resume_analysis.html',
             candidate=candidate,
             analysis=analysis,
             skills=skills,
-            job_titles=job_titles,
-            resume_sections=resume_sections,
-            entities=entities,
-            skill_distribution=skill_distribution,
-            role_ats_scores=role_ats_scores
+            **payload
         )
 
+    @app.route('/api/analysis/<int:analysis_id>/suggestions/<task_id>')
+    @login_required
+    def analysis_suggestions(analysis_id, task_id):
+        """Poll endpoint for the deferred AI suggestions fragment of the analysis page"""
+        # The task may run on another worker; its state is kept on the analysis
+        analysis = ResumeAnalysis.query.join(
+            Candidate, ResumeAnalysis.candidate_id == Candidate.id
+        ).filter(
+            ResumeAnalysis.id == analysis_id,
+            Candidate.user_id == current_user.id
+        ).first()
+
+        if not analysis:
+            return jsonify({'success': False, 'message': 'Analysis not found'})
+
+        task = get_task(task_id)
+        if suggestions_pending(analysis) and not (task and task['status'] == 'error'):
+            return jsonify({'success': True, 'status': 'pending'})
+
+        return jsonify({
+            'success': True,
+            'status': 'done',
+            'html': render_template('suggestions_fragment.html', analysis=analysis)
+        })
+
     @app.route('/skills_test')
     @login_required
     def skills_test():
@@ -554,8 +668,8 @@ Ensure your contact information is clearly visible.
         if not skill_names:
             return jsonify({'success': False, 'message': 'No skills provided'})
 
-        # Generate questions for the skills
-        questions = generate_skill_test_questions(skill_names)
+        # Sample from the persistent question bank; pools are refilled in the background
+        questions = get_questions_for_user(app, current_user.id, skill_names)
 
         return jsonify({
             'success': True,
@@ -613,29 +727,20 @@ Ensure your contact information is clearly visible.
         candidate = Candidate.query.get(analysis.candidate_id)
         skills = [skill.skill_name for skill in candidate.skills]
         
-        # Extract entities from resume text for experience estimation
+        # Entities and experience were extracted once by the upload pipeline
         try:
-            entities = extract_entities(analysis.resume_text)
+            artifact = get_artifact(analysis)
         except Exception as e:
-            logging.error(f"Error extracting entities: {str(e)}")
-            entities = {}
+            logging.error(f"Error loading extraction artifact: {str(e)}")
+            artifact = {}
+        entities = artifact.get('entities', {})
         
         # Get personalized job search tips using the new function
-        # Estimate years of experience based on extracted entities (if available)
         experience_years = 2  # Default value
-        try:
-            if hasattr(candidate, 'experience_years') and candidate.experience_years:
-                experience_years = candidate.experience_years
-            elif 'experience' in entities:
-                # Attempt to extract years from entity text
-                exp_text = entities.get('experience', '')
-                if isinstance(exp_text, str):
-                    # Look for patterns like "5 years" or "3+ years"
-                    years_match = re.search(r'(\d+)(?:\+)?\s*years?', exp_text, re.IGNORECASE)
-                    if years_match:
-                        experience_years = int(years_match.group(1))
-        except Exception as e:
-            logging.error(f"Error estimating experience years: {str(e)}")
+        if hasattr(candidate, 'experience_years') and candidate.experience_years:
+            experience_years = candidate.experience_years
+        elif artifact.get('experience_years'):
+            experience_years = artifact['experience_years']
         
         # Initialize job_titles with default values
         job_titles = ["Developer", "Software Engineer", "Web Developer"]
@@ -656,102 +761,12 @@ Ensure your contact information is clearly visible.
             skills=skills
         )
 
-        # Find matching jobs using enhanced Adzuna API integration
+        # First page of the ranked recommendations; /api/jobs/recommendations pages on from next_cursor
+        next_cursor = None
         try:
-            # Import required modules
-            from utils.job_matcher import find_matching_jobs
-            from utils.adzuna_enhanced import search_jobs
-            
-            # Try to get top job titles
-            job_titles = []
-            try:
-                # Get job descriptions for matching
-                import pandas as pd
-                job_df = pd.read_csv('attached_assets/job_title_des.csv')
-                
-                # Find top matching jobs using our matching algorithm
-                job_matches = find_matching_jobs(analysis.resume_text, job_df, skills=skills, top_n=3)
-                
-                # Extract job titles for search
-                job_titles = [match[0] for match in job_matches]
-                logging.info(f"Found top job titles: {job_titles}")
-            except Exception as e:
-                logging.error(f"Error finding matching job titles: {str(e)}")
-                job_titles = ["Developer", "Software Engineer", "Web Developer"]
-            
-            # Create search query with top job title and skills
-            top_job = job_titles[0] if job_titles else "Developer"
-            
-            # Search for jobs using the Adzuna API with simplified query
-            logging.info(f"Searching Adzuna API for jobs with top job title: {top_job}")
-            jobs = search_jobs(top_job, results_per_page=8)
-            
-            # If we still don't have jobs, try with a skill
-            if not jobs:
-                top_skill = skills[0] if skills else "programming"
-                logging.info(f"Trying Adzuna API with top skill: {top_skill}")
-                jobs = search_jobs(top_skill, results_per_page=8)
-            
-            # Enhance job listings with custom match scores based on skills
-            for job in jobs:
-                # Calculate match score for each skill found in the job description
-                skill_matches = sum(1 for skill in skills if skill.lower() in job['description'].lower())
-                skill_score = min(25, skill_matches * 5)  # 5 points per skill match, max 25
-                
-                # Calculate variable scores that change with each resume
-                # Start with the resume's actual ATS score as baseline (or a default if not available)
-                resume_ats_score = getattr(analysis, 'ats_score', 75)
-                
-                # Scale base score to reasonable range for best presentation
-                base_score = max(75, min(97, resume_ats_score + 15))
-                
-                # Create properly differentiated scores with variable spacing
-                job_index = jobs.index(job)
-                
-                # Apply variable spacing based on position and skill matches
-                if job_index == 0:
-                    # Top job gets top score (boosted slightly for best candidate profile)
-                    enhanced_score = base_score
-                elif job_index < 5:
-                    # Next 4 jobs get progressively lower scores based on position
-                    # Variables scores with consistent spacing
-                    spacing = [-7, -14, -21, -28]
-                    enhanced_score = max(70, base_score + spacing[job_index-1])
-                else:
-                    # Remaining jobs get lower scores
-                    # Use skill-boosting for additional differentiation
-                    skill_adjusted_score = max(65, base_score - 32 + (skill_score * 0.1))
-                    enhanced_score = min(68, skill_adjusted_score)
-                
-                # Update match score
-                job['match_score'] = enhanced_score
-            
-            # Sort by match score (highest first)
-            jobs = sorted(jobs, key=lambda x: x['match_score'], reverse=True)
-            
-            # Deduplicate job listings by title to ensure diversity
-            unique_jobs = []
-            unique_job_titles = set()
-            
-            for job in jobs:
-                # Extract the primary job title (first part before any slashes or hyphens)
-                # This helps group similar titles like "PHP Developer", "PHP Developer / Programmer", etc.
-                primary_title = job['title'].split('/')[0].split('-')[0].strip()
-                
-                # Only include the job if we haven't seen this primary title before
-                if primary_title not in unique_job_titles:
-                    unique_job_titles.add(primary_title)
-                    unique_jobs.append(job)
-                    
-                    # Break once we have enough diverse job types (limit to 5 unique jobs)
-                    if len(unique_jobs) >= 5:
-                        break
-            
-            # Replace the original jobs list with our deduplicated list
-            jobs = unique_jobs
-            
-            logging.info(f"Retrieved {len(jobs)} unique job types for display")
-            
+            features = get_resume_features(analysis, candidate)
+            jobs, next_cursor = get_recommendation_page(app, features, analysis.id, limit=5)
+            logging.info(f"Retrieved {len(jobs)} unique jobs for display")
         except Exception as e:
             logging.error(f"Error finding matching jobs: {str(e)}")
             # Import fallback jobs directly
@@ -763,9 +778,42 @@ Ensure your contact information is clearly visible.
             'job_recommendations.html', 
             candidate=candidate, 
             jobs=jobs, 
-            job_search_tips=job_search_tips
+            job_search_tips=job_search_tips,
+            next_cursor=next_cursor
         )
     
+    @app.route('/api/jobs/recommendations')
+    @login_required
+    def api_job_recommendations():
+        """Page through ranked job recommendations with an opaque ?cursor= from the previous page"""
+        if 'analysis_id' not in session:
+            return jsonify({'success': False, 'error': 'Session expired'}), 401
+
+        analysis = ResumeAnalysis.query.join(
+            Candidate, ResumeAnalysis.candidate_id == Candidate.id
+        ).filter(
+            ResumeAnalysis.id == session['analysis_id'],
+            Candidate.user_id == current_user.id
+        ).first()
+        if not analysis:
+            return jsonify({'success': False, 'error': 'Analysis not found'}), 404
+
+        try:
+            state = decode_cursor(app, request.args.get('cursor'), analysis.id)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        try:
+            features = get_resume_features(analysis, analysis.candidate)
+            jobs, next_cursor = get_recommendation_page(
+                app, features, analysis.id, state, limit=request.args.get('limit', 5, type=int)
+            )
+        except Exception as e:
+            logging.error(f"Error paging job recommendations: {str(e)}")
+            return jsonify({'success': False, 'error': 'Could not load job recommendations'}), 500
+
+        return jsonify({'success': True, 'jobs': jobs, 'next_cursor': next_cursor})
+    
     # API Test and ATS Score endpoints removed as requested
     # Job Match route removed as requested
             
@@ -870,187 +918,14 @@ Ensure your contact information is clearly visible.
             return jsonify({'success': False, 'error': 'No selected file'})
             
         if file and allowed_file(file.filename):
+            # Extraction, scoring and analysis run in the background; poll status_url for results
             try:
-                # Generate a unique ID for this session
-                session_id = str(uuid.uuid4())
-                session['session_id'] = session_id
-                
-                # Save the file
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{session_id}_{filename}")
-                file.save(file_path)
-                
-                # Extract text from the uploaded file
-                resume_text = analyze_resume(file_path)
-                
-                # Log file and extracted information for debugging
-                logging.info(f"Processing file: {filename}, Session ID: {session_id}")
-                logging.info(f"Extracted text length: {len(resume_text)} characters")
-                
-                # Extract basic information, skills, sections, and entities
-                basic_info = extract_basic_info(resume_text)
-                skills = extract_skills(resume_text)
-                sections = preprocess_and_segment(resume_text)
-                entities = extract_entities(resume_text)
-                
-                # Log extracted skills
-                logging.info(f"Extracted skills: {skills}")
-                
-                # Use our new ATS scoring system
-                try:
-                    from utils.ats_scorer import calculate_ats_score, calculate_role_specific_ats_scores
-                    from utils.job_matcher import find_matching_jobs
-                    
-                    # Get job descriptions for scoring
-                    job_df = pd.read_csv('attached_assets/job_title_des.csv')
-                    
-                    # Find top matching jobs using our ATS scoring and TF-IDF
-                    job_matches = find_matching_jobs(resume_text, job_df, skills=skills, top_n=5)
-                    
-                    # Extract job titles and descriptions from matches
-                    job_titles = [match[0] for match in job_matches]
-                    job_descriptions = [match[2] for match in job_matches]
-                    
-                    # Log the matched job titles
-                    logging.info(f"Top 5 matched jobs based on ATS scoring and TF-IDF: {job_titles}")
-                    
-                    # Calculate role-specific ATS scores using the original unmodified algorithm
-                    # This uses raw scores instead of artificially boosted ones for more accurate job recommendations
-                    role_ats_scores = calculate_role_specific_ats_scores(skills, job_matches)
-                    logging.info(f"Role-specific ATS scores (original algorithm): {role_ats_scores}")
-                    
-                    # Use the first match for the primary ATS score
-                    if job_matches:
-                        # Get the primary ATS score from the first match
-                        primary_ats_details = job_matches[0][3]
-                        primary_ats_score = primary_ats_details.get('score', 65)
-                        matched_keywords = primary_ats_details.get('matched_keywords', [])
-                        total_keywords = primary_ats_details.get('total', 0)
-                        
-                        logging.info(f"Primary ATS Score: {primary_ats_score}%")
-                        logging.info(f"Matched keywords: {matched_keywords[:10]} ({len(matched_keywords)}/{total_keywords})")
-                        
-                        # Generate improvement suggestions based on matched keywords
-                        missing_keywords = []
-                        job_description_tokens = []
-                        if job_descriptions:
-                            # Extract important keywords from the job description
-                            job_doc = re.findall(r'\b[A-Za-z][A-Za-z0-9\+\#\.]+\b', job_descriptions[0].lower())
-                            job_description_tokens = [token for token in job_doc if len(token) > 3]
-                            
-                        for token in job_description_tokens:
-                            if token not in matched_keywords and token not in missing_keywords:
-                                missing_keywords.append(token)
-                        
-                        # Limit to top 5 missing keywords
-                        missing_keywords = missing_keywords[:5]
-                        
-                        # Generate improvement suggestions
-                        improvement_suggestions = [
-                            f"Add these missing keywords to improve your ATS score: {', '.join(missing_keywords)}" if missing_keywords else "Your resume contains many keywords from the job description.",
-                            "Use more action verbs and quantifiable achievements in your experience section.",
-                            "Ensure your resume format is ATS-friendly with standard section headings."
-                        ]
-                        
-                        # Set the primary ATS score
-                        ats_score = primary_ats_score
-                    else:
-                        # Fallback if no job descriptions available
-                        logging.warning("No job matches available for ATS scoring")
-                        ats_score = 65  # Default score
-                        improvement_suggestions = [
-                            "Add more specific skills relevant to your target role.",
-                            "Include quantifiable achievements in your experience section.",
-                            "Ensure your contact information is clearly visible."
-                        ]
-                        role_ats_scores = {}
-                    
-                    # Use advanced analyzer for job matching to get additional data
-                    advanced_results = advanced_analyze_resume(resume_text, skills)
-                    
-                    # Combine our ATS score with advanced analyzer results
-                    advanced_results['ats_score'] = ats_score
-                    advanced_results['role_ats_scores'] = role_ats_scores
-                    advanced_results['job_type_recs'] = job_type_recs
-                    if 'improvement_suggestions' in advanced_results:
-                        advanced_results['improvement_suggestions'] = improvement_suggestions
-                    
-                except Exception as e:
-                    logging.error(f"Error using new ATS scorer: {str(e)}")
-                    logging.info("Falling back to standard advanced analyzer")
-                    
-                    # Use advanced analyzer for job matching and ATS score
-                    advanced_results = advanced_analyze_resume(resume_text, skills)
-                    # Make sure we have a default role_ats_scores
-                    if 'role_ats_scores' not in advanced_results:
-                        advanced_results['role_ats_scores'] = {}
-                
-                # Log results for debugging
-                logging.info(f"Final ATS Score: {advanced_results['ats_score']}")
-                logging.info(f"Top job match: {advanced_results['top_job']}")
-                logging.info(f"Job matches: {[(match['title'], match['score']) for match in advanced_results['job_matches'][:3]]}")
-                
-                # Format job recommendations for display
-                job_recommendations = [
-                    (match['title'], match['score']/100) 
-                    for match in advanced_results['job_matches'][:5]
-                ]
-                
-                # Combine results
-                results = {
-                    'success': True,
-                    'text': resume_text,
-                    'skills': skills,
-                    'sections': sections,
-                    'entities': entities,
-                    'ats_score': advanced_results['ats_score'],
-                    'top_job': advanced_results['top_job'],
-                    'improvement_suggestions': advanced_results['improvement_suggestions'],
-                    'job_recommendations': job_recommendations
-                }
-                
-                # Store in database
-                # Create candidate
-                candidate = Candidate(
-                    uuid=session_id,
-                    name=basic_info.get('name', ''),
-                    email=basic_info.get('email', ''),
-                    phone=basic_info.get('phone', ''),
-                    user_id=current_user.id
-                )
-                db.session.add(candidate)
-                db.session.flush()  # Get an ID for the candidate
-                
-                # Add skills
-                for skill in skills:
-                    candidate_skill = CandidateSkill(
-                        candidate_id=candidate.id,
-                        skill_name=skill
-                    )
-                    db.session.add(candidate_skill)
-                
-                # Create analysis record
-                analysis = ResumeAnalysis(
-                    candidate_id=candidate.id,
-                    resume_text=resume_text,
-                    resume_filename=filename,
-                    ats_score=advanced_results['ats_score'],
-                    improvement_suggestions="\n".join(advanced_results['improvement_suggestions'])
-                )
-                db.session.add(analysis)
-                db.session.commit()
-                
-                # Store analysis ID in session
-                session['analysis_id'] = analysis.id
-                
-                return jsonify(results)
-                
-            except Exception as e:
-                logging.error(f"Error processing resume: {str(e)}")
-                return jsonify({
-                    'success': False, 
-                    'error': 'Error processing resume: ' + str(e)
-                })
+                analysis = _enqueue_upload(file, MODE_STANDARD)
+            except QuotaExceededError as e:
+                return _quota_exceeded_response(e)
+            if not analysis:
+                return _queue_full_response()
+            return _job_accepted_response(analysis)
                 
         return jsonify({
             'success': False,
@@ -1070,145 +945,14 @@ Ensure your contact information is clearly visible.
             return jsonify({'success': False, 'error': 'No selected file'})
             
         if file and allowed_file(file.filename):
+            # MAANG scoring and OpenAI analysis run in the background; poll status_url for results
             try:
-                # Generate a unique ID for this session
-                session_id = str(uuid.uuid4())
-                session['session_id'] = session_id
-                
-                # Save the file
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{session_id}_{filename}")
-                file.save(file_path)
-                
-                # Extract text from the uploaded file
-                resume_text = analyze_resume(file_path)
-                
-                # Log file and extraction details for debugging
-                logging.info(f"[ENHANCED] Processing file: {filename}, Session ID: {session_id}")
-                logging.info(f"[ENHANCED] Extracted text length: {len(resume_text)} characters")
-                
-                # Extract basic information, skills, sections, and entities
-                basic_info = extract_basic_info(resume_text)
-                skills = extract_skills(resume_text)
-                sections = preprocess_and_segment(resume_text)
-                entities = extract_entities(resume_text)
-                
-                # Log extracted skills
-                logging.info(f"[ENHANCED] Extracted skills: {skills}")
-                
-                # First try MAANG ATS scoring for more accurate evaluation
-                ats_score = None
-                score_breakdown = {}
-                
-                try:
-                    # Try to use the MAANG ATS scorer
-                    from utils.maang_ats_scorer import calculate_resume_ats_score
-                    
-                    # Get job descriptions for scoring
-                    job_df = pd.read_csv('attached_assets/job_title_des.csv')
-                    job_titles = job_df['Job Title'].tolist()[:5]
-                    job_descriptions = job_df['Job Description'].tolist()[:5]
-                    
-                    if job_descriptions:
-                        logging.info("[ENHANCED] Calculating MAANG ATS score...")
-                        maang_result = calculate_resume_ats_score(
-                            resume_text, 
-                            job_descriptions[0],
-                            skills
-                        )
-                        
-                        # Record the score for using later
-                        ats_score = maang_result['ats_score']
-                        score_breakdown = {
-                            'skills_score': maang_result.get('skill_score', 0),
-                            'experience_score': maang_result.get('experience_score', 0),
-                            'education_score': maang_result.get('education_score', 0),
-                            'skills_percentage': maang_result.get('skill_percentage', 0),
-                            'experience_percentage': maang_result.get('experience_percentage', 0),
-                            'education_percentage': maang_result.get('education_percentage', 0)
-                        }
-                        
-                        logging.info(f"[ENHANCED] MAANG ATS Score: {ats_score}")
-                        logging.info(f"[ENHANCED] Score breakdown: {score_breakdown}")
-                except Exception as e:
-                    logging.error(f"[ENHANCED] Error using MAANG ATS scorer: {str(e)}")
-                    
-                # Then use OpenAI for job matching and other analyses
-                from utils.openai_helper import analyze_resume_strengths_weaknesses, calculate_accurate_ats_score
-                
-                job_description = job_descriptions[0] if job_descriptions else ""
-                
-                # Get the OpenAI analysis
-                openai_analysis = analyze_resume_strengths_weaknesses(resume_text, job_description)
-                
-                # Get ATS score from OpenAI if we don't have one from MAANG
-                if ats_score is None:
-                    ats_score = calculate_accurate_ats_score(resume_text, job_description, skills)
-                
-                # Find matching jobs
-                job_matches = find_matching_jobs(resume_text, job_df, skills=skills, top_n=5)
-                
-                # Combine results
-                results = {
-                    'success': True,
-                    'text': resume_text,
-                    'skills': skills,
-                    'sections': sections,
-                    'entities': entities,
-                    'ats_score': ats_score,
-                    'analysis': openai_analysis,
-                    'top_job': job_matches[0]['title'] if job_matches else "Unknown",
-                    'job_recommendations': job_matches,
-                    'score_breakdown': score_breakdown
-                }
-                
-                # Store in database
-                candidate = Candidate(
-                    uuid=session_id,
-                    name=basic_info.get('name', ''),
-                    email=basic_info.get('email', ''),
-                    user_id=current_user.id,
-                    phone=basic_info.get('phone', '')
-                )
-                db.session.add(candidate)
-                db.session.flush()  # Get an ID for the candidate
-                
-                # Add skills
-                for skill in skills:
-                    candidate_skill = CandidateSkill(
-                        candidate_id=candidate.id,
-                        skill_name=skill
-                    )
-                    db.session.add(candidate_skill)
-                
-                # Format improvement suggestions for storage
-                if isinstance(openai_analysis.get('suggestions', []), list):
-                    improvement_text = "\n".join(openai_analysis.get('suggestions', []))
-                else:
-                    improvement_text = str(openai_analysis.get('suggestions', ""))
-                
-                # Create analysis record
-                analysis = ResumeAnalysis(
-                    candidate_id=candidate.id,
-                    resume_text=resume_text,
-                    resume_filename=filename,
-                    ats_score=ats_score,
-                    improvement_suggestions=improvement_text
-                )
-                db.session.add(analysis)
-                db.session.commit()
-                
-                # Store analysis ID in session
-                session['analysis_id'] = analysis.id
-                
-                return jsonify(results)
-                
-            except Exception as e:
-                logging.error(f"Error processing resume with enhanced analyzer: {str(e)}")
-                return jsonify({
-                    'success': False, 
-                    'error': 'Error processing resume: ' + str(e)
-                })
+                analysis = _enqueue_upload(file, MODE_ENHANCED)
+            except QuotaExceededError as e:
+                return _quota_exceeded_response(e)
+            if not analysis:
+                return _queue_full_response()
+            return _job_accepted_response(analysis)
                 
         return jsonify({
             'success': False,
@@ -1358,7 +1102,8 @@ Ensure your contact information is clearly visible.
                 file.save(file_path)
                 
                 # Extract text from the uploaded file
-                resume_text = analyze_resume(file_path)
+                document = analyze_resume_document(file_path)
+                resume_text = document["text"]
                 
                 # Log file and extraction details for debugging
                 logging.info(f"[ENHANCED] Processing file: {filename}, Session ID: {session_id}")
@@ -1367,7 +1112,7 @@ Ensure your contact information is clearly visible.
                 # Extract basic information, skills, sections, and entities
                 basic_info = extract_basic_info(resume_text)
                 skills = extract_skills(resume_text)
-                sections = preprocess_and_segment(resume_text)
+                sections = preprocess_and_segment(resume_text, document["lines"])
                 entities = extract_entities(resume_text)
                 
                 # Log extracted skills
@@ -1382,9 +1127,9 @@ Ensure your contact information is clearly visible.
                     from utils.maang_ats_scorer import calculate_resume_ats_score
                     
                     # Get job descriptions for scoring
-                    job_df = pd.read_csv('attached_assets/job_title_des.csv')
-                    job_titles = job_df['Job Title'].tolist()[:5]
-                    job_descriptions = job_df['Job Description'].tolist()[:5]
+                    catalog = get_title_catalog()
+                    job_titles = list(catalog.titles[:5])
+                    job_descriptions = list(catalog.descriptions[:5])
                     
                     if job_descriptions:
                         logging.info("[ENHANCED] Calculating MAANG ATS score...")
@@ -1493,7 +1238,11 @@ Ensure your contact information is clearly visible.
                     resume_text=resume_text,
                     resume_filename=filename,
                     ats_score=openai_results['ats_score'],
-                    improvement_suggestions=improvement_text
+                    improvement_suggestions=improvement_text,
+                    extraction_artifact=dump_artifact(build_artifact(
+                        resume_text, basic_info=basic_info, skills=skills, sections=sections, entities=entities
+                    )),
+                    extraction_version=ARTIFACT_VERSION
                 )
                 db.session.add(analysis)
                 db.session.commit()
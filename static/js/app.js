@@ -44,11 +44,14 @@ document.addEventListener('DOMContentLoaded', function() {
             })
             .then(response => response.json())
             .then(data => {
-                setLoading(false);
-                
-                if (data.success) {
+                if (data.success && data.status_url) {
+                    // Processing happens in the background; poll until the results are ready
+                    pollJobStatus(data.status_url);
+                } else if (data.success) {
+                    setLoading(false);
                     displayResults(data);
                 } else {
+                    setLoading(false);
                     showAlert(data.error || 'An error occurred while processing your resume', 'danger');
                 }
             })
@@ -60,6 +63,28 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Poll a background upload job and display its results once done
+    function pollJobStatus(statusUrl) {
+        fetch(statusUrl)
+            .then(response => response.json())
+            .then(data => {
+                if (data.success && data.status === 'done') {
+                    setLoading(false);
+                    displayResults(data.results);
+                } else if (data.success && data.status === 'queued') {
+                    setTimeout(() => pollJobStatus(statusUrl), 1500);
+                } else {
+                    setLoading(false);
+                    showAlert(data.error || 'An error occurred while processing your resume', 'danger');
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                setLoading(false);
+                showAlert('An error occurred while checking your resume status. Please try again.', 'danger');
+            });
+    }
+
     // Helper functions
     function showAlert(message, type = 'danger') {
         alertContainer.innerHTML = `
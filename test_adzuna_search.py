@@ -0,0 +1,54 @@
+"""
+Test script for the hedged Adzuna search, run against the local stub server.
+
+Checks that the first non-empty variant wins, that a slow API cannot hold a
+search past its deadline, and that a failing API gets each variant once.
+"""
+
+import time
+import logging
+from utils import adzuna_enhanced
+from utils.adzuna_enhanced import _build_attempts, _race_attempts
+from utils.adzuna_stub_server import start_stub_server
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def run_race(monkeypatch, deadline_seconds=5, **stub_config):
+    server, base_url = start_stub_server(**stub_config)
+    monkeypatch.setattr(adzuna_enhanced, "BASE_URL", base_url)
+    try:
+        attempts = _build_attempts("python developer", "Remote", "gb", 1, 5)
+        start = time.monotonic()
+        results, winner = _race_attempts(attempts, time.monotonic() + deadline_seconds)
+        elapsed = time.monotonic() - start
+        logger.info(f"Race won by {winner} after {elapsed:.2f}s, {server.config.requests} requests")
+        return results, winner, elapsed, server.config.requests
+    finally:
+        server.shutdown()
+
+
+def test_first_non_empty_variant_wins(monkeypatch):
+    results, winner, elapsed, requests = run_race(monkeypatch, empty_countries=["gb"])
+    assert len(results) == 5
+    assert winner.startswith("us")
+    # The two empty gb variants, then us; later countries are never sent
+    assert requests <= 4
+
+
+def test_slow_api_is_cut_off_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(adzuna_enhanced, "HEDGE_DELAY", 0.2)
+    results, winner, elapsed, requests = run_race(monkeypatch, deadline_seconds=0.5, latency_ms=3000)
+    assert results == [] and winner is None
+    assert elapsed < 1.0
+    # Hedges launched 0.2s apart: only the first few were sent before the deadline
+    assert requests <= 4
+
+
+def test_failing_api_gets_each_variant_once(monkeypatch):
+    results, winner, elapsed, requests = run_race(monkeypatch, error_rate=1.0)
+    assert results == [] and winner is None
+    # 5 countries x 2 variants, without transport-level retries on top
+    assert requests == 10
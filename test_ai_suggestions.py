@@ -0,0 +1,96 @@
+"""
+Test script for the background AI suggestions state kept on ResumeAnalysis.
+
+Checks that queued suggestions are pending until the task stores them, and
+that a request whose task was lost (e.g. with a restarted worker) stops
+being pending after SUGGESTIONS_TIMEOUT and shows the fallback text.
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from models import db, User, Candidate, ResumeAnalysis
+from utils import ai_suggestions
+from utils.ai_suggestions import queue_suggestions, suggestions_pending
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FALLBACK = "## Resume Suggestions\n- Use strong action verbs"
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'suggestions.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def analysis(app):
+    user = User(username="jane", email="jane@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    candidate = Candidate(uuid="c-1", name="Jane", user_id=user.id)
+    db.session.add(candidate)
+    db.session.flush()
+    analysis = ResumeAnalysis(candidate_id=candidate.id, resume_text="Python developer")
+    db.session.add(analysis)
+    db.session.commit()
+    return analysis
+
+
+def test_pending_until_the_task_stores_suggestions(app, analysis):
+    release = threading.Event()
+
+    def generator(text):
+        release.wait(5)
+        return f"AI suggestions for: {text}"
+
+    queue_suggestions(app, analysis, FALLBACK, generator, analysis.resume_text)
+    assert suggestions_pending(analysis)
+    assert analysis.improvement_suggestions == FALLBACK
+
+    release.set()
+    for _ in range(50):
+        db.session.expire_all()
+        if not suggestions_pending(analysis):
+            break
+        time.sleep(0.1)
+    assert analysis.suggestions_status == "done"
+    assert analysis.improvement_suggestions == "AI suggestions for: Python developer"
+
+
+def test_lost_task_falls_back_after_timeout(app, analysis):
+    # Pending on the row, but no worker is generating it any more
+    analysis.improvement_suggestions = FALLBACK
+    analysis.suggestions_status = "pending"
+    analysis.suggestions_requested_at = datetime.utcnow()
+    db.session.commit()
+
+    assert suggestions_pending(analysis)
+    later = datetime.utcnow() + ai_suggestions.SUGGESTIONS_TIMEOUT
+    assert not suggestions_pending(analysis, now=later)
+
+    db.session.expire_all()
+    assert analysis.suggestions_status == "failed"
+    assert analysis.improvement_suggestions == FALLBACK
+    assert not suggestions_pending(analysis)
+
+
+def test_pending_without_request_time_is_not_pending(app, analysis):
+    # Rows marked pending before suggestions_requested_at existed
+    analysis.suggestions_status = "pending"
+    db.session.commit()
+    assert not suggestions_pending(analysis)
+    assert analysis.suggestions_status == "failed"
@@ -0,0 +1,23 @@
+"""
+Test script for the inputs that decide whether a stored analysis snapshot
+can be served.
+
+The resume hash must not depend on skill order, but must change with the
+resume text or the skills.
+"""
+
+import logging
+from utils.analysis_snapshot import resume_hash
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_resume_hash():
+    text = "Jane Doe\nSoftware Engineer\nPython, SQL"
+    base = resume_hash(text, ["python", "sql"])
+    assert resume_hash(text, ["sql", "python"]) == base
+    assert resume_hash(text + "\nDocker", ["python", "sql"]) != base
+    assert resume_hash(text, ["python", "sql", "docker"]) != base
+    assert resume_hash(None, []) == resume_hash("", [])
@@ -0,0 +1,47 @@
+"""
+Test script for the extraction artifact stored on ResumeAnalysis.
+
+Checks that sections are stored as offsets into the original resume text
+and read back as segmented, and that experience years are estimated from
+stated years or from the experience section's date ranges.
+"""
+
+import logging
+from utils.extraction_artifact import build_artifact, estimate_experience_years, section_texts
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESUME_TEXT = """Jane Doe
+jane@example.com
+
+Experience
+Software Engineer, Acme Corp
+  2016 - 2019
+Senior Engineer, Globex
+  2018 - 2021
+"""
+
+
+def test_sections_round_trip_through_offsets():
+    sections = {"Experience": "Software Engineer, Acme Corp 2016 - 2019 Senior Engineer, Globex 2018 - 2021",
+                "Skills": "", "Projects": "Not in the text"}
+    artifact = build_artifact(RESUME_TEXT, basic_info={"name": "Jane Doe", "email": "jane@example.com"},
+                              skills=["Python"], sections=sections, entities={})
+    logger.info(f"Artifact: {artifact}")
+
+    start = RESUME_TEXT.index("Software")
+    assert artifact["sections"]["Experience"] == {"start": start, "end": RESUME_TEXT.index("2021") + 4}
+    assert artifact["sections"]["Projects"] == {"text": "Not in the text"}
+    assert "Skills" not in artifact["sections"]
+    assert section_texts(artifact, RESUME_TEXT) == {"Experience": sections["Experience"],
+                                                    "Projects": "Not in the text"}
+    assert artifact["contact"] == {"name": "Jane Doe", "email": "jane@example.com", "phone": ""}
+    # 2016-2021 with the overlapping 2018-2019 counted once
+    assert artifact["experience_years"] == 5
+
+
+def test_stated_experience_wins():
+    assert estimate_experience_years("Engineer with 7+ years of experience. 2019 - 2020") == 7
+    assert estimate_experience_years("No dates here") is None
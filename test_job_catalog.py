@@ -0,0 +1,93 @@
+"""
+Test script for job catalog ingestion and full-text search (SQLite FTS5).
+
+Ingests a CSV and a JSONL file, checks that re-ingesting skips listings
+already in the catalog and rows without a title or description, and that
+search_catalog ranks listings by the resume's skills, through db.session or
+a separate engine.
+"""
+
+import json
+import logging
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+
+from models import db, JobListing
+from utils.job_catalog import catalog_version, get_candidate_jobs, ingest_files, search_catalog
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CSV_POSTINGS = """job_title,company,job_description,job_id
+Python Backend Engineer,Acme,"Build REST APIs in Python with Django, PostgreSQL and Docker.",csv-1
+Frontend Developer,Globex,"React, TypeScript and CSS for our customer dashboard.",csv-2
+Data Analyst,Initech,"SQL reporting and Tableau dashboards for the finance team.",csv-3
+No Description,Initech,,csv-4
+"""
+
+JSONL_POSTINGS = [
+    {"title": "DevOps Engineer", "company": "Umbrella", "description": "Kubernetes, Docker and AWS pipelines."},
+    {"title": "Machine Learning Engineer", "company": "Hooli",
+     "description": "Python, TensorFlow and machine learning models in production."},
+]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'catalog.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def catalog_files(tmp_path):
+    csv_path = tmp_path / "postings.csv"
+    csv_path.write_text(CSV_POSTINGS, encoding="utf-8")
+    jsonl_path = tmp_path / "postings.jsonl"
+    jsonl_path.write_text("\n".join(json.dumps(row) for row in JSONL_POSTINGS), encoding="utf-8")
+    return [str(csv_path), str(jsonl_path)]
+
+
+def test_ingest_and_reingest(app, catalog_files):
+    empty_version = catalog_version()
+    stats = ingest_files(catalog_files, chunk_size=2)
+    logger.info(f"Ingest: {stats}")
+    assert stats == {"read": 6, "inserted": 5, "skipped": 1}
+    assert JobListing.query.filter_by(source="catalog").count() == 5
+
+    listing = JobListing.query.filter_by(source_id="csv-1").one()
+    assert listing.title == "Python Backend Engineer"
+    assert "python" in [skill.lower() for skill in json.loads(listing.skills)]
+    assert catalog_version() != empty_version
+
+    # Same files again: every listing is already in the catalog
+    version = catalog_version()
+    assert ingest_files(catalog_files)["inserted"] == 0
+    assert JobListing.query.filter_by(source="catalog").count() == 5
+    assert catalog_version() == version
+
+
+def test_search_ranks_by_skills(app, catalog_files):
+    assert search_catalog("", ["Python"]) == []
+    ingest_files(catalog_files)
+
+    titles = [listing["job_title"] for listing in search_catalog("", ["Kubernetes", "AWS"])]
+    assert titles[0] == "DevOps Engineer"
+    titles = [listing["job_title"] for listing in search_catalog("", ["Python"])]
+    assert set(titles) == {"Python Backend Engineer", "Machine Learning Engineer"}
+    assert search_catalog("", ["COBOL"]) == []
+
+    # A separate engine, as the upload pipeline workers use, sees the same index
+    engine = create_engine(db.engine.url)
+    assert search_catalog("", ["Python"], engine=engine) == search_catalog("", ["Python"])
+    engine.dispose()
+
+    frame = get_candidate_jobs("", ["React"])
+    assert list(frame["job_title"]) == ["Frontend Developer"]
@@ -0,0 +1,37 @@
+"""
+Test script for near-duplicate job listing detection.
+
+Checks that reposts under a different title are dropped while distinct roles
+with the same title are kept.
+"""
+
+import logging
+from utils.job_dedupe import dedupe_jobs, signature_bytes
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = ("We are looking for an experienced backend engineer to design scalable APIs in Python and "
+               "Django, own our PostgreSQL data layer, mentor junior developers, and work closely with "
+               "product on roadmap planning. Remote friendly, competitive salary and equity.")
+
+ORIGINAL = {"title": "Senior Python Developer", "company": "Acme Ltd", "description": DESCRIPTION}
+REPOST = {"title": "Python Engineer (Senior) - Remote", "company": "Acme Ltd",
+          "description": "<p>" + DESCRIPTION + " Apply now!</p>"}
+DIFFERENT_ROLE = {"title": "Senior Python Developer", "company": "Acme Ltd",
+                  "description": "Lead our data science team building ML models in PyTorch, run experiments "
+                                 "and present insights to executives. Strong statistics background required."}
+
+
+def test_reposts_dropped_distinct_roles_kept():
+    """A retitled repost is a duplicate; the same title over a different job is not."""
+    unique = dedupe_jobs([ORIGINAL, REPOST, DIFFERENT_ROLE])
+    logger.info(f"Kept: {[job['description'][:30] for job in unique]}")
+    assert unique == [ORIGINAL, DIFFERENT_ROLE]
+
+
+def test_stored_signature_used():
+    """Listings loaded from JobListing reuse their stored signature."""
+    stored = dict(REPOST, minhash=signature_bytes(ORIGINAL), description="")
+    assert dedupe_jobs([ORIGINAL, stored]) == [ORIGINAL]
@@ -0,0 +1,96 @@
+"""
+Test script for the database-backed Adzuna result cache, run against the
+local stub server.
+
+Walks one query through its states: missing (fetched live and stored),
+fresh (served from the database), stale (served from the database while a
+background refresh stores new results) and expired with Adzuna down (old
+rows still beat the fallback listings).
+"""
+
+import time
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from models import db, JobListing
+from utils import adzuna_enhanced, job_listing_store
+from utils.job_listing_store import get_jobs, make_query_key, store_jobs
+from utils.adzuna_stub_server import start_stub_server
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'jobs.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server, base_url = start_stub_server()
+    monkeypatch.setattr(adzuna_enhanced, "BASE_URL", base_url)
+    yield server
+    server.shutdown()
+
+
+def age_rows(query_key, age):
+    for row in JobListing.query.filter_by(query_key=query_key):
+        row.fetched_at = datetime.utcnow() - age
+    db.session.commit()
+
+
+def test_fresh_stale_and_revalidate(app, stub):
+    query_key = make_query_key("python developer")
+
+    # Missing: fetched live and stored
+    jobs = get_jobs(app, "python developer")
+    assert len(jobs) == 5
+    assert stub.config.requests == 1
+    assert JobListing.query.filter_by(query_key=query_key).count() == 5
+
+    # Fresh: served from the database
+    assert [job["source_id"] for job in get_jobs(app, "python developer")] == [job["source_id"] for job in jobs]
+    assert stub.config.requests == 1
+
+    # Stale: served from the database, refreshed in the background
+    age_rows(query_key, job_listing_store.FRESH_TTL + timedelta(minutes=1))
+    assert len(get_jobs(app, "python developer")) == 5
+    for _ in range(50):
+        if stub.config.requests == 2 and not job_listing_store._refreshing:
+            break
+        time.sleep(0.1)
+    assert stub.config.requests == 2
+    db.session.expire_all()
+    oldest = min(row.fetched_at for row in JobListing.query.filter_by(query_key=query_key))
+    assert datetime.utcnow() - oldest < job_listing_store.FRESH_TTL
+
+    # Expired and Adzuna failing: the old rows are served instead of the fallback listings
+    age_rows(query_key, job_listing_store.MAX_STALE + timedelta(days=1))
+    stub.config.error_rate = 1.0
+    served = get_jobs(app, "python developer")
+    assert {job["source_id"] for job in served} == {job["source_id"] for job in jobs}
+
+
+def test_missing_query_with_adzuna_down_uses_fallback(app, stub):
+    stub.config.error_rate = 1.0
+    jobs = get_jobs(app, "python developer")
+    assert jobs == adzuna_enhanced.get_fallback_jobs()
+    assert JobListing.query.count() == 0
+
+
+def test_missing_fields_are_stored_as_null(app):
+    store_jobs("q|remote|gb", [{"title": "Developer", "company": "Acme", "source_id": "1",
+                                "description": "Python role"}])
+    row = JobListing.query.filter_by(source_id="1").one()
+    assert row.salary_min is None and row.salary_max is None and row.posted_at is None
@@ -0,0 +1,44 @@
+"""
+Test script for resume-aware job re-ranking.
+
+Checks whole-token skill matching, that stronger matches rank first, and that
+scores are deterministic.
+"""
+
+import logging
+from utils.job_ranker import rank_jobs, stable_base_score, build_skill_matcher, skill_incidence_matrix
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOBS = [
+    {"title": "Office Manager", "description": "Coordinate schedules and vendors."},
+    {"title": "Java Developer", "description": "Build services in Java and SQL."},
+    {"title": "Python Developer", "description": "Python, Django, SQL and Docker on AWS."},
+]
+
+
+def test_whole_token_matching():
+    """'java' does not match inside 'javascript', multi-word skills match as phrases."""
+    matcher, normalized, columns = build_skill_matcher(["Java", "Machine Learning"])
+    matrix = skill_incidence_matrix(["JavaScript only", "java and machine  learning", "Machine learning"],
+                                    matcher, columns)
+    assert matrix.tolist() == [[False, False], [True, False], [False, True]]
+
+
+def test_best_match_ranks_first():
+    """Listings covering more (and better tested) skills come first."""
+    ranked = rank_jobs(JOBS, ["Python", "SQL", "Docker", "AWS"], {"Python": 90}, resume_ats_score=80)
+    logger.info(f"Ranking: {[(job['title'], job['match_score']) for job in ranked]}")
+    assert ranked[0]["title"] == "Python Developer"
+    assert ranked[-1]["title"] == "Office Manager"
+    assert set(ranked[0]["matched_skills"]) == {"python", "sql", "docker", "aws"}
+    assert all(65 <= job["match_score"] <= 95 for job in ranked)
+
+
+def test_deterministic():
+    """Same input, same output - no per-process hash() involved."""
+    assert rank_jobs(JOBS, ["SQL"]) == rank_jobs(JOBS, ["SQL"])
+    assert stable_base_score("12345") == stable_base_score("12345")
+    assert 70 <= stable_base_score(None) < 95
@@ -0,0 +1,100 @@
+"""
+Test script for cursor-paginated job recommendations, run against the local
+Adzuna stub server.
+
+Walks every page of a recommendation list and checks that the pages follow
+the ranked blocks exactly (no listing repeated or skipped across block
+boundaries), and that forged, tampered or foreign cursors are rejected.
+"""
+
+import uuid
+import logging
+
+import pytest
+from flask import Flask
+
+from models import db
+from utils import adzuna_enhanced, job_recommendations
+from utils.job_recommendations import (
+    BLOCKS_NAMESPACE, _block_key, decode_cursor, encode_cursor, get_recommendation_page
+)
+from utils.shared_cache import cache_get
+from utils.adzuna_stub_server import start_stub_server
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    server, base_url = start_stub_server()
+    monkeypatch.setattr(adzuna_enhanced, "BASE_URL", base_url)
+    monkeypatch.setattr(job_recommendations, "BLOCK_SIZE", 8)
+    monkeypatch.setattr(job_recommendations, "MAX_BLOCKS", 3)
+
+    app = Flask(__name__)
+    app.secret_key = "test-secret"
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'jobs.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+    server.shutdown()
+
+
+def make_features():
+    return {
+        # Unique per run, so blocks cached by earlier runs are never reused
+        "key": uuid.uuid4().hex,
+        "skills": ["Python", "SQL", "Docker", "AWS"],
+        "skill_levels": {"Python": 80},
+        "ats_score": 75,
+        "job_titles": ["Python Developer", "Data Engineer"]
+    }
+
+
+def test_pages_follow_the_ranked_blocks(app):
+    features = make_features()
+    served = []
+    cursor = None
+    for _ in range(50):
+        state = decode_cursor(app, cursor, 7)
+        page, cursor = get_recommendation_page(app, features, 7, state, limit=5)
+        assert len(page) <= 5
+        served.extend(job["id"] for job in page)
+        if cursor is None:
+            break
+    assert cursor is None
+
+    expected = []
+    for block in range(1, job_recommendations.MAX_BLOCKS + 1):
+        found, listings = cache_get(BLOCKS_NAMESPACE, _block_key(features, "Python Developer", block))
+        assert found
+        keys = [(-job["match_score"], job["id"]) for job in listings]
+        assert keys == sorted(keys)
+        expected.extend(job["id"] for job in listings)
+    logger.info(f"Served {len(served)} listings from {job_recommendations.MAX_BLOCKS} blocks")
+    assert served == expected
+    assert len(set(served)) == len(served)
+
+
+def test_forged_and_foreign_cursors_are_rejected(app):
+    features = make_features()
+    page, cursor = get_recommendation_page(app, features, 7, limit=3)
+    assert len(page) == 3 and cursor
+    assert decode_cursor(app, cursor, 7)["a"] == 7
+
+    # Another user's analysis
+    with pytest.raises(ValueError):
+        decode_cursor(app, cursor, 8)
+    # Tampered payload
+    with pytest.raises(ValueError):
+        decode_cursor(app, cursor[:-2] + ("AA" if not cursor.endswith("AA") else "BB"), 7)
+    # Well-formed, but signed with another key
+    other = Flask(__name__)
+    other.secret_key = "another-secret"
+    with pytest.raises(ValueError):
+        decode_cursor(app, encode_cursor(other, {"a": 7, "q": "Python Developer", "b": 2}), 7)
+    assert decode_cursor(app, "", 7) is None
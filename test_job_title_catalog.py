@@ -0,0 +1,49 @@
+"""
+Test script for the shared job title catalog.
+
+Checks that descriptions with unquoted commas parse, that frames handed out
+are independent copies, and that the catalog reloads when the file changes.
+"""
+
+import logging
+import utils.job_title_catalog as job_title_catalog
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_CSV = """job_title,description
+Software Engineer,Design, develop, test, and maintain software applications
+Data Scientist,Analyze data with Python and SQL
+"""
+
+
+def test_parse_unquoted_commas():
+    """Everything after the title is the description, commas included."""
+    rows = job_title_catalog.parse_catalog(CATALOG_CSV)
+    assert rows == [
+        ("Software Engineer", "Design, develop, test, and maintain software applications"),
+        ("Data Scientist", "Analyze data with Python and SQL"),
+    ]
+
+
+def test_hot_reload_and_isolation(tmp_path, monkeypatch):
+    """Edits to the file are picked up; callers cannot mutate the shared catalog."""
+    path = tmp_path / "jobs.csv"
+    path.write_text(CATALOG_CSV)
+    monkeypatch.setattr(job_title_catalog, "CATALOG_PATH", str(path))
+    monkeypatch.setattr(job_title_catalog, "RELOAD_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(job_title_catalog, "_catalog", None)
+
+    catalog = job_title_catalog.get_title_catalog()
+    assert catalog.titles == ("Software Engineer", "Data Scientist")
+    assert "python" in catalog.skill_profiles[1]
+
+    frame = catalog.as_frame()
+    frame.columns = ["a", "b", "c"]
+    assert job_title_catalog.get_title_catalog().as_frame().columns.tolist() == ["job_title", "description", "skills"]
+
+    path.write_text(CATALOG_CSV + "Cloud Architect,Design cloud strategies on AWS\n")
+    reloaded = job_title_catalog.get_title_catalog()
+    logger.info(f"Reloaded catalog: {reloaded.titles}")
+    assert len(reloaded) == 3 and reloaded.find_description("cloud architect") == "Design cloud strategies on AWS"
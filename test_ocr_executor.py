@@ -0,0 +1,43 @@
+"""
+Test script for the parallel OCR executor.
+
+Checks that pages are only cut into bands at blank rows and that the OCR
+concurrency slots are exclusive. Tesseract itself is not needed.
+"""
+
+import logging
+import numpy as np
+import pytest
+import utils.ocr_executor as ocr_executor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_split_bands_at_blank_rows():
+    page = np.full((3300, 2550), 255, dtype=np.uint8)
+    # Text lines 40px tall every 80px
+    for top in range(100, 3200, 80):
+        page[top:top + 40, 100:2400] = 0
+
+    bands = ocr_executor.split_bands(page, 4)
+    logger.info(f"Band heights: {[band.shape[0] for band in bands]}")
+    assert len(bands) == 4
+    assert sum(band.shape[0] for band in bands) == page.shape[0]
+    for band in bands[1:]:
+        # Every cut is in a gap between lines
+        assert band[0].min() == 255
+
+    assert len(ocr_executor.split_bands(page[:1000], 4)) == 1
+
+
+def test_ocr_slots_are_exclusive(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_executor, "SLOT_DIR", str(tmp_path))
+    monkeypatch.setattr(ocr_executor, "MAX_CONCURRENT", 1)
+    with ocr_executor.ocr_slot():
+        with pytest.raises(TimeoutError):
+            with ocr_executor.ocr_slot(timeout=0.1):
+                pass
+    with ocr_executor.ocr_slot(timeout=0.1):
+        pass
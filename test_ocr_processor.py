@@ -0,0 +1,87 @@
+"""
+Test script for the adaptive OCR preprocessing steps.
+
+Checks page size normalization and that denoising is skipped on clean
+images but applied to noisy ones. Tesseract itself is not needed.
+"""
+
+import logging
+import numpy as np
+from PIL import Image, ImageDraw
+import utils.ocr_processor as ocr_processor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _page(width=1275, height=1650):
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    for i in range(30):
+        draw.text((100, 100 + i * 45), f"Software Engineer - Python, SQL, Docker ({i})", fill=0)
+    return np.asarray(img)
+
+
+def test_target_size():
+    """Huge photos are scaled down, small scans up (at most 2x), letter pages at 300 DPI kept."""
+    assert ocr_processor.target_size((6000, 7760)) == (2552, 3300)
+    assert ocr_processor.target_size((800, 1000)) == (1600, 2000)
+    assert ocr_processor.target_size((2550, 3300)) == (2550, 3300)
+
+
+def test_denoise_only_noisy_images(monkeypatch):
+    # Stand-in for the expensive denoiser; only whether it runs matters here
+    monkeypatch.setattr(ocr_processor.cv2, "fastNlMeansDenoising", lambda gray, *args: gray)
+    clean = _page()
+
+    report = {}
+    ocr_processor.preprocess_image(clean, report)
+    logger.info(f"Clean image: {report}")
+    assert not report["denoised"] and "denoise" not in report["steps"]
+
+    noisy = np.clip(clean + np.random.default_rng(0).normal(0, 15, clean.shape), 0, 255).astype(np.uint8)
+    report = {}
+    binary = ocr_processor.preprocess_image(noisy, report)
+    logger.info(f"Noisy image: {report}")
+    assert report["denoised"] and "denoise" in report["steps"]
+    assert binary.shape == noisy.shape
+
+
+def _data(words):
+    """image_to_data style dict from (block, par, line, text, conf, left, top) tuples"""
+    keys = ("block_num", "par_num", "line_num", "text", "conf", "left", "top")
+    data = {key: [word[i] for word in words] for i, key in enumerate(keys)}
+    data["width"] = [10 * len(word[3]) for word in words]
+    data["height"] = [20] * len(words)
+    return data
+
+
+def test_layout_lines_and_retry(monkeypatch):
+    data = _data([
+        (1, 1, 1, "Jane", 96, 100, 50), (1, 1, 1, "Doe", 95, 150, 50),
+        (2, 1, 1, "", -1, 0, 0),
+        (2, 1, 1, "EXPERlENCE", 30, 100, 200),
+        (2, 1, 2, "Engineer,", 90, 100, 240), (2, 1, 2, "2O19", 88, 200, 240),
+    ])
+    lines = ocr_processor.layout_lines(data)
+    assert [line["text"] for line in lines] == ["Jane Doe", "EXPERlENCE", "Engineer, 2O19"]
+    assert lines[0]["box"] == [100, 50, 80, 20]
+    assert ocr_processor.lines_to_text(lines) == "Jane Doe\n\nEXPERlENCE\nEngineer, 2O19"
+
+    # Only the low-confidence line is read again, as a single line
+    calls = []
+    def read_data(image, config):
+        calls.append(config)
+        return _data([(1, 1, 1, "EXPERIENCE", 91, 5, 5)])
+    monkeypatch.setattr(ocr_processor, "_read_data", read_data)
+    report = {}
+    ocr_processor._retry_low_confidence(np.zeros((400, 400), dtype=np.uint8), lines, "--oem 3 --psm 6", report)
+    assert calls == ["--oem 3 --psm 7"]
+    assert report == {"retried_lines": 1, "improved_lines": 1}
+    assert lines[1]["text"] == "EXPERIENCE" and lines[1]["block"] == 2
+
+
+def test_post_process_text_only_fixes_digits():
+    text = ocr_processor.post_process_text("OpenAI, Oracle and IBM\n\n\n\nJan 2O19 - May 2O2l")
+    assert text == "OpenAI, Oracle and IBM\n\nJan 2019 - May 2021"
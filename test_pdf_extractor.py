@@ -0,0 +1,118 @@
+"""
+Test script for the PDF text layer check used by the hybrid PDF/OCR extraction,
+and for the page cap and per-page timeouts of extract_pdf.
+
+Pages with no text, unmapped glyphs or unreadable characters must be sent
+to OCR; pages with ordinary resume text must not. Pages past the cap are
+never read, and a page that runs over its time budget is reported and left
+out of the text without holding up the others.
+"""
+
+import time
+import logging
+from utils import pdf_extractor
+from utils.pdf_extractor import extract_page, extract_pdf, text_layer_quality
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_text_layer_quality():
+    assert text_layer_quality("Senior Software Engineer with 5 years of Python, SQL and AWS experience") == "ok"
+    assert text_layer_quality("") == "missing"
+    assert text_layer_quality("  \n Page 2 \n ") == "missing"
+    assert text_layer_quality("(cid:12)(cid:44)(cid:3)(cid:77) " * 10) == "garbage"
+    assert text_layer_quality("\x01\x02\x03\x04\x05" * 10 + " resume") == "garbage"
+    assert text_layer_quality("�� ��� " * 10) == "garbage"
+
+
+def make_pdf(page_texts):
+    """Minimal PDF with one line of Helvetica text per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"",
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 3 0 R >> >> >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+PAGE_TEXTS = [f"Page {n} Senior Software Engineer with Python and SQL experience" for n in range(1, 7)]
+SLOW_PAGE = 5
+
+
+def slow_extract_page(source, index, layout=False):
+    """extract_page, except that one page hangs"""
+    if index == SLOW_PAGE:
+        time.sleep(10)
+    return extract_page(source, index, layout)
+
+
+def hung_second_page(source, index, layout=False):
+    """extract_page, except that the second page hangs"""
+    if index == 1:
+        time.sleep(10)
+    return extract_page(source, index, layout)
+
+
+def test_pages_past_the_cap_are_not_read(monkeypatch):
+    monkeypatch.setattr(pdf_extractor, "OCR_FALLBACK", False)
+    result = extract_pdf(make_pdf(PAGE_TEXTS), max_pages=3)
+    assert result["page_count"] == 6
+    assert result["pages_read"] == 3
+    assert result["truncated"] is True
+    assert [page["page"] for page in result["pages"]] == [1, 2, 3]
+    assert "Page 3 " in result["text"] and "Page 4 " not in result["text"]
+
+
+def test_slow_page_times_out(tmp_path, monkeypatch):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(PAGE_TEXTS))
+    monkeypatch.setattr(pdf_extractor, "OCR_FALLBACK", False)
+    monkeypatch.setattr(pdf_extractor, "EXTRACT_WORKERS", 2)
+    monkeypatch.setattr(pdf_extractor, "extract_page", slow_extract_page)
+    pdf_extractor._reset_pool()
+
+    start = time.monotonic()
+    result = extract_pdf(str(path), page_timeout=1.0)
+    elapsed = time.monotonic() - start
+    logger.info(f"Extracted with one hung page in {elapsed:.2f}s: {result['pages']}")
+    pdf_extractor._reset_pool()
+
+    statuses = {page["page"]: page["status"] for page in result["pages"]}
+    assert statuses == {1: "ok", 2: "ok", 3: "ok", 4: "ok", 5: "ok", 6: "timeout"}
+    assert "Page 5 " in result["text"] and "Page 6 " not in result["text"]
+    # Page 6 queues behind four others on two workers: its budget is three timeouts
+    assert elapsed < 5
+
+
+def test_short_pdf_on_one_worker_keeps_the_budget(monkeypatch):
+    # The usual two page resume, with no spare workers: still bounded per page
+    monkeypatch.setattr(pdf_extractor, "OCR_FALLBACK", False)
+    monkeypatch.setattr(pdf_extractor, "EXTRACT_WORKERS", 1)
+    monkeypatch.setattr(pdf_extractor, "extract_page", hung_second_page)
+    pdf_extractor._reset_pool()
+
+    start = time.monotonic()
+    result = extract_pdf(make_pdf(PAGE_TEXTS[:2]), page_timeout=1.0)
+    elapsed = time.monotonic() - start
+    pdf_extractor._reset_pool()
+
+    assert [page["status"] for page in result["pages"]] == ["ok", "timeout"]
+    assert "Page 1 " in result["text"] and "Page 2 " not in result["text"]
+    assert elapsed < 4
@@ -0,0 +1,75 @@
+"""
+Test script for token-budget prompt compaction.
+
+Checks that long resumes are packed into the feature budget, section order is
+preserved, and short resumes pass through untouched; and that long job
+descriptions keep their requirements within the feature's budget.
+"""
+
+import logging
+from utils.prompt_compactor import (
+    compact_job_description, compact_resume, count_tokens, split_sections, get_compaction_stats,
+    JOB_DESCRIPTION_TOKEN_BUDGETS
+)
+from test_ats_scorer import SE_RESUME, GOOGLE_SE_JOB
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_sections_detected():
+    """Resume headings are recognised and the contact block becomes the header."""
+    names = [name for name, _ in split_sections(SE_RESUME)]
+    logger.info(f"Sections: {names}")
+    assert names[0] == "Header"
+    assert "Skills" in names and "Experience" in names and "Education" in names
+
+
+def test_compaction_respects_budget():
+    """A long resume is cut to the budget, keeping the header and document order."""
+    long_resume = SE_RESUME + "\nEXPERIENCE\n" + ("- Built and shipped backend services in Python\n" * 200)
+    before = get_compaction_stats()["tokens_saved"]
+
+    compacted = compact_resume(long_resume, "skills_extraction", max_tokens=300, job_description=GOOGLE_SE_JOB)
+    logger.info(f"Compacted {count_tokens(long_resume)} -> {count_tokens(compacted)} tokens")
+
+    assert count_tokens(compacted) <= 300
+    assert compacted.startswith("JOHN DOE")
+    assert compacted.index("SKILLS") < compacted.index("EXPERIENCE")
+    assert get_compaction_stats()["tokens_saved"] > before
+
+
+def test_short_resume_unchanged():
+    """Resumes already inside the budget are returned as-is."""
+    assert compact_resume(SE_RESUME, "skills_extraction", max_tokens=5000) == SE_RESUME
+    assert compact_resume("", "chatbot") == ""
+
+
+
+def test_job_description_keeps_requirements():
+    """A long job description is trimmed to the feature budget, requirements first."""
+    job_description = (
+        "About Us\n" + "We are a fast growing company with offices around the world. " * 60 + "\n"
+        "Requirements:\n- 5+ years of Python\n- Kubernetes in production\n- PostgreSQL tuning\n"
+        "Benefits:\n" + "- Generous vacation and a friendly team\n" * 40
+    )
+    before = get_compaction_stats()["calls"]
+
+    compacted = compact_job_description(job_description, "default")
+    logger.info(f"Job description {count_tokens(job_description)} -> {count_tokens(compacted)} tokens")
+    assert count_tokens(compacted) <= JOB_DESCRIPTION_TOKEN_BUDGETS["default"]
+    assert "Kubernetes in production" in compacted and "PostgreSQL tuning" in compacted
+    assert get_compaction_stats()["calls"] == before + 1
+
+    # Job-match analysis gets a larger budget than the other features
+    assert count_tokens(compact_job_description(job_description, "job_analysis")) > count_tokens(compacted)
+    assert compact_job_description(GOOGLE_SE_JOB, "job_analysis") == GOOGLE_SE_JOB
+
+
+if __name__ == "__main__":
+    test_sections_detected()
+    test_compaction_respects_budget()
+    test_short_resume_unchanged()
+    test_job_description_keeps_requirements()
+    logger.info("All tests completed")
@@ -0,0 +1,43 @@
+"""
+Test script for chunked NER in the resume analyzer.
+
+Long resumes are cut into chunks at line and sentence boundaries, NER runs
+on the chunks through nlp.pipe, and text past the character budget is
+dropped. A blank spaCy pipeline with an entity ruler stands in for the
+statistical model.
+"""
+
+import logging
+import spacy
+import utils.resume_analyzer as resume_analyzer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_split_into_chunks():
+    text = "Jane Doe\n" + "Built data pipelines at Acme Corp. " * 300 + "\nSkills: Python"
+    chunks = resume_analyzer.split_into_chunks(text, max_chars=1000)
+    logger.info(f"Chunk sizes: {[len(chunk) for chunk in chunks]}")
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert all(chunk.rstrip().endswith(".") for chunk in chunks[1:-2])
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_ner_runs_on_budgeted_chunks(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    nlp.add_pipe("entity_ruler", name="ner").add_patterns([{"label": "ORG", "pattern": "Acme Corp"},
+                                                           {"label": "ORG", "pattern": "Globex"}])
+    monkeypatch.setattr(resume_analyzer, "nlp", nlp)
+    monkeypatch.setattr(resume_analyzer, "NER_CHUNK_CHARS", 200)
+    monkeypatch.setattr(resume_analyzer, "NER_MAX_CHARS", 2000)
+    assert resume_analyzer._unused_components() == ["sentencizer"]
+
+    text = "Engineer at Acme Corp, 2019 - 2021\n" + "Shipped features on time.\n" * 100 + "Engineer at Globex.\n"
+    entities = resume_analyzer.ner_entities(text)
+    # Globex is past the 2000 character budget
+    assert entities == [("Acme Corp", "ORG")]
+    assert resume_analyzer.extract_entities(text)["COMPANIES"] == ["Acme Corp"]
+    assert resume_analyzer.ner_entities_bulk(["At Globex", ""]) == [[("Globex", "ORG")], []]
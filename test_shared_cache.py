@@ -0,0 +1,105 @@
+"""
+Test script for the cross-process SQLite cache.
+
+Checks that results expire after their TTL, that empty results are kept for
+the shorter negative TTL, that the least recently used entries are evicted
+past the size bound, and that an unusable cache file fails open.
+"""
+
+import logging
+
+import pytest
+
+from utils import shared_cache
+from utils.shared_cache import shared_cache as cached, cache_get, cache_set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(shared_cache, "CACHE_PATH", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(shared_cache, "time", clock)
+    monkeypatch.setattr(shared_cache._local, "conn", None, raising=False)
+    return clock
+
+
+def test_results_expire_after_ttl(clock):
+    calls = []
+
+    @cached("test.ttl", ttl=60)
+    def search(keywords):
+        calls.append(keywords)
+        return [f"{keywords} job"]
+
+    assert search("python") == ["python job"]
+    clock.now += 59
+    assert search("python") == ["python job"]
+    assert calls == ["python"]
+
+    clock.now += 2
+    search("python")
+    assert calls == ["python", "python"]
+
+
+def test_empty_results_use_negative_ttl(clock):
+    calls = []
+    results = {"python": ["python job"], "cobol": []}
+
+    @cached("test.negative", ttl=600, negative_ttl=30)
+    def search(keywords):
+        calls.append(keywords)
+        return results[keywords]
+
+    search("python"), search("cobol")
+    before = shared_cache.get_cache_stats()["negative_hits"]
+    assert search("cobol") == []
+    assert shared_cache.get_cache_stats()["negative_hits"] == before + 1
+
+    clock.now += 31
+    search("python"), search("cobol")
+    assert calls == ["python", "cobol", "cobol"]
+
+
+def test_least_recently_used_entries_are_evicted(clock, monkeypatch):
+    monkeypatch.setattr(shared_cache, "MAX_ENTRIES", 10)
+    monkeypatch.setattr(shared_cache, "EVICTION_CHECK_INTERVAL", 1)
+    for i in range(10):
+        clock.now += 1
+        cache_set("test.lru", str(i), i, ttl=3600)
+    # Reading entry 0 makes entry 1 the least recently used
+    clock.now += 1
+    assert cache_get("test.lru", "0") == (True, 0)
+
+    clock.now += 1
+    cache_set("test.lru", "10", 10, ttl=3600)
+    assert cache_get("test.lru", "0") == (True, 0)
+    assert cache_get("test.lru", "1") == (False, None)
+    assert cache_get("test.lru", "10") == (True, 10)
+
+
+def test_unusable_cache_fails_open(tmp_path, monkeypatch):
+    # A directory cannot be opened as the cache database
+    monkeypatch.setattr(shared_cache, "CACHE_PATH", str(tmp_path))
+    monkeypatch.setattr(shared_cache._local, "conn", None, raising=False)
+    calls = []
+
+    @cached("test.fail_open", ttl=60)
+    def search(keywords):
+        calls.append(keywords)
+        return [keywords]
+
+    assert search("python") == ["python"]
+    assert search("python") == ["python"]
+    assert calls == ["python", "python"]
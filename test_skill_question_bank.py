@@ -0,0 +1,105 @@
+"""
+Test script for the persistent skill assessment question bank.
+
+Checks that an empty pool is seeded from the curated and fallback questions,
+that a user is not served the same question twice until the pool is
+exhausted and the rotation starts over, that refills are scheduled once a
+user has fewer than POOL_LOW_WATERMARK unseen questions left, and that a
+concurrent start of the same test does not fail.
+"""
+
+import logging
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+
+from models import db, User, SkillQuestion, ServedSkillQuestion
+from utils import skill_question_bank
+from utils.skill_question_bank import get_questions_for_user, normalize_skill
+from utils.openai_helper import fallback_skill_questions
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    refills = []
+    monkeypatch.setattr(skill_question_bank, "schedule_refill", lambda app, name: refills.append(name))
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'questions.db'}"
+    app.refills = refills
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def user_id(app):
+    user = User(username="jane", email="jane@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_empty_pool_is_seeded(app, user_id):
+    questions = get_questions_for_user(app, user_id, ["Docker"], limit=2)
+
+    fallback = {q["question"] for q in fallback_skill_questions("Docker")}
+    assert {q["question"] for q in questions} == fallback
+    assert all(q["skill"] == "Docker" for q in questions)
+    pool = SkillQuestion.query.filter_by(skill_key=normalize_skill("Docker")).all()
+    assert {q.source for q in pool} == {"seed"}
+    assert ServedSkillQuestion.query.filter_by(user_id=user_id).count() == 2
+
+
+def test_no_repeats_until_the_pool_is_exhausted(app, user_id):
+    # Python is seeded with its 5 curated questions and the 2 fallback ones
+    served = []
+    for _ in range(3):
+        served.extend(q["id"] for q in get_questions_for_user(app, user_id, ["Python"], limit=2))
+    pool_ids = {q.id for q in SkillQuestion.query.filter_by(skill_key="python")}
+    assert len(pool_ids) == 7
+    assert len(set(served)) == len(served) == 6
+
+    # One unseen question left, then the rotation starts over
+    last = get_questions_for_user(app, user_id, ["Python"], limit=2)
+    assert last[0]["id"] == (pool_ids - set(served)).pop()
+    assert last[1]["skill"] != "Python"  # generic filler, nothing unseen is left
+    restarted = get_questions_for_user(app, user_id, ["Python"], limit=2)
+    assert len({q["id"] for q in restarted}) == 2
+    assert {q["id"] for q in restarted} <= pool_ids
+    assert ServedSkillQuestion.query.filter_by(user_id=user_id).count() == 2
+
+
+def test_refill_scheduled_below_low_watermark(app, user_id, monkeypatch):
+    monkeypatch.setattr(skill_question_bank, "POOL_LOW_WATERMARK", 3)
+    # 7 questions: 4 unseen after the first test, 2 after the second
+    get_questions_for_user(app, user_id, ["Python"], limit=3)
+    assert app.refills == []
+    get_questions_for_user(app, user_id, ["Python"], limit=2)
+    assert app.refills == ["Python"]
+
+
+def test_concurrent_start_returns_the_questions(app, user_id, monkeypatch):
+    get_questions_for_user(app, user_id, ["Python"], limit=1)
+    engine = create_engine(db.engine.url)
+    shuffle = skill_question_bank.random.shuffle
+
+    def shuffle_after_another_start(questions):
+        # Another request of the same user records every question as served first
+        shuffle(questions)
+        with engine.begin() as conn:
+            for question in questions:
+                conn.execute(ServedSkillQuestion.__table__.insert().values(user_id=user_id, question_id=question.id))
+
+    monkeypatch.setattr(skill_question_bank.random, "shuffle", shuffle_after_another_start)
+    questions = get_questions_for_user(app, user_id, ["Python"], limit=3)
+    engine.dispose()
+    assert len(questions) == 3
+    assert all(q["skill"] == "Python" for q in questions)
@@ -0,0 +1,114 @@
+"""
+Test script for cached stage reuse in the upload pipeline.
+
+Checks that a job handed cached stage outputs skips those stages, that
+only freshly computed stages are returned for the stage cache, and that a
+job queued past UPLOAD_JOB_TIMEOUT is reported as failed and no longer keeps
+its file from the upload sweeper. Also that a crash reported late by a job
+of a broken worker pool does not drop the pool that replaced it.
+"""
+
+import time
+import logging
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+import utils.upload_pipeline as upload_pipeline
+from models import db, User, Candidate, ResumeAnalysis
+from utils.upload_manager import _pending_hashes
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESUME_TEXT = "Jane Doe\njane@example.com\nSkills: Python, SQL, Docker"
+DOCUMENT = {"text": RESUME_TEXT, "lines": []}
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'pipeline.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_fully_cached_upload_runs_no_stages():
+    """Every stage comes from the cache; the file is never read."""
+    cached = {
+        "extract": DOCUMENT,
+        "basic_info": {"name": "Jane Doe", "email": "jane@example.com", "phone": "", "skills": ["Python"]},
+        "artifact": {"version": 1, "sections": {}, "entities": {}, "skills": ["Python"],
+                     "contact": {"name": "Jane Doe", "email": "jane@example.com", "phone": ""},
+                     "experience_years": None}
+    }
+    assert upload_pipeline.is_fully_cached(upload_pipeline.MODE_BASIC, cached)
+    assert not upload_pipeline.is_fully_cached(upload_pipeline.MODE_STANDARD, cached)
+
+    outcome = upload_pipeline.run_pipeline("/nonexistent/resume.pdf", upload_pipeline.MODE_BASIC, time.time(), cached)
+    logger.info(f"Cached outcome timings: {outcome['timings']}")
+    assert outcome["status"] == "done"
+    assert outcome["resume_text"] == RESUME_TEXT
+    assert outcome["stage_results"] == {}
+    assert "extract" not in outcome["timings"]
+
+
+def test_partially_cached_upload_returns_fresh_stages():
+    """Stages missing from the cache are computed and handed back for storing."""
+    outcome = upload_pipeline.run_pipeline("/nonexistent/resume.pdf", upload_pipeline.MODE_BASIC, time.time(),
+                                           {"extract": DOCUMENT})
+    assert set(outcome["stage_results"]) == {"basic_info", "artifact"}
+    assert outcome["stage_results"]["basic_info"]["email"] == "jane@example.com"
+
+
+def test_job_queued_past_timeout_fails(app):
+    user = User(username="jane", email="jane@example.com", password_hash="x")
+    db.session.add(user)
+    db.session.flush()
+    candidate = Candidate(uuid="job-1", user_id=user.id)
+    db.session.add(candidate)
+    db.session.flush()
+    analysis = ResumeAnalysis(candidate_id=candidate.id, job_id="job-1", status="queued", content_hash="abc123")
+    db.session.add(analysis)
+    db.session.commit()
+
+    assert upload_pipeline.job_pending(analysis)
+    assert _pending_hashes() == {"abc123"}
+
+    # No worker ever reported back: the sweeper stops keeping the file
+    analysis.created_at = datetime.utcnow() - upload_pipeline.JOB_TIMEOUT
+    db.session.commit()
+    assert _pending_hashes() == set()
+
+    assert not upload_pipeline.job_pending(analysis)
+    db.session.expire_all()
+    assert analysis.status == "failed"
+    assert "timed out" in analysis.error_message
+    assert analysis.completed_at is not None
+
+
+def test_late_crash_report_keeps_the_replacement_pool(monkeypatch):
+    class FakePool:
+        def __init__(self):
+            self.shut_down = False
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    broken, replacement = FakePool(), FakePool()
+    monkeypatch.setattr(upload_pipeline, "_pool", broken)
+    monkeypatch.setattr(upload_pipeline, "_inflight", 2)
+
+    upload_pipeline._release_slot(broken_pool=broken)
+    assert upload_pipeline._pool is None and broken.shut_down
+
+    # Another job of the broken pool reports after a new pool was created
+    upload_pipeline._pool = replacement
+    upload_pipeline._release_slot(broken_pool=broken)
+    assert upload_pipeline._pool is replacement and not replacement.shut_down
+    assert upload_pipeline._inflight == 0
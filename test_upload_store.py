@@ -0,0 +1,47 @@
+"""
+Test script for upload buffering in the content-addressed upload store.
+
+Checks that small uploads are kept in memory, larger ones are spooled to a
+temporary file in the store, and both hash to the content's SHA-256.
+"""
+
+import io
+import os
+import hashlib
+import logging
+from utils.upload_store import buffer_upload, discard_upload
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FakeUpload:
+    """Stand-in for werkzeug's FileStorage: only .stream is used"""
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+
+def test_small_upload_stays_in_memory(tmp_path):
+    data = b"%PDF-1.4 small resume"
+    upload = buffer_upload(FakeUpload(data), str(tmp_path), "resume.PDF", memory_limit=1024)
+    assert upload.data == data
+    assert upload.spool_path is None
+    assert upload.ext == ".pdf"
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert os.listdir(tmp_path) == []
+
+
+def test_large_upload_is_spooled(tmp_path):
+    data = os.urandom(200 * 1024)
+    upload = buffer_upload(FakeUpload(data), str(tmp_path), "scan.png", memory_limit=64 * 1024)
+    logger.info(f"Spooled {upload.size} bytes to {upload.spool_path}")
+    assert upload.data is None
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    with open(upload.spool_path, "rb") as f:
+        assert f.read() == data
+
+    discard_upload(upload)
+    assert os.listdir(tmp_path) == []
@@ -30,18 +30,8 @@ except Exception as e:
     logging.error(f"Error loading MAANG ATS scorer: {str(e)}")
     MAANG_SCORER_LOADED = False
 
-# Load standard job descriptions and requirements
-try:
-    import pandas as pd
-    job_data = pd.read_csv('attached_assets/job_title_des.csv')
-    job_titles = job_data['Job Title'].tolist()
-    job_descriptions = job_data['Job Description'].tolist()
-    JOB_DATA_LOADED = True
-except Exception as e:
-    logging.error(f"Error loading job data: {str(e)}")
-    job_titles = []
-    job_descriptions = []
-    JOB_DATA_LOADED = False
+# Standard job descriptions come from the shared, hot-reloaded job title catalog
+from utils.job_title_catalog import get_title_catalog
 
 # Common keywords for different job roles
 JOB_KEYWORDS = {
@@ -132,11 +122,7 @@ def calculate_ats_score(resume_text, job_title, skills_list=None):
     job_description = ""
     
     # Try to find a matching job title in our dataset
-    if job_titles and job_descriptions:
-        for i, title in enumerate(job_titles):
-            if job_title.lower() in title.lower() or title.lower() in job_title.lower():
-                job_description = job_descriptions[i]
-                break
+    job_description = get_title_catalog().find_description(job_title)
     
     # If no job description found, create one based on keywords
     if not job_description:
@@ -217,7 +203,7 @@ def calculate_ats_score(resume_text, job_title, skills_list=None):
             job_keywords = keywords
             break
     
-    if not job_keywords and job_titles and job_descriptions:
+    if not job_keywords and len(get_title_catalog()):
         # Extract keywords from the job description
         desc = job_description.lower()
         potential_keywords = re.findall(r'\b\w+\b', desc)
@@ -279,11 +265,7 @@ def get_improvement_suggestions(resume_text, job_title, skills_list=None):
     job_description = ""
     
     # Try to find a matching job title in our dataset
-    if job_titles and job_descriptions:
-        for i, title in enumerate(job_titles):
-            if job_title.lower() in title.lower() or title.lower() in job_title.lower():
-                job_description = job_descriptions[i]
-                break
+    job_description = get_title_catalog().find_description(job_title)
     
     # If no job description found, create one based on keywords
     if not job_description:
@@ -509,11 +491,7 @@ def analyze_resume(resume_text, skills_list=None):
     
     # Get job description for the top job match
     job_description = ""
-    if job_titles and job_descriptions:
-        for i, title in enumerate(job_titles):
-            if top_job.lower() in title.lower() or title.lower() in top_job.lower():
-                job_description = job_descriptions[i]
-                break
+    job_description = get_title_catalog().find_description(top_job)
     
     # Get detailed ATS score breakdown if MAANG scoring is available
     score_breakdown = {}
@@ -559,11 +537,7 @@ def job_specific_ats_score(resume_text, job_title, skills_list=None):
     
     # Get job description for the job title
     job_description = ""
-    if job_titles and job_descriptions:
-        for i, title in enumerate(job_titles):
-            if job_title.lower() in title.lower() or title.lower() in job_title.lower():
-                job_description = job_descriptions[i]
-                break
+    job_description = get_title_catalog().find_description(job_title)
     
     # Try to get detailed score breakdown if MAANG scoring is available
     score_breakdown = {}
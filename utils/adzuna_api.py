@@ -3,14 +3,23 @@ import os
 import logging
 import re
 import requests
-from functools import lru_cache
-from urllib.parse import quote
+
+from utils import http_client
+from utils.shared_cache import shared_cache
+from utils.job_ranker import stable_base_score
 
 # ---------------------------------------------------------------------------
 # Load credentials from environment variables (expect .env loaded elsewhere)
 # ---------------------------------------------------------------------------
 APP_ID = os.getenv("ADZUNA_APP_ID")
 API_KEY = os.getenv("ADZUNA_API_KEY")
+# Override to point at a local stand-in (see utils/adzuna_stub_server.py)
+BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs").rstrip("/")
+
+# Results are shared by all workers through the SQLite cache; empty/error
+# results are kept briefly so an outage is not hammered but recovers quickly
+CACHE_TTL = int(os.getenv("ADZUNA_CACHE_TTL", "1800"))
+NEGATIVE_CACHE_TTL = int(os.getenv("ADZUNA_NEGATIVE_CACHE_TTL", "60"))
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +27,7 @@ logger = logging.getLogger(__name__)
 # Public helpers
 # ---------------------------------------------------------------------------
 
-@lru_cache(maxsize=128)
+@shared_cache("adzuna_api.search_jobs", ttl=CACHE_TTL, negative_ttl=NEGATIVE_CACHE_TTL)
 def search_jobs(keywords: str,
                 location: str = "Remote",
                 page: int = 1,
@@ -41,24 +50,22 @@ def search_jobs(keywords: str,
 
     # Basic sanitise
     keywords = (keywords or "").strip() or "developer"
-    formatted_keywords = quote(keywords)
 
-    base_url = "https://api.adzuna.com/v1/api/jobs"
     country = "gb"  # default to UK; could make param later
-    url = f"{base_url}/{country}/search/{page}"
+    url = f"{BASE_URL}/{country}/search/{page}"
 
     params = {
         "app_id": APP_ID,
         "app_key": API_KEY,
         "results_per_page": results_per_page,
-        "what": formatted_keywords,
+        "what": keywords,  # requests handles the URL encoding
         "content-type": "application/json",
     }
     if location.lower() not in {"remote", "any"}:
         params["where"] = location
 
     try:
-        response = requests.get(url, params=params, timeout=6)
+        response = http_client.get(url, params=params, timeout=6)
     except requests.RequestException as exc:
         logger.error("Adzuna request failed: %s", exc)
         return []
@@ -80,7 +87,7 @@ def search_jobs(keywords: str,
             "title": job.get("title", "Unknown Title"),
             "company": job.get("company", {}).get("display_name", "Unknown Company"),
             "description": desc,
-            "match_score": 70 + (hash(job.get("id", "")) % 25),
+            "match_score": stable_base_score(job.get("id", "")),
             "apply_url": job.get("redirect_url", "#"),
             "location": job.get("location", {}).get("display_name", location),
             "salary_min": job.get("salary_min"),
@@ -91,83 +98,6 @@ def search_jobs(keywords: str,
     return formatted
 
 
-@lru_cache(maxsize=128)
-def search_jobs(keywords, location="Remote", page=1, results_per_page=5):
-    """
-    Search for jobs using the Adzuna API
-    
-    Args:
-        keywords (str): Job title or keywords to search for
-        location (str): Location to search in, default is "Remote"
-        page (int): Page number for results
-        results_per_page (int): Number of results per page
-        
-    Returns:
-        list: List of job dictionaries or empty list if error
-    """
-    if not APP_ID or not API_KEY:
-        logging.error("Adzuna credentials missing: ensure ADZUNA_APP_ID and ADZUNA_API_KEY are set in your .env")
-        return []
-
-    try:
-                # Prepare the URL
-        base_url = "https://api.adzuna.com/v1/api/jobs"
-        country = "gb"  # Default to UK
-        
-        # Format keywords for URL
-        formatted_keywords = quote(keywords)
-        
-        # Build the URL
-        url = f"{base_url}/{country}/search/{page}"
-        
-        # Set up parameters
-        params = {
-            "app_id": APP_ID,
-            "app_key": API_KEY,
-            "results_per_page": results_per_page,
-            "what": formatted_keywords,
-            "content-type": "application/json"
-        }
-        
-        # Add location parameter if not "Remote"
-        if location.lower() != "remote":
-            params["where"] = location
-        
-        # Make the request
-        response = requests.get(url, params=params, timeout=6)
-        
-        # Check for successful response
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Format the results
-            formatted_jobs = []
-            for job in data.get("results", []):
-                # Calculate match score - simple random value between 75-95 for demonstration
-                match_score = hash(job.get("id", "")) % 20 + 75
-                
-                formatted_job = {
-                    "title": job.get("title", "Unknown Title"),
-                    "company": job.get("company", {}).get("display_name", "Unknown Company"),
-                    "description": job.get("description", "No description available"),
-                    "match_score": match_score,
-                    "apply_url": job.get("redirect_url", "#"),
-                    "location": job.get("location", {}).get("display_name", "Unknown Location"),
-                    "salary_min": job.get("salary_min", "Not specified"),
-                    "salary_max": job.get("salary_max", "Not specified"),
-                    "created": job.get("created", "Unknown")
-                }
-                formatted_jobs.append(formatted_job)
-            
-            return formatted_jobs
-        else:
-            logging.error(f"Error fetching jobs: {response.status_code} {response.text}")
-            return []
-        
-    except Exception as e:
-        logging.error(f"Exception in Adzuna API call: {str(e)}")
-        return []
-
 def calculate_job_match_score(resume_text, job_description):
     """
     Calculate a match score between a resume and job description
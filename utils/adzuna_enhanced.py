@@ -3,17 +3,46 @@
 
 
 
-import requests
 import logging
 import json
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from urllib.parse import quote
 
+from utils import http_client
+from utils.job_ranker import stable_base_score
+
 # API credentials for Adzuna
 APP_ID = os.getenv("ADZUNA_APP_ID", "8803c29d")  # Application ID required for all API requests
 API_KEY = os.getenv("ADZUNA_API_KEY", "b1b42440e1114ce2df7c369ad10d2de1")  # API key for authentication
 
+# Override to point at a local stand-in (see utils/adzuna_stub_server.py)
+BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api/jobs").rstrip("/")
+
+# Countries searched for results, the requested country is always tried first
+COUNTRIES_TO_TRY = ["us", "gb", "au", "ca", "de"]
+
+# Search timing: overall deadline, per-request timeouts and the gap between hedged attempts (seconds)
+SEARCH_DEADLINE = float(os.getenv("ADZUNA_SEARCH_DEADLINE", "8"))
+CONNECT_TIMEOUT = float(os.getenv("ADZUNA_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("ADZUNA_READ_TIMEOUT", "5"))
+HEDGE_DELAY = float(os.getenv("ADZUNA_HEDGE_DELAY", "0.25"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ADZUNA_MAX_PARALLEL", "10")),
+    thread_name_prefix="adzuna"
+)
+# Runs the per-query searches of search_jobs_batch; each of those fans out on _executor
+_batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ADZUNA_BATCH_PARALLEL", "4")),
+    thread_name_prefix="adzuna-batch"
+)
+
+# Reciprocal-rank fusion constant used when merging batch results
+RRF_K = 10
+
 def recommend_jobs_from_similarity_scores(similarity_scores, location="Remote", country="gb", results_per_page=5):
     """
     Get job recommendations based on top job titles
@@ -55,16 +84,10 @@ def recommend_jobs_from_similarity_scores(similarity_scores, location="Remote",
                     if word not in skills_extracted and len(word) > 3:
                         skills_extracted.append(word)
         
-        # Create a search string from the top job title and skills
-        search_terms = []
-        if top_3_matches:
-            search_terms.append(top_3_matches[0]['title'])
-        search_terms.extend(skills_extracted[:3])  # Add top 3 skills
-        
-        search_string = ", ".join(search_terms)
-        
-        # Search for jobs using the Adzuna API
-        recommended_jobs = search_jobs(search_string, location, country, results_per_page)
+        # Search all top titles at once; each title's similarity score weights its results
+        queries = [(match['title'], max(float(match['score']), 0.01)) for match in top_3_matches]
+        recommended_jobs = search_jobs_batch(queries, location, country, results_per_page=results_per_page)
+        recommended_jobs = recommended_jobs[:results_per_page] or get_fallback_jobs()
         
         return {
             "top_matches": top_3_matches,
@@ -83,126 +106,259 @@ def search_jobs(keywords, location="Remote", country="gb", page=1, results_per_p
     Args:
         keywords (str): Job title or keywords to search for
         location (str): Location to search in, default is "Remote"
-        country (str): Country code for job search, default is "gb" (UK)
+        country (str): Country code tried first, default is "gb" (UK)
         page (int): Page number for results
         results_per_page (int): Number of results per page
         
     Returns:
         list: List of job dictionaries or fallback jobs if error
     """
+    jobs = fetch_jobs(keywords, location, country, page, results_per_page)
+    if jobs:
+        return jobs
+    
+    # If we get here, no results were found for any country
+    logging.warning("No results from Adzuna API for any country or parameter combination")
+    return get_fallback_jobs()
+
+def simplify_keywords(keywords):
+    """Reduce a query to the form actually sent to Adzuna"""
+    # Simplify keywords to improve chances of getting results
+    # Often complex queries return no results, so we'll use just the first job title or skill
+    simplified_keywords = (keywords or "").split(',')[0].strip()
+    if len(simplified_keywords) < 3:
+        simplified_keywords = "developer"  # Default fallback
+    
+    # Try with several different search terms to increase chances of results
+    common_dev_terms = ["developer", "software", "engineer", "programmer"]
+    
+    # Add the common terms to our search only if they're not already in the keywords
+    if not any(term in simplified_keywords.lower() for term in common_dev_terms):
+        simplified_keywords = f"{simplified_keywords} developer"
+    return simplified_keywords
+
+def fetch_jobs(keywords, location="Remote", country="gb", page=1, results_per_page=5, deadline=None):
+    """
+    Live Adzuna search without the fallback listings
+    
+    The country/parameter variants are raced against each other: attempts are
+    launched HEDGE_DELAY apart, the first non-empty result wins, attempts that
+    have not started yet are never sent, and the whole search is bounded by
+    SEARCH_DEADLINE regardless of how slow individual responses are.
+    
+    Args:
+        deadline (float): Optional time.monotonic() deadline shared with other searches
+    
+    Returns:
+        list: Formatted job dictionaries, empty if nothing was found in time
+    """
     try:
-        # Simplify keywords to improve chances of getting results
-        # Often complex queries return no results, so we'll use just the first job title or skill
-        simplified_keywords = keywords.split(',')[0].strip()
-        if len(simplified_keywords) < 3:
-            simplified_keywords = "developer"  # Default fallback
-        
-        # Try with several different search terms to increase chances of results
-        common_dev_terms = ["developer", "software", "engineer", "programmer"]
+        attempts = _build_attempts(simplify_keywords(keywords), location, country, page, results_per_page)
+        results, winner = _race_attempts(attempts, deadline)
         
-        # Add the common terms to our search only if they're not already in the keywords
-        if not any(term in simplified_keywords.lower() for term in common_dev_terms):
-            simplified_keywords = f"{simplified_keywords} developer"
+        if results:
+            logging.info(f"Adzuna API returned {len(results)} results from {winner}")
+            return _format_jobs(results, location, country=winner.split()[0])
+    except Exception as e:
+        logging.error(f"Exception in Adzuna API call: {str(e)}")
+    return []
+
+def normalize_query(keywords):
+    """Canonical form of a query, used to spot titles that produce the same search"""
+    return " ".join(simplify_keywords(keywords).lower().split())
+
+def search_jobs_batch(queries, location="Remote", country="gb", results_per_page=5, deadline_seconds=None):
+    """
+    Run several job searches concurrently and merge them into one ranked list
+    
+    Queries are normalized and deduplicated first, so titles that reduce to
+    the same Adzuna search are only sent once. All searches share a single
+    deadline. Listings returned by more than one query are merged, and the
+    merged list is ranked by reciprocal-rank fusion weighted by each query's
+    weight, so a listing near the top of several strong queries ranks first.
+    
+    Args:
+        queries (list): Job titles/keywords, or (keywords, weight) tuples
+        location (str): Location to search in
+        country (str): Country code tried first
+        results_per_page (int): Results requested per query
+        deadline_seconds (float): Overall time budget, default SEARCH_DEADLINE
         
-        # Try different countries if specified one doesn't work
-        countries_to_try = ["us", "gb", "au", "ca", "de"]  # Try US first, then others
+    Returns:
+        list: Merged job dictionaries (each with "matched_queries"), best first
+    """
+    weighted = {}
+    for query in queries:
+        keywords, weight = query if isinstance(query, (tuple, list)) else (query, 1.0)
+        if not keywords or not str(keywords).strip():
+            continue
+        key = normalize_query(keywords)
+        # Keep the highest weight when several titles collapse to one query
+        if key not in weighted or weight > weighted[key][1]:
+            weighted[key] = (keywords, float(weight))
+    
+    if not weighted:
+        return []
+    
+    deadline = time.monotonic() + (deadline_seconds or SEARCH_DEADLINE)
+    futures = {
+        _batch_executor.submit(fetch_jobs, keywords, location, country, 1, results_per_page, deadline): key
+        for key, (keywords, _) in weighted.items()
+    }
+    logging.info(f"Batch job search: {len(queries)} queries -> {len(futures)} unique searches")
+    
+    merged = {}
+    done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()) + CONNECT_TIMEOUT)
+    for future in not_done:
+        future.cancel()
+    for future in done:
+        key = futures[future]
+        weight = weighted[key][1]
+        for position, job in enumerate(future.result()):
+            listing_key = job.get("source_id") or f"{job['title'].lower()}|{job['company'].lower()}"
+            entry = merged.setdefault(listing_key, {"job": job, "score": 0.0, "queries": []})
+            entry["score"] += weight / (RRF_K + position + 1)
+            entry["queries"].append(key)
+    
+    ranked = sorted(merged.values(), key=lambda entry: entry["score"], reverse=True)
+    jobs = []
+    for entry in ranked:
+        job = dict(entry["job"])
+        job["matched_queries"] = entry["queries"]
+        jobs.append(job)
+    return jobs
+
+def _build_attempts(keywords, location, country, page, results_per_page):
+    """List (label, url, params) for every country/parameter variant, in launch order"""
+    # Try the requested country first, then the others
+    countries_to_try = [country] + [c for c in COUNTRIES_TO_TRY if c != country]
+    
+    attempts = []
+    for try_country in countries_to_try:
+        base_url = f"{BASE_URL}/{try_country}/search/{page}"
         
-        # Set base headers for all requests
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
+        params = {
+            "app_id": APP_ID,
+            "app_key": API_KEY,
+            "results_per_page": results_per_page,
+            "what": keywords,
+            "content-type": "application/json"
         }
         
-        # Try each country until we get results
-        for try_country in countries_to_try:
-            # Prepare the URL (use different format to ensure compatibility)
-            base_url = f"https://api.adzuna.com/v1/api/jobs/{try_country}/search/{page}"
-            
-            # Set up parameters
-            params = {
-                "app_id": APP_ID,
-                "app_key": API_KEY,
-                "results_per_page": results_per_page,
-                "what": simplified_keywords,
-                "content-type": "application/json"
-            }
+        # Add location if not Remote
+        if location.lower() not in ["remote", "any"]:
+            params["where"] = location
+        
+        # Also try without the content-type parameter, which can cause issues
+        test_params = params.copy()
+        del test_params["content-type"]
+        
+        attempts.append((f"{try_country}", base_url, params))
+        attempts.append((f"{try_country} (no content-type)", base_url, test_params))
+    return attempts
+
+def _fetch_attempt(label, url, params, timeout):
+    """Run one Adzuna request; returns the raw result list (empty on any failure)"""
+    logging.info(f"Requesting jobs from Adzuna: URL={url}, Keywords={params.get('what')}, Variant={label}")
+    try:
+        # The race is the retry: each variant is sent once, within the deadline
+        response = http_client.get(url, params=params, timeout=timeout, retries=False)
+        if response.status_code == 200:
+            return response.json().get("results", [])
+        logging.warning(f"Adzuna API returned status {response.status_code} for {label}")
+    except Exception as e:
+        logging.error(f"Error with Adzuna variant {label}: {str(e)}")
+    return []
+
+def _race_attempts(attempts, deadline=None):
+    """
+    Launch attempts HEDGE_DELAY apart and return the first non-empty result
+    
+    Args:
+        attempts (list): (label, url, params) tuples in launch order
+        deadline (float): time.monotonic() value to give up at; defaults to SEARCH_DEADLINE from now
+    
+    Returns:
+        tuple: (results list, label of the winning attempt) or ([], None)
+    """
+    deadline = deadline or time.monotonic() + SEARCH_DEADLINE
+    pending = {}
+    next_launch = time.monotonic()
+    remaining_attempts = list(attempts)
+    
+    try:
+        while remaining_attempts or pending:
+            now = time.monotonic()
+            if now >= deadline:
+                logging.warning("Adzuna search deadline reached")
+                break
             
-            # Add location if not Remote
-            if location.lower() not in ["remote", "any"]:
-                params["where"] = location
-                
-            # Optional: Try without content type parameter which can cause issues
-            test_params = params.copy()
-            if "content-type" in test_params:
-                del test_params["content-type"]
+            # Launch the next hedge when its slot comes up (or straight away if nothing is in flight)
+            if remaining_attempts and (now >= next_launch or not pending):
+                label, url, params = remaining_attempts.pop(0)
+                timeout = (CONNECT_TIMEOUT, max(0.1, min(READ_TIMEOUT, deadline - now)))
+                pending[_executor.submit(_fetch_attempt, label, url, params, timeout)] = label
+                next_launch = now + HEDGE_DELAY
+                continue
             
-            # Logging the request for debugging
-            logging.info(f"Requesting jobs from Adzuna: URL={base_url}, Keywords={simplified_keywords}, Country={try_country}")
+            wait_for = deadline - now
+            if remaining_attempts:
+                wait_for = min(wait_for, next_launch - now)
+            done, _ = wait(pending, timeout=max(0, wait_for), return_when=FIRST_COMPLETED)
             
-            # Make the request (try both with and without content-type parameter)
-            for current_params in [params, test_params]:
-                try:
-                    response = requests.get(base_url, params=current_params, headers=headers)
-                    
-                    # Check for successful response
-                    if response.status_code == 200:
-                        data = response.json()
-                        results = data.get("results", [])
-                        
-                        # Log successful API response
-                        logging.info(f"Adzuna API returned {len(results)} results from {try_country}")
-                        
-                        # If we got results, format and return them
-                        if results:
-                            # Format the results
-                            formatted_jobs = []
-                            for job in results:
-                                # Use a more deterministic match score between 70-95
-                                match_score = 70 + (hash(job.get("id", "")) % 25)
-                                
-                                # Clean up the description - remove HTML and limit length
-                                description = re.sub(r'<[^>]+>', '', job.get("description", ""))
-                                description = description[:300] + "..." if len(description) > 300 else description
-                                
-                                # Format salary if available
-                                salary_min = job.get("salary_min")
-                                salary_max = job.get("salary_max")
-                                
-                                if salary_min:
-                                    salary_min = f"${int(salary_min):,}"
-                                else:
-                                    salary_min = "Not specified"
-                                    
-                                if salary_max:
-                                    salary_max = f"${int(salary_max):,}"
-                                else:
-                                    salary_max = "Not specified"
-                                
-                                formatted_job = {
-                                    "title": job.get("title", "Unknown Title"),
-                                    "company": job.get("company", {}).get("display_name", "Unknown Company"),
-                                    "description": description,
-                                    "match_score": match_score,
-                                    "apply_url": job.get("redirect_url", "#"),
-                                    "location": job.get("location", {}).get("display_name", location),
-                                    "salary_min": salary_min,
-                                    "salary_max": salary_max,
-                                    "created": job.get("created", "Unknown")
-                                }
-                                formatted_jobs.append(formatted_job)
-                            
-                            return formatted_jobs
-                except Exception as inner_e:
-                    logging.error(f"Error with params {current_params}: {str(inner_e)}")
-                    continue
+            for future in done:
+                label = pending.pop(future)
+                results = future.result()
+                if results:
+                    return results, label
+    finally:
+        # Attempts still queued are dropped; in-flight ones finish within their own timeout
+        for future in pending:
+            future.cancel()
+    
+    return [], None
+
+def _format_jobs(results, location, country=None):
+    """Convert raw Adzuna results to the listing dicts used by the templates"""
+    formatted_jobs = []
+    for job in results:
+        # Placeholder score between 70-95, stable across workers; rank_jobs() replaces it
+        match_score = stable_base_score(job.get("id", ""))
+        
+        # Clean up the description - remove HTML and limit length
+        description = re.sub(r'<[^>]+>', '', job.get("description", ""))
+        description = description[:300] + "..." if len(description) > 300 else description
         
-        # If we get here, no results were found for any country
-        logging.warning("No results from Adzuna API for any country or parameter combination")
-        return get_fallback_jobs()
+        # Format salary if available
+        salary_min = job.get("salary_min")
+        salary_max = job.get("salary_max")
+        
+        if salary_min:
+            salary_min = f"${int(salary_min):,}"
+        else:
+            salary_min = "Not specified"
             
-    except Exception as e:
-        logging.error(f"Exception in Adzuna API call: {str(e)}")
-        return get_fallback_jobs()
+        if salary_max:
+            salary_max = f"${int(salary_max):,}"
+        else:
+            salary_max = "Not specified"
+        
+        formatted_job = {
+            "title": job.get("title", "Unknown Title"),
+            "company": job.get("company", {}).get("display_name", "Unknown Company"),
+            "description": description,
+            "match_score": match_score,
+            "apply_url": job.get("redirect_url", "#"),
+            "location": job.get("location", {}).get("display_name", location),
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "created": job.get("created", "Unknown"),
+            "source_id": str(job.get("id", "")),
+            "country": country
+        }
+        formatted_jobs.append(formatted_job)
+    
+    return formatted_jobs
         
 def get_fallback_jobs():
     """Return fallback job listings when API fails"""
@@ -0,0 +1,198 @@
+"""
+Local stand-in for the Adzuna job search API
+
+Serves GET /v1/api/jobs/{country}/search/{page} with the same response shape
+as Adzuna, so the recommendation path can be exercised and load-tested
+without network access or API quota. Point the app at it with:
+
+    python -m utils.adzuna_stub_server --port 8765 --latency-ms 150 --error-rate 0.05
+    ADZUNA_BASE_URL=http://127.0.0.1:8765/v1/api/jobs gunicorn main:app
+
+Results come from a fixtures file (a recorded Adzuna response, or a JSON
+object mapping search terms to recorded responses) when one is given, and
+are otherwise synthesized deterministically from the search terms.
+"""
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = re.compile(r"^/v1/api/jobs/([a-z]{2})/search/(\d+)$")
+
+COMPANIES = ["TechCorp Solutions", "Digital Innovations", "Global Tech Industries", "Data Analytics Inc",
+             "Cloud Solutions Ltd", "NextGen Software", "BrightPath Labs", "Northwind Systems"]
+LOCATIONS = {"us": "New York", "gb": "London", "au": "Sydney", "ca": "Toronto", "de": "Berlin"}
+SKILL_WORDS = ["Python", "JavaScript", "React", "SQL", "AWS", "Docker", "Kubernetes", "Java",
+               "Machine Learning", "REST APIs", "Git", "Agile", "TypeScript", "Node.js", "Azure"]
+
+
+class StubConfig:
+    """Behaviour knobs, shared by all handler threads"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, result_count=None,
+                 empty_countries=(), fixtures=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.result_count = result_count  # None = honour results_per_page
+        self.empty_countries = set(empty_countries)
+        self.fixtures = fixtures
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+
+def load_fixtures(path):
+    """Load a recorded response ({"results": [...]}) or a {search terms: response} mapping"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "results" in data:
+        return {"*": data["results"]}
+    return {key.lower(): value.get("results", value) for key, value in data.items()}
+
+
+def synthesize_results(what, country, page, count):
+    """Deterministic fake listings for a query (same query -> same listings)"""
+    seed = int(hashlib.md5(f"{what}|{country}|{page}".encode("utf-8")).hexdigest(), 16)
+    rng = random.Random(seed)
+    title_base = (what or "developer").strip().title()
+    posted = datetime(2025, 4, 1)
+
+    results = []
+    for i in range(count):
+        skills = rng.sample(SKILL_WORDS, 4)
+        salary_min = rng.randrange(40, 120) * 1000
+        results.append({
+            "id": str(seed % 10**9 + page * 1000 + i),
+            "title": f"{rng.choice(['', 'Senior ', 'Junior ', 'Lead '])}{title_base}",
+            "company": {"display_name": rng.choice(COMPANIES)},
+            "location": {"display_name": LOCATIONS.get(country, "Remote")},
+            "description": f"<p>We are hiring a {title_base} with experience in {', '.join(skills[:3])} "
+                           f"and {skills[3]}. You will design, build and ship production features.</p>",
+            "redirect_url": f"https://adzuna.example/land/ad/{seed % 10**9 + i}",
+            "salary_min": salary_min,
+            "salary_max": salary_min + rng.randrange(10, 40) * 1000,
+            "created": (posted + timedelta(days=rng.randrange(0, 60))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        })
+    return results
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients giving up mid-response (timeouts, hedged requests) are expected
+        logger.debug(f"Client {client_address} disconnected early")
+
+
+def make_handler(config):
+    class AdzunaStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            match = SEARCH_PATH.match(parts.path)
+            if not match:
+                return self._send(404, {"exception": "NOT_FOUND"})
+
+            country, page = match.group(1), int(match.group(2))
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            if not query.get("app_id") or not query.get("app_key"):
+                return self._send(401, {"exception": "AUTH_FAIL", "display": "Authorisation failed"})
+
+            with config.lock:
+                config.requests += 1
+                delay = max(0.0, config.latency_ms + config.random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+                fail = config.random.random() < config.error_rate
+                if fail:
+                    config.errors += 1
+            time.sleep(delay)
+
+            if fail:
+                return self._send(503, {"exception": "SERVICE_UNAVAILABLE"})
+
+            per_page = min(50, int(query.get("results_per_page", 10)))
+            count = per_page if config.result_count is None else min(per_page, config.result_count)
+            what = query.get("what", "")
+
+            if country in config.empty_countries:
+                results = []
+            elif config.fixtures is not None:
+                recorded = config.fixtures.get(what.lower(), config.fixtures.get("*", []))
+                results = recorded[(page - 1) * count:page * count]
+            else:
+                results = synthesize_results(what, country, page, count)
+
+            self._send(200, {"count": len(results) * 10, "mean": 60000, "results": results})
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return AdzunaStubHandler
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config_kwargs):
+    """
+    Start the stub in a background thread (handy for tests and benchmarks)
+
+    Returns:
+        tuple: (server, base_url); call server.shutdown() when done
+    """
+    config = StubConfig(**config_kwargs)
+    server = StubServer((host, port), make_handler(config))
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/v1/api/jobs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Adzuna job search API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ADZUNA_STUB_PORT", "8765")))
+    parser.add_argument("--latency-ms", type=float, default=float(os.environ.get("ADZUNA_STUB_LATENCY_MS", "0")))
+    parser.add_argument("--jitter-ms", type=float, default=float(os.environ.get("ADZUNA_STUB_JITTER_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.environ.get("ADZUNA_STUB_ERROR_RATE", "0")))
+    parser.add_argument("--results", type=int, default=None, help="cap on results per response")
+    parser.add_argument("--empty-countries", default="", help="comma-separated countries that return no results")
+    parser.add_argument("--fixtures", help="JSON file with recorded Adzuna responses")
+    parser.add_argument("--seed", type=int, default=None, help="seed for latency jitter and error injection")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StubServer((args.host, args.port), make_handler(StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        result_count=args.results,
+        empty_countries=[c.strip() for c in args.empty_countries.split(",") if c.strip()],
+        fixtures=load_fixtures(args.fixtures) if args.fixtures else None,
+        seed=args.seed
+    )))
+    logger.info(f"Adzuna stub listening on http://{args.host}:{args.port}/v1/api/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
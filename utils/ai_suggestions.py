@@ -0,0 +1,75 @@
+"""
+AI improvement suggestions generated in the background for the analysis page
+
+queue_suggestions() stores the deterministic fallback text on the analysis,
+marks it pending with the time it was requested, and generates the AI text
+on the background task pool; store_suggestions() replaces the fallback when
+it is done. The state lives on the ResumeAnalysis row, so a poll that lands
+on any worker sees it.
+
+Background tasks live in one worker's thread pool and are lost if that
+worker restarts. suggestions_pending() therefore treats a request older than
+SUGGESTIONS_TIMEOUT seconds as failed: the status becomes 'failed' and the
+fallback text already on the row is shown. A task that still finishes later
+stores its result as usual.
+"""
+import os
+import logging
+from datetime import datetime, timedelta
+
+from models import db, ResumeAnalysis
+from utils.background_tasks import submit_task
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_TIMEOUT = timedelta(seconds=int(os.environ.get("AI_SUGGESTIONS_TIMEOUT", "120")))
+
+
+def store_suggestions(analysis_id, fallback_text, generator, *args, **kwargs):
+    """Background task: generate AI suggestions and save them on the analysis record"""
+    try:
+        suggestions = generator(*args, **kwargs) or fallback_text
+        logger.info("Successfully generated AI resume suggestions")
+    except Exception as e:
+        logger.error(f"Error generating AI resume suggestions: {e}")
+        suggestions = fallback_text
+
+    analysis = ResumeAnalysis.query.get(analysis_id)
+    if analysis:
+        analysis.improvement_suggestions = suggestions
+        analysis.suggestions_status = 'done'
+        db.session.commit()
+    return suggestions
+
+
+def queue_suggestions(app, analysis, fallback_text, generator, *args, **kwargs):
+    """
+    Mark the analysis's suggestions pending and generate them in the background
+
+    Returns:
+        str: Task id
+    """
+    analysis.improvement_suggestions = fallback_text
+    analysis.suggestions_status = 'pending'
+    analysis.suggestions_requested_at = datetime.utcnow()
+    db.session.commit()
+    return submit_task(app, store_suggestions, analysis.id, fallback_text, generator, *args, **kwargs)
+
+
+def suggestions_pending(analysis, now=None):
+    """
+    True while the analysis's suggestions are still being generated
+
+    A request older than SUGGESTIONS_TIMEOUT (its task was lost, e.g. with a
+    restarted worker) is marked 'failed', leaving the fallback text in place.
+    """
+    if analysis.suggestions_status != 'pending':
+        return False
+    requested_at = analysis.suggestions_requested_at
+    if requested_at is not None and (now or datetime.utcnow()) - requested_at < SUGGESTIONS_TIMEOUT:
+        return True
+
+    logger.warning(f"AI suggestions for analysis {analysis.id} did not finish in time, showing the fallback")
+    analysis.suggestions_status = 'failed'
+    db.session.commit()
+    return False
@@ -0,0 +1,108 @@
+"""
+Stored /analyze payloads, so refreshing the page does not recompute it
+
+The analysis page matches the resume against the job catalog, scores it and
+asks the LLM for suggestions. Its rendered payload (job titles, role scores,
+matched keywords, sections, entities, skill distribution) is saved in an
+AnalysisSnapshot together with the inputs it was computed from:
+
+- resume_hash: the resume text, the candidate's skills and the extractor
+  version (utils/extraction_artifact.ARTIFACT_VERSION)
+- catalog_version: utils/job_catalog.catalog_version()
+- scorer_version: utils/ats_scorer.SCORER_VERSION
+
+load_snapshot() returns the payload only while all three still match; any
+change (a re-upload, edited skills, newly ingested jobs, a scorer change)
+makes the next view recompute and replace it. Improvement suggestions are
+not part of the payload; they stay on ResumeAnalysis, where the background
+LLM task stores them.
+"""
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from models import db, AnalysisSnapshot
+from utils.ats_scorer import SCORER_VERSION
+from utils.extraction_artifact import ARTIFACT_VERSION
+from utils.job_catalog import catalog_version
+
+logger = logging.getLogger(__name__)
+
+_stats = {"hits": 0, "misses": 0, "stale": 0}
+_stats_lock = threading.Lock()
+
+
+def _bump(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def resume_hash(resume_text, skills):
+    """Hash of everything from the resume that the analysis depends on"""
+    key = json.dumps({"text": resume_text or "", "skills": sorted(skills), "extractor": ARTIFACT_VERSION})
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def snapshot_inputs(analysis, skills):
+    """
+    Current inputs of an analysis page
+
+    Returns:
+        dict: resume_hash, catalog_version, scorer_version
+    """
+    return {
+        "resume_hash": resume_hash(analysis.resume_text, skills),
+        "catalog_version": catalog_version(),
+        "scorer_version": SCORER_VERSION
+    }
+
+
+def load_snapshot(analysis, inputs):
+    """
+    Stored payload of an analysis, if it was computed from the same inputs
+
+    Returns:
+        dict or None
+    """
+    snapshot = AnalysisSnapshot.query.filter_by(analysis_id=analysis.id).first()
+    if snapshot is None:
+        _bump("misses")
+        return None
+    if any(getattr(snapshot, name) != value for name, value in inputs.items()):
+        _bump("stale")
+        logger.info(f"Analysis snapshot {analysis.id} is stale, recomputing")
+        return None
+    try:
+        payload = json.loads(snapshot.payload)
+    except ValueError as e:
+        logger.warning(f"Unreadable analysis snapshot {analysis.id}: {str(e)}")
+        _bump("misses")
+        return None
+    _bump("hits")
+    return payload
+
+
+def save_snapshot(analysis, inputs, payload):
+    """Store (or replace) the payload of an analysis with the inputs it was computed from"""
+    snapshot = AnalysisSnapshot.query.filter_by(analysis_id=analysis.id).first()
+    if snapshot is None:
+        snapshot = AnalysisSnapshot(analysis_id=analysis.id)
+        db.session.add(snapshot)
+    for name, value in inputs.items():
+        setattr(snapshot, name, value)
+    snapshot.payload = json.dumps(payload, separators=(",", ":"), default=str)
+    snapshot.created_at = datetime.utcnow()
+    try:
+        db.session.commit()
+    except Exception as e:
+        # Two views of a new analysis at once: the other one stored it
+        db.session.rollback()
+        logger.warning(f"Could not save analysis snapshot {analysis.id}: {str(e)}")
+
+
+def get_snapshot_stats():
+    """Snapshot hits, misses and stale snapshots recomputed by this process"""
+    with _stats_lock:
+        return dict(_stats)
@@ -2,10 +2,10 @@
 API Module for Resume Analysis - Optimized version
 Provides functions for text extraction, skills identification, and ATS scoring
 """
-import pdfplumber
 import logging
 import re
 from difflib import SequenceMatcher
+from utils.pdf_extractor import extract_pdf_text
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -46,14 +46,8 @@ def extract_text_from_pdf(pdf_path):
     Returns:
         str: Extracted text
     """
-    text = ""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+        return extract_pdf_text(pdf_path)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
         return ""
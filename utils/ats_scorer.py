@@ -17,6 +17,9 @@ except Exception:
     logger.warning("Using fallback functionality for ATS scoring")
     nlp = None
 
+# Bump when scoring changes, so stored analysis snapshots are recomputed (utils/analysis_snapshot.py)
+SCORER_VERSION = 1
+
 # Default commonly used skills
 DEFAULT_SKILLS_LIST = [
     "python", "java", "javascript", "html", "css", "react", "nodejs", 
@@ -111,6 +114,30 @@ def calculate_ats_score(resume_skills, job_description, threshold=0.8):
         logger.error(f"ATS scoring error: {e}")
         return {"score": 0, "matched": 0, "total": 0, "matched_keywords": []}
 
+def calculate_profile_ats_score(resume_skills, job_skills, threshold=0.8):
+    """
+    ATS score against a job's precomputed skill profile (see utils/job_catalog.py)
+
+    Same scale and result shape as calculate_ats_score(), but compares against the
+    handful of skills extracted at ingestion instead of tokenizing the description.
+    """
+    if not resume_skills or not job_skills:
+        return {"score": 0, "matched": 0, "total": 0, "matched_keywords": []}
+    if isinstance(resume_skills, str):
+        resume_skills = [resume_skills]
+    resume_skills = resume_skills[:50]
+
+    matched_keywords = [job_skill for job_skill in job_skills
+                        if any(fuzzy_match(job_skill, skill, threshold) for skill in resume_skills)]
+    raw_score = (len(matched_keywords) / len(job_skills)) * 100
+
+    return {
+        "score": round(min(95, max(40, 40 + (raw_score * 0.55))), 2),
+        "matched": len(matched_keywords),
+        "total": len(job_skills),
+        "matched_keywords": matched_keywords
+    }
+
 def calculate_resume_job_similarity(resume_skills, job_tokens, threshold=0.8):
     """Calculate similarity between resume skills and job tokens"""
     if not resume_skills or not job_tokens:
@@ -0,0 +1,92 @@
+"""
+Background task runner for slow, non-critical work (LLM calls)
+
+Pages render their deterministic content immediately and hand the slow parts
+to this module. Each submitted task gets an id that the browser polls until
+the result is ready.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# LLM calls are network bound, so a small thread pool per worker is enough
+MAX_WORKERS = int(os.environ.get("BACKGROUND_TASK_WORKERS", "4"))
+# Finished tasks are kept around for this long so late polls still see them
+TASK_TTL_SECONDS = int(os.environ.get("BACKGROUND_TASK_TTL", "900"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="bg-task")
+_tasks = {}
+_lock = threading.Lock()
+
+
+def submit_task(app, func, *args, **kwargs):
+    """
+    Run a function on the background pool inside a Flask app context
+
+    Args:
+        app: Flask application used to push an app context for the task
+        func: Callable to run
+        *args, **kwargs: Arguments passed to func
+
+    Returns:
+        str: Task id to pass to get_task()
+    """
+    _prune_finished_tasks()
+
+    task_id = uuid.uuid4().hex
+    with _lock:
+        _tasks[task_id] = {
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None
+        }
+
+    def _run():
+        _update_task(task_id, status="running")
+        try:
+            with app.app_context():
+                result = func(*args, **kwargs)
+            _update_task(task_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            logger.error(f"Background task {task_id} failed: {str(e)}")
+            _update_task(task_id, status="error", error=str(e), finished_at=time.time())
+
+    _executor.submit(_run)
+    logger.info(f"Submitted background task {task_id} ({getattr(func, '__name__', 'task')})")
+    return task_id
+
+
+def get_task(task_id):
+    """
+    Look up a task by id
+
+    Returns:
+        dict: Copy of the task state (status, result, error) or None if the
+        id is unknown to this process (expired, or submitted by another worker)
+    """
+    with _lock:
+        task = _tasks.get(task_id)
+        return dict(task) if task else None
+
+
+def _update_task(task_id, **fields):
+    with _lock:
+        if task_id in _tasks:
+            _tasks[task_id].update(fields)
+
+
+def _prune_finished_tasks():
+    """Drop finished tasks older than TASK_TTL_SECONDS"""
+    cutoff = time.time() - TASK_TTL_SECONDS
+    with _lock:
+        expired = [task_id for task_id, task in _tasks.items()
+                   if task["finished_at"] and task["finished_at"] < cutoff]
+        for task_id in expired:
+            del _tasks[task_id]
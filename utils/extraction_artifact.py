@@ -0,0 +1,226 @@
+"""
+Normalized extraction artifact stored on ResumeAnalysis
+
+Everything the result pages need from the resume text itself is computed
+once by the upload pipeline and stored, versioned, on the analysis row:
+
+- sections, as character offsets into resume_text (text only when a section
+  cannot be located in it, e.g. it was read from OCR layout)
+- entities (spaCy NER plus the pattern based categories)
+- skills
+- contact info (name, email, phone)
+- experience_years, from "N years" statements or the year ranges of the
+  experience section
+
+get_artifact() loads it for a page view. Rows without an artifact, or with
+one from an older ARTIFACT_VERSION, are rebuilt from resume_text on first
+view and saved, so bumping ARTIFACT_VERSION when any of the extractors
+change is enough to refresh them; `flask resumeai rebuild-artifacts` does
+all of them at once, with NER batched. The upload pipeline caches the artifact
+as a stage output too, so bump STAGE_CACHE_VERSION (utils/upload_store.py)
+along with it.
+"""
+import re
+import json
+import logging
+import time
+import threading
+from datetime import datetime
+
+from models import db, ResumeAnalysis
+from utils.resume_analyzer import extract_basic_info, preprocess_and_segment, extract_entities, ner_entities_bulk, NER_PROCESSES
+from utils.skills_extractor import extract_skills
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+
+# "5 years", "3+ yrs"; larger numbers are not experience
+_YEARS_STATED = re.compile(r'\b(\d{1,2})\+?\s*(?:years?|yrs?)\b', re.IGNORECASE)
+_YEAR_RANGE = re.compile(r'\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now)\b',
+                         re.IGNORECASE)
+
+_stats = {"loaded": 0, "rebuilt": 0}
+_stats_lock = threading.Lock()
+
+
+def _bump(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def locate_sections(text, sections):
+    """
+    Character offsets of segmented sections in the original text
+
+    preprocess_and_segment collapses whitespace, so each section is matched
+    word by word with any whitespace in between.
+
+    Returns:
+        dict: section -> {"start", "end"}, or {"text"} if it is not found
+    """
+    located = {}
+    position = 0
+    for name, section_text in sections.items():
+        words = section_text.split()
+        if not words:
+            continue
+        pattern = re.compile(r'\s+'.join(re.escape(word) for word in words))
+        # Sections usually follow each other; search from the previous one first
+        match = pattern.search(text, position) or pattern.search(text)
+        if match:
+            located[name] = {"start": match.start(), "end": match.end()}
+            position = match.end()
+        else:
+            located[name] = {"text": section_text}
+    return located
+
+
+def estimate_experience_years(text, experience_text=""):
+    """
+    Years of experience stated in the resume, or else the total span of the
+    year ranges in the experience section (overlapping jobs counted once)
+
+    Returns:
+        int or None
+    """
+    stated = [int(years) for years in _YEARS_STATED.findall(text) if 0 < int(years) <= 50]
+    if stated:
+        return max(stated)
+
+    current_year = datetime.utcnow().year
+    spans = []
+    for start, end in _YEAR_RANGE.findall(experience_text or text):
+        end = current_year if not end.isdigit() else int(end)
+        if int(start) <= end <= current_year:
+            spans.append((int(start), end))
+    if not spans:
+        return None
+
+    total = 0
+    covered_until = None
+    for start, end in sorted(spans):
+        if covered_until is not None and start < covered_until:
+            start = covered_until
+        if end > start:
+            total += end - start
+        covered_until = max(covered_until or end, end)
+    return total
+
+
+def build_artifact(text, lines=None, basic_info=None, skills=None, sections=None, entities=None):
+    """
+    Build the extraction artifact for a resume
+
+    Outputs the caller already has (e.g. upload pipeline stages) are reused;
+    the rest is computed here.
+
+    Args:
+        text (str): Resume text
+        lines (list): OCR layout lines, for section detection (optional)
+
+    Returns:
+        dict: version, sections, entities, skills, contact, experience_years
+    """
+    basic_info = basic_info if basic_info is not None else extract_basic_info(text)
+    skills = skills if skills is not None else extract_skills(text)
+    sections = sections if sections is not None else preprocess_and_segment(text, lines)
+    entities = entities if entities is not None else extract_entities(text)
+    return {
+        "version": ARTIFACT_VERSION,
+        "sections": locate_sections(text, sections),
+        "entities": entities,
+        "skills": skills,
+        "contact": {key: basic_info.get(key, "") for key in ("name", "email", "phone")},
+        "experience_years": estimate_experience_years(text, sections.get("Experience", ""))
+    }
+
+
+def dump_artifact(artifact):
+    """Compact JSON for the ResumeAnalysis.extraction_artifact column"""
+    return json.dumps(artifact, separators=(",", ":"))
+
+
+def section_texts(artifact, text):
+    """
+    Section texts of an artifact, as preprocess_and_segment returns them
+
+    Returns:
+        dict: section -> text (whitespace collapsed)
+    """
+    texts = {}
+    for name, section in artifact["sections"].items():
+        if "text" in section:
+            texts[name] = section["text"]
+        else:
+            texts[name] = re.sub(r'\s+', ' ', text[section["start"]:section["end"]])
+    return texts
+
+
+def get_artifact(analysis):
+    """
+    Extraction artifact of a ResumeAnalysis, rebuilt and saved if it is
+    missing or from an older ARTIFACT_VERSION
+
+    Returns:
+        dict: see build_artifact
+    """
+    if analysis.extraction_artifact and analysis.extraction_version == ARTIFACT_VERSION:
+        try:
+            artifact = json.loads(analysis.extraction_artifact)
+            _bump("loaded")
+            return artifact
+        except ValueError as e:
+            logger.warning(f"Unreadable extraction artifact on analysis {analysis.id}: {str(e)}")
+
+    start = time.perf_counter()
+    # Skills were already extracted (possibly by the LLM) and saved on the candidate
+    skills = [skill.skill_name for skill in analysis.candidate.skills]
+    artifact = build_artifact(analysis.resume_text or "", skills=skills)
+    analysis.extraction_artifact = dump_artifact(artifact)
+    analysis.extraction_version = ARTIFACT_VERSION
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Could not save extraction artifact for analysis {analysis.id}: {str(e)}")
+    _bump("rebuilt")
+    logger.info(f"Rebuilt extraction artifact for analysis {analysis.id} in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    return artifact
+
+
+def rebuild_artifacts(batch_size=100, n_process=None):
+    """
+    Rebuild every missing or outdated artifact, e.g. after bumping ARTIFACT_VERSION
+
+    NER for each batch of resumes is streamed through one nlp.pipe call
+    (optionally over n_process worker processes) instead of one call per page view.
+
+    Returns:
+        int: number of artifacts rebuilt
+    """
+    rebuilt = 0
+    while True:
+        analyses = ResumeAnalysis.query.filter(
+            ResumeAnalysis.status == 'done',
+            (ResumeAnalysis.extraction_version != ARTIFACT_VERSION) | (ResumeAnalysis.extraction_version.is_(None))
+        ).order_by(ResumeAnalysis.id).limit(batch_size).all()
+        if not analyses:
+            return rebuilt
+
+        texts = [analysis.resume_text or "" for analysis in analyses]
+        for analysis, text, ner in zip(analyses, texts, ner_entities_bulk(texts, n_process or NER_PROCESSES)):
+            skills = [skill.skill_name for skill in analysis.candidate.skills]
+            artifact = build_artifact(text, skills=skills, entities=extract_entities(text, ner))
+            analysis.extraction_artifact = dump_artifact(artifact)
+            analysis.extraction_version = ARTIFACT_VERSION
+        db.session.commit()
+        rebuilt += len(analyses)
+        logger.info(f"Rebuilt {rebuilt} extraction artifacts")
+
+
+def get_artifact_stats():
+    """Artifacts loaded versus rebuilt by this process"""
+    with _stats_lock:
+        return dict(_stats)
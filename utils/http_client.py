@@ -0,0 +1,184 @@
+"""
+Shared HTTP client for outbound API calls
+
+One keep-alive requests.Session per process, so repeated calls to the same
+host reuse pooled TCP/TLS connections instead of handshaking every time.
+Idempotent requests get a small, bounded number of retries, responses are
+gzip-negotiated, and per-host latency is recorded for get_host_metrics().
+
+Callers that already retry themselves (the hedged Adzuna search races several
+variants against a deadline) pass retries=False and get a session without
+urllib3 retries, so one logical search never multiplies into MAX_RETRIES + 1
+requests per attempt. Retry-After waits are capped at MAX_RETRY_AFTER seconds.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing per process (each gunicorn worker has its own pool).
+# POOL_MAXSIZE should cover the most parallel requests one worker sends to a
+# single host, e.g. the hedged Adzuna search.
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "20"))
+MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.environ.get("HTTP_RETRY_BACKOFF", "0.2"))
+# Longest Retry-After (and backoff) a retried request will sleep for
+MAX_RETRY_AFTER = float(os.environ.get("HTTP_MAX_RETRY_AFTER", "2"))
+DEFAULT_TIMEOUT = (
+    float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3")),
+    float(os.environ.get("HTTP_READ_TIMEOUT", "6"))
+)
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "ResumeAI/1.0"
+}
+
+# Latency samples kept per host for percentile estimates
+LATENCY_SAMPLES = 200
+
+# retries flag -> Session, rebuilt after a fork
+_sessions = {}
+_session_pid = None
+_session_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class _CappedRetry(Retry):
+    """Retry whose Retry-After sleep is capped at MAX_RETRY_AFTER"""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+def _build_session(retries=True):
+    if retries:
+        retry = _CappedRetry(
+            total=MAX_RETRIES,
+            connect=MAX_RETRIES,
+            read=MAX_RETRIES,
+            status=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF,
+            backoff_max=MAX_RETRY_AFTER,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    else:
+        retry = 0
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session(retries=True):
+    """
+    Return this process's shared Session
+
+    Sessions are not shared across fork(), so a child process (gunicorn
+    worker, process pool) builds its own on first use.
+
+    Args:
+        retries (bool): False for the session without urllib3 retries
+    """
+    global _session_pid
+    pid = os.getpid()
+    session = _sessions.get(retries) if _session_pid == pid else None
+    if session is None:
+        with _session_lock:
+            if _session_pid != pid:
+                _sessions.clear()
+                _session_pid = pid
+            session = _sessions.get(retries)
+            if session is None:
+                session = _sessions[retries] = _build_session(retries)
+    return session
+
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, retries=True):
+    """
+    GET through the shared session, recording latency for the host
+
+    Args:
+        url (str): Request URL
+        params (dict): Query parameters
+        headers (dict): Extra headers, merged over DEFAULT_HEADERS
+        timeout: Seconds, or a (connect, read) tuple
+        retries (bool): False when the caller retries (or hedges) itself
+
+    Returns:
+        requests.Response
+
+    Raises:
+        requests.RequestException: When the request fails after retries
+    """
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    try:
+        response = get_session(retries).get(url, params=params, headers=headers, timeout=timeout)
+    except requests.RequestException:
+        _record(host, (time.perf_counter() - start) * 1000, error=True)
+        raise
+    _record(host, (time.perf_counter() - start) * 1000, error=response.status_code >= 500)
+    return response
+
+
+def _record(host, elapsed_ms, error=False):
+    with _metrics_lock:
+        entry = _metrics.setdefault(host, {
+            "requests": 0,
+            "errors": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "samples": deque(maxlen=LATENCY_SAMPLES)
+        })
+        entry["requests"] += 1
+        entry["errors"] += int(error)
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["samples"].append(elapsed_ms)
+    logger.debug(f"HTTP GET {host} took {elapsed_ms:.0f}ms{' (error)' if error else ''}")
+
+
+def get_host_metrics():
+    """
+    Per-host request counts and latency for this process
+
+    Returns:
+        dict: host -> requests, errors, avg_ms, p50_ms, p95_ms, max_ms
+    """
+    with _metrics_lock:
+        snapshot = {host: dict(entry, samples=sorted(entry["samples"])) for host, entry in _metrics.items()}
+
+    metrics = {}
+    for host, entry in snapshot.items():
+        samples = entry["samples"]
+        metrics[host] = {
+            "requests": entry["requests"],
+            "errors": entry["errors"],
+            "avg_ms": round(entry["total_ms"] / entry["requests"], 1),
+            "p50_ms": round(samples[len(samples) // 2], 1) if samples else None,
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else None,
+            "max_ms": round(entry["max_ms"], 1)
+        }
+    return metrics
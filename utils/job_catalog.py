@@ -0,0 +1,293 @@
+"""
+Job catalog stored in JobListing, with a full-text index
+
+Catalog listings (source='catalog') are bulk-loaded from CSV or JSONL files by
+`flask resumeai ingest-jobs` (see commands.py). Files are streamed in chunks,
+rows are inserted in batches, and each listing gets a skill profile at
+ingestion so matching does not have to tokenize descriptions per request.
+
+The full-text index depends on the database:
+
+- SQLite: an FTS5 table (job_listing_fts) over title, description and skills,
+  kept in step with each inserted batch
+- PostgreSQL: a generated tsvector column with a GIN index
+
+find_matching_jobs() gets its candidate set from search_catalog(); while the
+catalog is empty, get_candidate_jobs() falls back to the bundled reference
+catalog (utils/job_title_catalog.py).
+"""
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from models import db, JobListing
+from utils.job_ranker import build_skill_matcher, skill_incidence_matrix
+from utils.job_title_catalog import get_title_catalog
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SOURCE = "catalog"
+CHUNK_SIZE = int(os.environ.get("JOB_CATALOG_CHUNK_SIZE", "5000"))
+# Listings handed to find_matching_jobs per request
+CANDIDATE_LIMIT = 50
+MAX_QUERY_TERMS = 30
+
+# Accepted spellings of each JobListing field in input files (compared lowercased)
+COLUMN_ALIASES = {
+    "title": ["title", "job_title", "job title", "position", "role"],
+    "company": ["company", "company_name", "employer"],
+    "description": ["description", "job_description", "job description", "details"],
+    "source_id": ["source_id", "id", "job_id"],
+    "url": ["url", "apply_url", "redirect_url", "link"],
+    "location": ["location", "city"],
+    "country": ["country"],
+    "salary_min": ["salary_min", "min_salary"],
+    "salary_max": ["salary_max", "max_salary"],
+    "posted_at": ["posted_at", "created", "date_posted", "posted"]
+}
+# Column lengths on JobListing, so long values are truncated rather than rejected
+FIELD_LENGTHS = {"title": 200, "company": 100, "source_id": 64, "url": 500, "location": 200,
+                 "country": 5, "salary_min": 50, "salary_max": 50, "posted_at": 50}
+
+FTS_TABLE = "job_listing_fts"
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def skill_vocabulary():
+    """Skills looked for in catalog listings: the skills dataset, or the ATS defaults"""
+    from utils.skills_extractor import skills_list
+    from utils.ats_scorer import DEFAULT_SKILLS_LIST
+    return skills_list or DEFAULT_SKILLS_LIST
+
+
+def ensure_search_index():
+    """Create the full-text index for this database if it does not exist yet"""
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, skills, content='job_listing', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        ))
+    elif dialect == "postgresql":
+        db.session.execute(text(
+            "ALTER TABLE job_listing ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(skills, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')) STORED"
+        ))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_job_listing_search_vector ON job_listing "
+            "USING GIN (search_vector) WHERE source = 'catalog'"
+        ))
+    else:
+        logger.warning(f"No full-text index support for {dialect}; catalog search is disabled")
+    db.session.commit()
+
+
+def rebuild_search_index():
+    """Re-index every catalog listing (SQLite; the PostgreSQL column maintains itself)"""
+    ensure_search_index()
+    if _dialect() == "sqlite":
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('delete-all')"))
+        _index_rows_after(0)
+        db.session.commit()
+
+
+def _index_rows_after(last_id):
+    """Add catalog rows with id > last_id to the SQLite FTS table"""
+    db.session.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, title, description, skills) "
+        "SELECT id, title, description, skills FROM job_listing WHERE source = :source AND id > :last_id"
+    ), {"source": CATALOG_SOURCE, "last_id": last_id})
+
+
+def _read_chunks(path, chunk_size):
+    """Stream a CSV or JSONL file as DataFrames of at most chunk_size rows"""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        return pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    return pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                       encoding_errors="replace", on_bad_lines="skip")
+
+
+def _normalize_chunk(chunk):
+    """Map a chunk's columns onto JobListing fields"""
+    columns = {str(column).strip().lower(): column for column in chunk.columns}
+    frame = pd.DataFrame(index=chunk.index)
+    for field, aliases in COLUMN_ALIASES.items():
+        source = next((columns[alias] for alias in aliases if alias in columns), None)
+        frame[field] = chunk[source].astype(str).str.strip() if source is not None else ""
+        frame.loc[frame[field].isin(["nan", "None"]), field] = ""
+    return frame[(frame["title"] != "") & (frame["description"] != "")]
+
+
+def _listing_source_id(row):
+    if row["source_id"]:
+        return row["source_id"][:FIELD_LENGTHS["source_id"]]
+    digest = hashlib.sha1(f"{row['title']}|{row['company']}|{row['description']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def ingest_chunk(frame, matcher, normalized, columns, fetched_at):
+    """
+    Insert one normalized chunk, skipping listings already in the catalog
+
+    Returns:
+        tuple: (inserted, skipped)
+    """
+    frame = frame.assign(source_id=frame.apply(_listing_source_id, axis=1)).drop_duplicates("source_id")
+    existing = set(db.session.execute(
+        select(JobListing.source_id).where(
+            JobListing.source == CATALOG_SOURCE,
+            JobListing.source_id.in_(frame["source_id"].tolist())
+        )
+    ).scalars())
+    skipped = len(existing)
+    frame = frame[~frame["source_id"].isin(existing)]
+    if frame.empty:
+        return 0, skipped
+
+    # Skill profiles for the whole chunk in one pass of the compiled matcher
+    incidence = skill_incidence_matrix((frame["title"] + " " + frame["description"]).tolist(), matcher, columns)
+    rows = []
+    for profile, record in zip(incidence, frame.to_dict("records")):
+        row = {field: (value[:FIELD_LENGTHS[field]] if field in FIELD_LENGTHS else value) or None
+               for field, value in record.items()}
+        row.update(source=CATALOG_SOURCE, fetched_at=fetched_at,
+                   skills=json.dumps([normalized[j] for j in profile.nonzero()[0]]))
+        rows.append(row)
+
+    last_id = db.session.execute(select(db.func.coalesce(db.func.max(JobListing.id), 0))).scalar()
+    db.session.execute(insert(JobListing), rows)
+    if _dialect() == "sqlite":
+        _index_rows_after(last_id)
+    db.session.commit()
+    return len(rows), skipped
+
+
+def ingest_files(paths, chunk_size=CHUNK_SIZE):
+    """
+    Stream catalog files into JobListing
+
+    Args:
+        paths (list): CSV or JSONL files with at least title and description columns
+        chunk_size (int): Rows per batch
+
+    Returns:
+        dict: rows read, inserted, skipped (already present or missing title/description)
+    """
+    ensure_search_index()
+    matcher, normalized, columns = build_skill_matcher(skill_vocabulary())
+    fetched_at = datetime.utcnow()
+    stats = {"read": 0, "inserted": 0, "skipped": 0}
+
+    for path in paths:
+        logger.info(f"Ingesting job catalog file {path}")
+        for chunk in _read_chunks(path, chunk_size):
+            frame = _normalize_chunk(chunk)
+            inserted, skipped = ingest_chunk(frame, matcher, normalized, columns, fetched_at)
+            stats["read"] += len(chunk)
+            stats["inserted"] += inserted
+            stats["skipped"] += skipped + len(chunk) - len(frame)
+            logger.info(f"{path}: {stats['read']} rows read, {stats['inserted']} inserted")
+    return stats
+
+
+def _query_terms(resume_text, skills):
+    terms = [" ".join(str(skill).split()) for skill in (skills or []) if str(skill).strip()]
+    if not terms:
+        from utils.job_matcher import extract_skills_from_text
+        terms = extract_skills_from_text(resume_text or "")
+    # Quoted phrases; double quotes inside a term are escaped by doubling in both syntaxes
+    return [f'"{term.replace(chr(34), chr(34) * 2)}"' for term in terms[:MAX_QUERY_TERMS]]
+
+
+def search_catalog(resume_text, skills=None, limit=CANDIDATE_LIMIT, engine=None):
+    """
+    Catalog listings best matching a resume, from the full-text index
+
+    Args:
+        resume_text (str): Resume text, used when no skills are given
+        skills (list): Resume skills, the search terms
+        limit (int): Maximum listings
+        engine: Engine to query instead of db.session, for processes without
+            an app context (the upload pipeline workers)
+
+    Returns:
+        list: dicts with job_title, description and skills (profile list);
+        empty if the catalog or index is missing
+    """
+    terms = _query_terms(resume_text, skills)
+    if not terms:
+        return []
+    dialect = (engine or db.engine).dialect.name
+    if dialect == "sqlite":
+        statement = text(
+            f"SELECT j.title, j.description, j.skills FROM {FTS_TABLE} "
+            f"JOIN job_listing j ON j.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :query AND j.source = :source "
+            f"ORDER BY bm25({FTS_TABLE}, 5.0, 1.0, 3.0) LIMIT :limit"
+        )
+    elif dialect == "postgresql":
+        statement = text(
+            "SELECT title, description, skills FROM job_listing, websearch_to_tsquery('english', :query) q "
+            "WHERE source = :source AND search_vector @@ q "
+            "ORDER BY ts_rank_cd(search_vector, q) DESC LIMIT :limit"
+        )
+    else:
+        return []
+    params = {"query": " OR ".join(terms), "source": CATALOG_SOURCE, "limit": limit}
+    try:
+        if engine is None:
+            rows = db.session.execute(statement, params).fetchall()
+        else:
+            with engine.connect() as connection:
+                rows = connection.execute(statement, params).fetchall()
+    except (OperationalError, ProgrammingError) as e:
+        # No index yet: nothing has been ingested on this database
+        if engine is None:
+            db.session.rollback()
+        logger.debug(f"Job catalog search unavailable: {str(e)}")
+        return []
+    return [{"job_title": title, "description": description, "skills": json.loads(skills or "[]")}
+            for title, description, skills in rows]
+
+
+def catalog_version():
+    """
+    Identifies the current job catalog contents: the reference catalog's
+    content hash plus the number and newest id of ingested listings
+
+    Returns:
+        str
+    """
+    count, newest = db.session.query(func.count(JobListing.id), func.max(JobListing.id)).filter(
+        JobListing.source == CATALOG_SOURCE
+    ).one()
+    return f"{get_title_catalog().digest[:16]}:{count}:{newest or 0}"
+
+
+def get_candidate_jobs(resume_text, skills=None, limit=CANDIDATE_LIMIT, engine=None):
+    """
+    Candidate set for find_matching_jobs(): catalog search results, or the reference catalog
+
+    Args:
+        engine: Engine to search through instead of db.session (see search_catalog)
+
+    Returns:
+        pandas.DataFrame: job_title and description columns (plus skills for catalog rows)
+    """
+    listings = search_catalog(resume_text, skills, limit, engine)
+    if listings:
+        logger.info(f"Matching against {len(listings)} catalog listings")
+        return pd.DataFrame(listings)
+    return get_title_catalog().as_frame()
@@ -0,0 +1,146 @@
+"""
+Near-duplicate detection for job listings
+
+The same posting often comes back several times - reposted by agencies,
+syndicated under a slightly different title, or returned by two searches.
+Each listing is reduced to a set of shingles (title words, company, and
+word 3-grams of the description) and summarised by a MinHash signature,
+whose per-slot agreement estimates the Jaccard similarity of two sets.
+
+Candidate pairs are found with LSH banding: signatures are cut into BANDS
+bands of ROWS slots, and only listings that agree on a whole band are
+compared. That keeps a batch at roughly linear time instead of comparing
+every pair, while pairs above about (1 / BANDS) ** (1 / ROWS) similarity are
+almost always found.
+"""
+import os
+import re
+import hashlib
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Estimated Jaccard similarity at or above which two listings are the same posting
+SIMILARITY_THRESHOLD = float(os.environ.get("JOB_DEDUPE_THRESHOLD", "0.7"))
+SHINGLE_SIZE = 3
+
+# Fixed seed: signatures are stored on JobListing and must match across processes and restarts
+_rng = np.random.default_rng(20240501)
+_MASKS = _rng.integers(0, 2**32, size=NUM_PERM, dtype=np.uint64)
+_MULTIPLIERS = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_EMPTY_SIGNATURE = np.full(NUM_PERM, 2**32 - 1, dtype=np.uint32)
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+def _words(text):
+    return _WORD.findall(_TAG.sub(" ", text or "").lower())
+
+
+def listing_shingles(job):
+    """
+    Shingle set of a listing: title words, company name, description word 3-grams
+
+    Returns:
+        set: Feature strings
+    """
+    shingles = {f"t:{word}" for word in _words(job.get("title"))}
+    company = " ".join(_words(job.get("company")))
+    if company:
+        shingles.add(f"c:{company}")
+    words = _words(job.get("description"))
+    if 0 < len(words) < SHINGLE_SIZE:
+        shingles.add("d:" + " ".join(words))
+    shingles.update("d:" + " ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return shingles
+
+
+def minhash(job):
+    """
+    MinHash signature of a listing
+
+    Returns:
+        numpy.ndarray: NUM_PERM uint32 minima
+    """
+    shingles = listing_shingles(job)
+    if not shingles:
+        return _EMPTY_SIGNATURE.copy()
+    # 32-bit base hash per shingle (stable across processes, unlike hash()), then
+    # NUM_PERM cheap permutations: xor a mask, multiply by an odd constant, keep the high bits
+    base = np.array(
+        [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+        dtype=np.uint64
+    )
+    mixed = ((base[:, None] ^ _MASKS[None, :]) * _MULTIPLIERS[None, :]) >> np.uint64(32)
+    return mixed.min(axis=0).astype(np.uint32)
+
+
+def signature_bytes(job):
+    """MinHash signature serialized for JobListing.minhash"""
+    return minhash(job).tobytes()
+
+
+def _signature_of(job):
+    stored = job.get("minhash")
+    if stored is not None and len(stored) == NUM_PERM * 4:
+        return np.frombuffer(stored, dtype=np.uint32)
+    return minhash(job)
+
+
+def find_duplicates(signatures, threshold=SIMILARITY_THRESHOLD):
+    """
+    Group near-identical signatures
+
+    Args:
+        signatures (list): MinHash signatures, in priority order
+        threshold (float): Estimated Jaccard similarity counted as a duplicate
+
+    Returns:
+        list: For each signature, the index of the earliest one it duplicates
+        (its own index when it is the first of its group)
+    """
+    buckets = defaultdict(list)
+    owner = list(range(len(signatures)))
+
+    for i, signature in enumerate(signatures):
+        candidates = set()
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            candidates.update(buckets[key])
+            buckets[key].append(i)
+        # Earlier listings win; only originals are compared, so groups do not chain
+        for j in sorted(candidates):
+            if owner[j] == j and np.count_nonzero(signature == signatures[j]) / NUM_PERM >= threshold:
+                owner[i] = j
+                break
+    return owner
+
+
+def dedupe_jobs(jobs, threshold=SIMILARITY_THRESHOLD):
+    """
+    Drop near-duplicate listings, keeping the first (highest ranked) of each group
+
+    Listings read from JobListing carry their stored 'minhash'; others are
+    signed here.
+
+    Args:
+        jobs (list): Listing dicts with 'title', 'company' and 'description'
+        threshold (float): Estimated Jaccard similarity counted as a duplicate
+
+    Returns:
+        list: The listings that are not duplicates of an earlier one
+    """
+    if not jobs:
+        return []
+    owner = find_duplicates([_signature_of(job) for job in jobs], threshold)
+    unique = [job for i, job in enumerate(jobs) if owner[i] == i]
+    if len(unique) < len(jobs):
+        logger.info(f"Dropped {len(jobs) - len(unique)} near-duplicate job listings out of {len(jobs)}")
+    return unique
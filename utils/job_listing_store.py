@@ -0,0 +1,178 @@
+"""
+Database-backed cache of Adzuna search results
+
+Search results are upserted into JobListing keyed by a normalized query key.
+Reads follow stale-while-revalidate:
+
+- fresh (younger than JOB_CACHE_TTL): served from the database
+- stale (younger than JOB_CACHE_MAX_STALE): served from the database while a
+  background refresh fetches new results
+- older, or missing: fetched live; if Adzuna has nothing, whatever rows we
+  still have are served before falling back to get_fallback_jobs()
+"""
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, JobListing
+from utils.background_tasks import submit_task
+from utils.adzuna_enhanced import fetch_jobs, simplify_keywords, get_fallback_jobs
+from utils.job_ranker import stable_base_score
+from utils.job_dedupe import dedupe_jobs, signature_bytes
+
+logger = logging.getLogger(__name__)
+
+FRESH_TTL = timedelta(seconds=int(os.environ.get("JOB_CACHE_TTL", str(6 * 3600))))
+MAX_STALE = timedelta(seconds=int(os.environ.get("JOB_CACHE_MAX_STALE", str(7 * 24 * 3600))))
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def make_query_key(keywords, location="Remote", country="gb"):
+    """Normalized cache key; queries that Adzuna would see identically share a key"""
+    return "|".join([
+        " ".join(simplify_keywords(keywords).lower().split()),
+        " ".join((location or "remote").lower().split()),
+        (country or "gb").lower()
+    ])[:255]
+
+
+def _to_job(listing):
+    """Rebuild the listing dict that the templates expect"""
+    return {
+        "title": listing.title,
+        "company": listing.company,
+        "description": listing.description,
+        "match_score": stable_base_score(listing.source_id),
+        "apply_url": listing.url or "#",
+        "location": listing.location,
+        "salary_min": listing.salary_min,
+        "salary_max": listing.salary_max,
+        "created": listing.posted_at,
+        "source_id": listing.source_id,
+        "country": listing.country,
+        "minhash": listing.minhash
+    }
+
+
+def _text(value, length):
+    """Column value for an optional field; NULL when missing, not the string 'None'"""
+    return str(value)[:length] if value is not None else None
+
+
+def store_jobs(query_key, jobs):
+    """
+    Replace the stored results for a query with a fresh fetch
+
+    Rows are updated in place when the same listing comes back, inserted when
+    new, and listings that dropped out of the results are removed. Near-duplicate
+    postings (reposts of the same job) are stored once, at their best rank.
+    """
+    now = datetime.utcnow()
+    existing = {row.source_id: row for row in JobListing.query.filter_by(query_key=query_key)}
+    kept = set()
+
+    for job in jobs:
+        job.setdefault("minhash", signature_bytes(job))
+    jobs = dedupe_jobs(jobs)
+
+    for rank, job in enumerate(jobs):
+        source_id = job.get("source_id") or f"{job.get('title')}|{job.get('company')}"
+        if source_id in kept:
+            continue
+        kept.add(source_id)
+
+        row = existing.get(source_id) or JobListing(query_key=query_key, source='adzuna', source_id=source_id)
+        row.title = (job.get("title") or "Unknown Title")[:200]
+        row.company = (job.get("company") or "")[:100]
+        row.description = job.get("description") or ""
+        row.url = (job.get("apply_url") or "")[:500]
+        row.country = job.get("country")
+        row.location = (job.get("location") or "")[:200]
+        row.salary_min = _text(job.get("salary_min"), 50)
+        row.salary_max = _text(job.get("salary_max"), 50)
+        row.posted_at = _text(job.get("created"), 50)
+        row.rank = rank
+        row.minhash = job["minhash"]
+        row.fetched_at = now
+        if row.id is None:
+            db.session.add(row)
+
+    for source_id, row in existing.items():
+        if source_id not in kept:
+            db.session.delete(row)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same query at the same time; its copy is as good as ours
+        db.session.rollback()
+        logger.info(f"Concurrent store for job query '{query_key}', keeping the other write")
+
+
+def refresh_query(keywords, location, country, results_per_page):
+    """Fetch live results for a query and store them; runs on the background task pool"""
+    query_key = make_query_key(keywords, location, country)
+    try:
+        jobs = fetch_jobs(keywords, location, country, results_per_page=results_per_page)
+        if jobs:
+            store_jobs(query_key, jobs)
+            logger.info(f"Refreshed {len(jobs)} cached jobs for '{query_key}'")
+        return len(jobs)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(query_key)
+
+
+def _schedule_refresh(app, keywords, location, country, results_per_page):
+    query_key = make_query_key(keywords, location, country)
+    with _refresh_lock:
+        if query_key in _refreshing:
+            return
+        _refreshing.add(query_key)
+    submit_task(app, refresh_query, keywords, location, country, results_per_page)
+
+
+def get_jobs(app, keywords, location="Remote", country="gb", results_per_page=5):
+    """
+    Job search served from JobListing with stale-while-revalidate
+
+    Args:
+        app: Flask application, used for background refreshes
+        keywords (str): Job title or keywords
+        location (str): Location, "Remote" for any
+        country (str): Country tried first
+        results_per_page (int): Number of listings wanted
+
+    Returns:
+        list: Job dictionaries, same shape as adzuna_enhanced.search_jobs()
+    """
+    query_key = make_query_key(keywords, location, country)
+    rows = JobListing.query.filter_by(query_key=query_key).order_by(JobListing.rank).all()
+
+    age = None
+    if rows:
+        age = datetime.utcnow() - min(row.fetched_at or datetime.min for row in rows)
+        if age < FRESH_TTL:
+            logger.info(f"Serving {len(rows)} fresh cached jobs for '{query_key}'")
+            return [_to_job(row) for row in rows[:results_per_page]]
+        if age < MAX_STALE:
+            logger.info(f"Serving stale cached jobs for '{query_key}' (age {age}), refreshing in background")
+            _schedule_refresh(app, keywords, location, country, results_per_page)
+            return [_to_job(row) for row in rows[:results_per_page]]
+
+    jobs = fetch_jobs(keywords, location, country, results_per_page=results_per_page)
+    if jobs:
+        store_jobs(query_key, jobs)
+        return jobs
+
+    if rows:
+        # Adzuna is down or empty; very old results still beat placeholder listings
+        logger.warning(f"Adzuna returned nothing for '{query_key}', serving cached jobs aged {age}")
+        return [_to_job(row) for row in rows[:results_per_page]]
+
+    return get_fallback_jobs()
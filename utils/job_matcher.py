@@ -4,7 +4,7 @@ Optimized job matching module for resume analysis
 import logging
 import re
 import pandas as pd
-from utils.ats_scorer import calculate_ats_score, calculate_resume_job_similarity
+from utils.ats_scorer import calculate_ats_score, calculate_profile_ats_score, calculate_resume_job_similarity
 from utils.advanced_analyzer import calculate_job_match_scores
 
 # Setup logging
@@ -35,10 +35,12 @@ def find_matching_jobs(resume_text, job_df, skills=None, top_n=5):
         resume_text = resume_text[:5000]
         
         # Extract data from DataFrame
-        # Normalize column names to match CSV
-        job_df.columns = job_df.columns.str.lower()
+        # Normalize column names on a copy; the caller's frame is left untouched
+        job_df = job_df.rename(columns=str.lower)
         job_titles = job_df['job_title'].tolist()[:50]  # Limit to 50 jobs
         job_descriptions = job_df['description'].tolist()[:50]
+        # Catalog listings carry skill profiles computed at ingestion
+        job_profiles = job_df['skills'].tolist()[:50] if 'skills' in job_df.columns else [None] * len(job_titles)
         
         # Extract or use provided skills
         skills = skills or extract_skills_from_text(resume_text)
@@ -50,7 +52,10 @@ def find_matching_jobs(resume_text, job_df, skills=None, top_n=5):
         for i, job_desc in enumerate(job_descriptions):
             # Limit description size
             job_desc = job_desc[:2000] if job_desc else ""
-            result = calculate_ats_score(skills, job_desc)
+            if job_profiles[i]:
+                result = calculate_profile_ats_score(skills, job_profiles[i])
+            else:
+                result = calculate_ats_score(skills, job_desc)
             ats_scores.append(result['score'])
             ats_details.append(result)
             logger.info(f"Job '{job_titles[i]}' ATS Score: {result['score']}%")
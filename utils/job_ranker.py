@@ -0,0 +1,143 @@
+"""
+Resume-aware re-ranking of job listings
+
+Listings are scored against the candidate's skills in one vectorized pass:
+a single compiled regex over all skills builds a listing x skill incidence
+matrix (separately for descriptions and titles), and the scores are a few
+matrix-vector products on it. Everything is deterministic - ties are broken
+by the listing's original position, and no per-process hash() is involved.
+"""
+import re
+import zlib
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of each signal in the final relevance (sums to 1)
+DESCRIPTION_WEIGHT = 0.65
+TITLE_WEIGHT = 0.20
+SOURCE_RANK_WEIGHT = 0.15
+
+# Characters that count as part of a skill token, so "java" does not match inside "javascript"
+# and "c" does not match the start of "c++"
+_TOKEN_CHARS = r"\w+#"
+
+
+def stable_base_score(job_id, low=70, span=25):
+    """Deterministic placeholder score in [low, low + span) for a listing id (same in every process)"""
+    return low + zlib.crc32(str(job_id or "").encode("utf-8")) % span
+
+
+@lru_cache(maxsize=256)
+def _compile_matcher(skills):
+    # Longest first so "machine learning" wins over "machine" in the alternation
+    ordered = sorted(set(skills), key=len, reverse=True)
+    pattern = "|".join(re.escape(skill) for skill in ordered)
+    return re.compile(rf"(?<![{_TOKEN_CHARS}])(?:{pattern})(?![{_TOKEN_CHARS}])")
+
+
+def build_skill_matcher(skills):
+    """
+    Compile one regex matching any of the skills (case-insensitive via lowercased input)
+
+    Returns:
+        tuple: (compiled pattern or None, list of normalized skills, {skill: column index})
+    """
+    normalized = []
+    for skill in skills or []:
+        skill = " ".join(str(skill).lower().split())
+        if skill and skill not in normalized:
+            normalized.append(skill)
+    if not normalized:
+        return None, [], {}
+    return _compile_matcher(tuple(normalized)), normalized, {skill: i for i, skill in enumerate(normalized)}
+
+
+def skill_incidence_matrix(texts, matcher, columns):
+    """
+    Listing x skill boolean matrix: cell (i, j) is set when skill j occurs in text i
+
+    Args:
+        texts (list): One string per listing
+        matcher: Compiled pattern from build_skill_matcher
+        columns (dict): skill -> column index
+
+    Returns:
+        numpy.ndarray: Boolean array of shape (len(texts), len(columns))
+    """
+    matrix = np.zeros((len(texts), len(columns)), dtype=bool)
+    if matcher is None:
+        return matrix
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for skill in matcher.findall((text or "").lower()):
+            rows.append(row)
+            cols.append(columns[skill])
+    matrix[rows, cols] = True
+    return matrix
+
+
+def rank_jobs(jobs, skills, skill_levels=None, resume_ats_score=None):
+    """
+    Score and sort listings against the resume's skills
+
+    Args:
+        jobs (list): Listing dicts with 'title' and 'description'
+        skills (list): Candidate skill names
+        skill_levels (dict): Optional skill name -> 0-100 level from the skills test;
+            tested skills count for more
+        resume_ats_score (float): Resume ATS score; sets the top of the score range
+
+    Returns:
+        list: Copies of the listings, best first, with 'match_score' (int) and
+        'matched_skills' set
+    """
+    if not jobs:
+        return []
+
+    matcher, normalized, columns = build_skill_matcher(skills)
+    descriptions = skill_incidence_matrix([job.get("description", "") for job in jobs], matcher, columns)
+    titles = skill_incidence_matrix([job.get("title", "") for job in jobs], matcher, columns)
+
+    # Skill weights: 1 for an untested skill, up to 2 for a skill scored 100 in the skills test
+    levels = {" ".join(str(k).lower().split()): v for k, v in (skill_levels or {}).items()}
+    weights = np.array([1.0 + (levels.get(skill) or 0) / 100.0 for skill in normalized])
+    total_weight = weights.sum() if len(weights) else 0.0
+
+    n = len(jobs)
+    if total_weight > 0:
+        coverage = descriptions @ weights / total_weight
+        title_hits = titles @ weights
+        title_score = title_hits / title_hits.max() if title_hits.max() > 0 else np.zeros(n)
+    else:
+        coverage = np.zeros(n)
+        title_score = np.zeros(n)
+    # Keep some of the source's own ordering (Adzuna relevance / fusion rank)
+    source_rank = 1.0 / (1.0 + np.arange(n) / 5.0)
+
+    relevance = (DESCRIPTION_WEIGHT * coverage
+                 + TITLE_WEIGHT * title_score
+                 + SOURCE_RANK_WEIGHT * source_rank)
+
+    # Resume-aware ceiling: a strong resume can reach higher match scores
+    ats = 75.0 if resume_ats_score is None else float(resume_ats_score)
+    ceiling = min(97.0, max(75.0, ats + 15.0))
+    scores = np.rint(ceiling * (0.65 + 0.35 * relevance)).astype(int)
+
+    # Sort by score, then by original position for stable, deterministic ties
+    order = np.lexsort((np.arange(n), -scores))
+
+    matched_skills = [[] for _ in range(n)]
+    for i, j in zip(*np.nonzero(descriptions | titles)):
+        matched_skills[i].append(normalized[j])
+
+    ranked = []
+    for i in order.tolist():
+        job = dict(jobs[i])
+        job["match_score"] = int(scores[i])
+        job["matched_skills"] = matched_skills[i]
+        ranked.append(job)
+    return ranked
@@ -0,0 +1,247 @@
+"""
+Cursor-paginated job recommendations
+
+The ranked candidate set is built in blocks. Block 1 is the cached search
+for the resume's top job title (job_listing_store.get_jobs) merged with one
+batched search for its other top titles (adzuna_enhanced.search_jobs_batch),
+and block N is Adzuna result page N for the top title. Each block is deduplicated, ranked against the resume
+with job_ranker.rank_jobs and kept in the shared cache, so paging never
+re-runs the resume analysis or re-scores listings already seen.
+
+Pages walk the blocks in order. Within a block, listings are ordered by
+(score descending, listing id); a cursor is the keyset position of the last
+listing served, (block, score, id), signed so clients cannot forge one for
+another analysis. While the user reads a page, the block the next page will
+come from is fetched and scored on the background task pool.
+"""
+import os
+import json
+import zlib
+import hashlib
+import logging
+import threading
+
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from utils.shared_cache import cache_get, cache_set
+from utils.background_tasks import submit_task
+from utils.job_ranker import rank_jobs
+from utils.job_dedupe import dedupe_jobs
+from utils.job_listing_store import get_jobs
+from utils.adzuna_enhanced import fetch_jobs, normalize_query, search_jobs_batch
+from utils.job_catalog import get_candidate_jobs
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = int(os.environ.get("JOB_RECOMMENDATION_BLOCK_SIZE", "20"))
+MAX_BLOCKS = 10
+CACHE_TTL = int(os.environ.get("JOB_RECOMMENDATION_TTL", "1800"))
+MAX_PAGE_SIZE = 20
+
+FEATURES_NAMESPACE = "resume_job_titles"
+BLOCKS_NAMESPACE = "job_recommendation_blocks"
+
+# Fields returned to clients; the stored MinHash signature is not JSON-friendly
+PUBLIC_FIELDS = ("id", "title", "company", "description", "match_score", "matched_skills", "apply_url",
+                 "location", "salary_min", "salary_max", "created", "country")
+
+_building = set()
+_building_lock = threading.Lock()
+
+
+def top_job_titles(resume_text, skills, top_n=3):
+    """Job titles from the job catalog that best fit the resume"""
+    from utils.job_matcher import find_matching_jobs
+    try:
+        job_matches = find_matching_jobs(resume_text, get_candidate_jobs(resume_text, skills), skills=skills, top_n=top_n)
+        job_titles = [match[0] for match in job_matches]
+        logger.info(f"Found top job titles: {job_titles}")
+        return job_titles
+    except Exception as e:
+        logger.error(f"Error finding matching job titles: {str(e)}")
+        return []
+
+
+def get_resume_features(analysis, candidate):
+    """
+    Resume inputs to ranking, with the expensive job title matching cached per analysis
+
+    Args:
+        analysis: ResumeAnalysis
+        candidate: Candidate owning the analysis
+
+    Returns:
+        dict: key, skills, skill_levels, ats_score, job_titles
+    """
+    skills = [skill.skill_name for skill in candidate.skills]
+    skill_levels = {skill.skill_name: skill.skill_level for skill in candidate.skills}
+
+    found, job_titles = cache_get(FEATURES_NAMESPACE, str(analysis.id))
+    if not found:
+        job_titles = top_job_titles(analysis.resume_text, skills)
+        if job_titles:
+            cache_set(FEATURES_NAMESPACE, str(analysis.id), job_titles, CACHE_TTL)
+    if not job_titles:
+        job_titles = ["Developer", "Software Engineer", "Web Developer"]
+
+    # Blocks are scored against these exact inputs; a skills test retake gets fresh blocks
+    key = hashlib.sha1(json.dumps(
+        [analysis.id, skills, sorted(skill_levels.items()), analysis.ats_score, job_titles], default=str
+    ).encode("utf-8")).hexdigest()
+    return {
+        "key": key,
+        "skills": skills,
+        "skill_levels": skill_levels,
+        "ats_score": analysis.ats_score,
+        "job_titles": job_titles
+    }
+
+
+def listing_id(job):
+    """Stable id for keyset ordering (fallback listings have no source id)"""
+    return str(job.get("source_id") or zlib.crc32(f"{job.get('title')}|{job.get('company')}".encode("utf-8")))
+
+
+def _block_key(features, query, block):
+    return f"{features['key']}|{query}|{block}"
+
+
+def _fetch_block_listings(app, features, query, block):
+    if block > 1:
+        return fetch_jobs(query, page=block, results_per_page=BLOCK_SIZE)
+    jobs = get_jobs(app, query, results_per_page=BLOCK_SIZE)
+    # The other top titles, weighted by rank; titles that reduce to the top title's search are skipped
+    other_titles = [(title, 1.0 / (rank + 2)) for rank, title in enumerate(features["job_titles"][1:])
+                    if normalize_query(title) != normalize_query(query)]
+    if other_titles:
+        jobs = jobs + search_jobs_batch(other_titles, results_per_page=BLOCK_SIZE)
+    return jobs
+
+
+def build_block(app, features, query, block):
+    """
+    Fetch, deduplicate and rank one block of listings, and cache it
+
+    Returns:
+        list: Public listing dicts ordered by (score desc, id)
+    """
+    try:
+        jobs = _fetch_block_listings(app, features, query, block)
+        if block > 1 and jobs:
+            # Adzuna pages overlap when listings are reposted; drop those seen in the previous block
+            found, previous = cache_get(BLOCKS_NAMESPACE, _block_key(features, query, block - 1))
+            if found and previous:
+                jobs = dedupe_jobs(previous + jobs)[len(previous):]
+        ranked = rank_jobs(dedupe_jobs(jobs), features["skills"], features["skill_levels"], features["ats_score"])
+
+        listings = []
+        for job in ranked:
+            job["id"] = listing_id(job)
+            listings.append({field: job.get(field) for field in PUBLIC_FIELDS})
+        listings.sort(key=lambda job: (-job["match_score"], job["id"]))
+
+        cache_set(BLOCKS_NAMESPACE, _block_key(features, query, block), listings, CACHE_TTL)
+        return listings
+    finally:
+        with _building_lock:
+            _building.discard(_block_key(features, query, block))
+
+
+def _get_block(app, features, query, block):
+    found, listings = cache_get(BLOCKS_NAMESPACE, _block_key(features, query, block))
+    if found:
+        return listings
+    return build_block(app, features, query, block)
+
+
+def _prefetch_block(app, features, query, block):
+    key = _block_key(features, query, block)
+    if block > MAX_BLOCKS or cache_get(BLOCKS_NAMESPACE, key)[0]:
+        return
+    with _building_lock:
+        if key in _building:
+            return
+        _building.add(key)
+    logger.info(f"Prefetching job recommendation block {block} for '{query}'")
+    submit_task(app, build_block, app, features, query, block)
+
+
+def _serializer(app):
+    return URLSafeSerializer(app.secret_key, salt="job-recommendations")
+
+
+def encode_cursor(app, state):
+    """Opaque, signed cursor for a keyset position"""
+    return _serializer(app).dumps(state)
+
+
+def decode_cursor(app, cursor, analysis_id):
+    """
+    Decode a cursor from the client
+
+    Returns:
+        dict: Keyset state, or None for the first page
+
+    Raises:
+        ValueError: If the cursor is malformed, forged or belongs to another analysis
+    """
+    if not cursor:
+        return None
+    try:
+        state = _serializer(app).loads(cursor)
+    except BadSignature:
+        raise ValueError("Invalid cursor")
+    if not isinstance(state, dict) or state.get("a") != analysis_id:
+        raise ValueError("Invalid cursor")
+    return state
+
+
+def get_recommendation_page(app, features, analysis_id, state=None, limit=5):
+    """
+    One page of ranked recommendations after a keyset position
+
+    Args:
+        app: Flask application, used for background prefetch
+        features (dict): From get_resume_features()
+        analysis_id (int): Analysis the cursor is bound to
+        state (dict): Decoded cursor, None for the first page
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of listing dicts, next cursor or None when exhausted)
+    """
+    limit = max(1, min(MAX_PAGE_SIZE, limit))
+    query = (state or {}).get("q") or features["job_titles"][0]
+    block = (state or {}).get("b", 1)
+    after = (-state["s"], state["i"]) if state and state.get("i") is not None else None
+
+    page = []
+    next_state = None
+    while block <= MAX_BLOCKS:
+        listings = _get_block(app, features, query, block)
+        if not listings:
+            break
+        remaining = listings if after is None else [
+            job for job in listings if (-job["match_score"], job["id"]) > after
+        ]
+        taken = remaining[:limit - len(page)]
+        page.extend(taken)
+        if len(page) >= limit:
+            if len(taken) < len(remaining):
+                last = taken[-1]
+                next_state = {"a": analysis_id, "q": query, "b": block, "s": last["match_score"], "i": last["id"]}
+            else:
+                next_state = {"a": analysis_id, "q": query, "b": block + 1}
+            break
+        block += 1
+        after = None
+
+    if next_state and next_state["b"] <= MAX_BLOCKS:
+        # Score what the reader will ask for next while they read this page
+        _prefetch_block(app, features, query, next_state["b"])
+        if next_state.get("i") is not None:
+            left = len(listings) - listings.index(page[-1]) - 1
+            if left < limit:
+                _prefetch_block(app, features, query, next_state["b"] + 1)
+        return page, encode_cursor(app, next_state)
+    return page, None
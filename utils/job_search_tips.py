@@ -11,6 +11,8 @@ from time import sleep
 # Import the OpenAI library 
 from openai import OpenAI
 
+from utils.prompt_compactor import compact_resume
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -53,7 +55,7 @@ def generate_unique_job_search_tips(resume_text, job_titles=None, experience_yea
     They are primarily interested in positions like: {job_titles_str}.
     
     Here's a brief extract from their resume for better context:
-    {resume_text[:500]}...
+    {compact_resume(resume_text, 'job_search_context')}
     """
     
     prompt_template = f"""
@@ -0,0 +1,166 @@
+"""
+Process-wide catalog of reference job titles and descriptions
+
+attached_assets/job_title_des.csv used to be read with pd.read_csv on every
+request (and misparsed: descriptions contain unquoted commas). It is now
+loaded once per process into an immutable JobTitleCatalog with normalized
+columns and precomputed skill profiles. get_title_catalog() checks the file's
+mtime/size at most every JOB_CATALOG_RELOAD_INTERVAL seconds and rebuilds the
+catalog only when the content hash changes; readers always see one complete
+catalog, never a half-loaded one. If a reload fails, the previous catalog
+stays in service.
+"""
+import os
+import csv
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.environ.get(
+    "JOB_TITLE_CATALOG_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "attached_assets", "job_title_des.csv")
+)
+RELOAD_CHECK_INTERVAL = float(os.environ.get("JOB_CATALOG_RELOAD_INTERVAL", "5"))
+
+# Header spellings for the title column; anything after the first field is the description
+TITLE_HEADERS = {"job_title", "job title", "title"}
+
+_catalog = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class JobTitleCatalog:
+    """Immutable snapshot of the reference job catalog"""
+    titles: tuple = ()
+    descriptions: tuple = ()
+    skill_profiles: tuple = ()  # per job: tuple of normalized skills found in title + description
+    lowered_titles: tuple = ()
+    description_map: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    path: str = ""
+    digest: str = ""
+    mtime: float = 0.0
+    size: int = 0
+
+    def __len__(self):
+        return len(self.titles)
+
+    def as_frame(self):
+        """
+        The catalog as a new DataFrame (job_title, description, skills)
+
+        Each call returns a fresh frame, so callers may modify it freely.
+        """
+        return pd.DataFrame({
+            "job_title": list(self.titles),
+            "description": list(self.descriptions),
+            "skills": [list(profile) for profile in self.skill_profiles]
+        })
+
+    def find_description(self, job_title):
+        """Description of the first catalog title containing, or contained in, job_title"""
+        wanted = (job_title or "").lower()
+        if not wanted:
+            return ""
+        for i, title in enumerate(self.lowered_titles):
+            if wanted in title or title in wanted:
+                return self.descriptions[i]
+        return ""
+
+
+def _decode(data):
+    for encoding in ("utf-8-sig", "utf-16"):
+        try:
+            return data.decode(encoding)
+        except UnicodeError:
+            continue
+    return data.decode("latin1")
+
+
+def parse_catalog(text):
+    """
+    Parse catalog CSV text into (title, description) pairs
+
+    Titles never contain commas but descriptions often do, unquoted, so
+    everything after the first field is the description.
+    """
+    rows = []
+    for i, row in enumerate(csv.reader(text.splitlines())):
+        if not row or not row[0].strip():
+            continue
+        if i == 0 and row[0].strip().lower() in TITLE_HEADERS:
+            continue
+        title = row[0].strip()
+        description = ",".join(row[1:]).strip()
+        rows.append((title, description))
+    return rows
+
+
+def build_catalog(data, path="", mtime=0.0, size=0):
+    """Build a JobTitleCatalog from the raw file bytes"""
+    from utils.job_catalog import skill_vocabulary
+    from utils.job_ranker import build_skill_matcher, skill_incidence_matrix
+
+    rows = parse_catalog(_decode(data))
+    titles = tuple(title for title, _ in rows)
+    descriptions = tuple(description for _, description in rows)
+
+    matcher, normalized, columns = build_skill_matcher(skill_vocabulary())
+    incidence = skill_incidence_matrix([f"{t} {d}" for t, d in rows], matcher, columns)
+    profiles = tuple(tuple(normalized[j] for j in row.nonzero()[0]) for row in incidence)
+
+    return JobTitleCatalog(
+        titles=titles,
+        descriptions=descriptions,
+        skill_profiles=profiles,
+        lowered_titles=tuple(title.lower() for title in titles),
+        description_map=MappingProxyType(dict(zip(titles, descriptions))),
+        path=path,
+        digest=hashlib.sha256(data).hexdigest(),
+        mtime=mtime,
+        size=size
+    )
+
+
+def get_title_catalog():
+    """
+    The current catalog, reloaded if the file has changed
+
+    Returns:
+        JobTitleCatalog: Possibly empty if the file has never been readable
+    """
+    global _catalog, _checked_at
+    now = time.monotonic()
+    catalog = _catalog
+    if catalog is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+        return catalog
+
+    with _lock:
+        if _catalog is not None and now - _checked_at < RELOAD_CHECK_INTERVAL:
+            return _catalog
+        _checked_at = now
+        try:
+            stat = os.stat(CATALOG_PATH)
+            if _catalog is not None and (_catalog.mtime, _catalog.size) == (stat.st_mtime, stat.st_size):
+                return _catalog
+            with open(CATALOG_PATH, "rb") as f:
+                data = f.read()
+            if _catalog is not None and hashlib.sha256(data).hexdigest() == _catalog.digest:
+                # Touched but unchanged
+                _catalog = replace(_catalog, mtime=stat.st_mtime, size=stat.st_size)
+                return _catalog
+            _catalog = build_catalog(data, CATALOG_PATH, stat.st_mtime, stat.st_size)
+            logger.info(f"Loaded job title catalog with {len(_catalog)} jobs from {CATALOG_PATH}")
+        except Exception as e:
+            logger.error(f"Error loading job title catalog: {str(e)}")
+            if _catalog is None:
+                _catalog = JobTitleCatalog(path=CATALOG_PATH)
+        return _catalog
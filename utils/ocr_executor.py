@@ -0,0 +1,255 @@
+"""
+Parallel OCR with a node-wide concurrency limit
+
+ocr_document() splits its input into units of work and OCRs them in a
+process pool, then joins the text back together in order:
+
+- multi-page images (TIFF): one unit per page
+- a single large page: horizontal bands, cut only at blank rows so no line
+  of text is split, at most one band per worker. Each band is read on its
+  own, so side-by-side columns are read band by band.
+- rasterized PDF pages, via ocr_pages()
+
+Each unit is preprocessed (utils/ocr_processor.py) and OCRed in the worker.
+Tesseract is CPU bound and every web worker may start OCR at once, so each
+unit first takes one of OCR_MAX_CONCURRENT slots shared by all processes on
+the node (lock files under OCR_SLOT_DIR). That keeps a burst of scanned
+uploads from starving the web workers of CPU. Tesseract's own threading is
+disabled in the workers (OMP_THREAD_LIMIT=1) because the pool already
+provides the parallelism.
+"""
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from utils.ocr_processor import OCR_AVAILABLE, count_frames, load_image, ocr_array
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): the limit then applies per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CPU_COUNT = os.cpu_count() or 1
+OCR_WORKERS = int(os.environ.get("OCR_WORKERS", str(CPU_COUNT)))
+# Tesseract runs allowed at once across all processes; one core is left for the web workers
+MAX_CONCURRENT = int(os.environ.get("OCR_MAX_CONCURRENT", str(max(1, CPU_COUNT - 1))))
+SLOT_DIR = os.environ.get("OCR_SLOT_DIR", tempfile.gettempdir())
+# Seconds a unit waits for a slot before it is given up
+SLOT_WAIT = float(os.environ.get("OCR_SLOT_WAIT", "120"))
+# Pages are only cut into bands at least this tall (pixels at the OCR target DPI)
+MIN_BAND_HEIGHT = int(os.environ.get("OCR_MIN_BAND_HEIGHT", "800"))
+
+_pool = None
+_pool_lock = threading.Lock()
+_local_slots = threading.BoundedSemaphore(MAX_CONCURRENT)
+
+
+@contextmanager
+def ocr_slot(timeout=SLOT_WAIT):
+    """
+    Hold one of the MAX_CONCURRENT node-wide OCR slots
+
+    Raises:
+        TimeoutError: if no slot frees up within timeout seconds
+    """
+    if fcntl is None:
+        if not _local_slots.acquire(timeout=timeout):
+            raise TimeoutError("No OCR slot available")
+        try:
+            yield
+        finally:
+            _local_slots.release()
+        return
+
+    deadline = time.monotonic() + timeout
+    while True:
+        for slot in range(MAX_CONCURRENT):
+            handle = open(os.path.join(SLOT_DIR, f"resumeai_ocr_slot_{slot}.lock"), "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+            return
+        if time.monotonic() > deadline:
+            raise TimeoutError("No OCR slot available")
+        time.sleep(0.05)
+
+
+def _init_worker():
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def ocr_unit(gray, config=""):
+    """
+    Preprocess and OCR one page or band while holding an OCR slot (pool worker)
+
+    Returns:
+        dict: text, lines, confidence, steps, noise_sigma, denoised; error
+        instead of text on failure
+    """
+    report = {}
+    try:
+        start = time.perf_counter()
+        with ocr_slot():
+            report.setdefault("steps", {})["slot_wait"] = round((time.perf_counter() - start) * 1000, 1)
+            return ocr_array(gray, config, report)
+    except Exception as e:
+        report.update(text="", lines=[], error=str(e))
+        return report
+
+
+def split_bands(gray, max_bands):
+    """
+    Cut a page into up to max_bands horizontal bands at blank rows
+
+    Returns:
+        list: numpy arrays, top to bottom
+    """
+    height, width = gray.shape
+    count = min(max_bands, height // MIN_BAND_HEIGHT)
+    if count < 2:
+        return [gray]
+
+    # Rows with (almost) no dark pixels
+    blank = np.flatnonzero((gray < 128).sum(axis=1) <= width * 0.002)
+    window = height // (count * 4)
+    cuts = []
+    for k in range(1, count):
+        target = k * height // count
+        nearby = blank[(blank > target - window) & (blank < target + window)]
+        if len(nearby):
+            cuts.append(int(nearby[np.abs(nearby - target).argmin()]))
+    bounds = [0] + cuts + [height]
+    return [gray[top:bottom] for top, bottom in zip(bounds, bounds[1:]) if bottom > top]
+
+
+def _run_units(units, config):
+    """OCR units in the pool (inline if there is only one, or one worker)"""
+    if len(units) == 1 or OCR_WORKERS < 2:
+        return [ocr_unit(unit, config) for unit in units]
+    try:
+        pool = _get_pool()
+        return list(pool.map(ocr_unit, units, [config] * len(units)))
+    except BrokenProcessPool as e:
+        logger.error(f"OCR worker pool crashed, retrying inline: {str(e)}")
+        _reset_pool()
+        return [ocr_unit(unit, config) for unit in units]
+
+
+def ocr_pages(pages, config="", split=True):
+    """
+    OCR already loaded greyscale pages in parallel
+
+    Args:
+        pages (list): numpy greyscale arrays at the OCR target resolution
+        config (str): Extra tesseract options
+        split (bool): Cut pages into bands when there are fewer pages than workers
+
+    Returns:
+        dict: text (pages joined in order), lines (every OCR line with its
+        page number, boxes in page coordinates) and pages (per-page reports,
+        each with its text and mean word confidence)
+    """
+    bands_per_page = max(1, OCR_WORKERS // len(pages)) if split and pages else 1
+    units = []
+    owners = []
+    tops = []
+    for index, page in enumerate(pages):
+        top = 0
+        for band in split_bands(page, bands_per_page):
+            units.append(band)
+            owners.append(index)
+            tops.append(top)
+            top += band.shape[0]
+
+    results = _run_units(units, config)
+    if results and all(result.get("error") for result in results):
+        raise RuntimeError(f"OCR failed: {results[0]['error']}")
+
+    reports = [{"page": index + 1, "bands": 0, "texts": [], "lines": [], "steps": {}}
+               for index in range(len(pages))]
+    for owner, top, result in zip(owners, tops, results):
+        report = reports[owner]
+        report["bands"] += 1
+        for line in result.get("lines", []):
+            # Band coordinates to page coordinates
+            for box in [line["box"]] + [word["box"] for word in line["words"]]:
+                box[1] += top
+            report["lines"].append(dict(line, page=owner + 1))
+        if result.get("error"):
+            report["error"] = result["error"]
+            logger.warning(f"OCR of page {owner + 1} failed: {result['error']}")
+        if result.get("text", "").strip():
+            report["texts"].append(result["text"].strip())
+        for step, ms in result.get("steps", {}).items():
+            report["steps"][step] = round(report["steps"].get(step, 0) + ms, 1)
+        report["denoised"] = report.get("denoised", False) or result.get("denoised", False)
+
+    lines = []
+    for report in reports:
+        report["text"] = "\n".join(report.pop("texts"))
+        report["chars"] = len(report["text"])
+        words = [word for line in report["lines"] for word in line["words"]]
+        report["confidence"] = round(sum(word["conf"] for word in words) / len(words), 1) if words else 0.0
+        lines.extend(report.pop("lines"))
+    return {"text": "\n\n".join(report["text"] for report in reports if report["text"]),
+            "lines": lines, "pages": reports}
+
+
+def ocr_document(source, config=""):
+    """
+    OCR an image file, page by page (and band by band) in parallel
+
+    Args:
+        source: Path, bytes, or binary file object
+        config (str): Extra tesseract options
+
+    Returns:
+        dict: text, lines, pages (per-page reports with step timings) and ms
+
+    Raises:
+        RuntimeError: if OCR is unavailable or failed on every page
+    """
+    if not OCR_AVAILABLE:
+        raise RuntimeError("OCR functionality is not available")
+    start = time.perf_counter()
+    if hasattr(source, "read"):
+        source = source.read()
+    pages = [load_image(source, frame=frame) for frame in range(count_frames(source))]
+    result = ocr_pages(pages, config)
+    result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"OCR of {len(pages)} page(s) in {result['ms']} ms: "
+                f"{[(page['bands'], page['confidence'], page['steps']) for page in result['pages']]}")
+    return result
@@ -1,6 +1,31 @@
+"""
+OCR for resume images
+
+Every image goes through one pipeline (ocr_image):
+
+1. load_image: decode and scale so the page is about OCR_TARGET_DPI on its
+   long side (11 in). Large JPEG photos are decoded in draft mode at a
+   reduced scale instead of decoding full resolution and shrinking after.
+2. estimate_noise: a robust Laplacian estimate of the noise level, on a
+   subsampled image, in a few tens of milliseconds
+3. denoise, only if the estimate is above OCR_NOISE_THRESHOLD;
+   fastNlMeansDenoising takes seconds on a full page, and clean scans and
+   screenshots do not need it
+4. adaptive thresholding, then one tesseract pass (image_to_data) that
+   yields words with boxes and confidences, grouped into lines. The text is
+   built from those lines. Only lines whose mean confidence is below
+   OCR_LOW_CONFIDENCE are read again, cropped, as a single text line
+   (--psm 7), and the better reading is kept.
+
+Per-step timings are returned with the text and logged. Documents with
+several pages, and large single pages, are OCRed in parallel by
+utils/ocr_executor.py, which runs these steps in a process pool.
+"""
+import io
 import logging
 import os
 import re
+import time
 from PIL import Image
 import numpy as np
 
@@ -16,6 +41,105 @@ except ImportError:
 # Configure tesseract path if needed (uncomment and set if not in PATH)
 # pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+TARGET_DPI = int(os.environ.get("OCR_TARGET_DPI", "300"))
+PAGE_LONG_SIDE_INCHES = 11
+# Small images are enlarged at most this much
+MAX_UPSCALE = 2.0
+# Estimated noise standard deviation (grey levels) above which images are denoised
+NOISE_THRESHOLD = float(os.environ.get("OCR_NOISE_THRESHOLD", "4"))
+# Seconds tesseract may spend on one image or tile before it is killed
+TESSERACT_TIMEOUT = float(os.environ.get("OCR_TESSERACT_TIMEOUT", "60"))
+# Lines with a mean word confidence below this get a second, single-line pass
+LOW_CONFIDENCE = float(os.environ.get("OCR_LOW_CONFIDENCE", "60"))
+# At most this many lines per image are re-read
+MAX_RETRY_LINES = int(os.environ.get("OCR_MAX_RETRY_LINES", "25"))
+RETRY_PSM = 7  # treat the image as a single text line
+_PSM_OPTION = re.compile(r"--psm\s+\d+")
+# Tokens made of digits and letters tesseract confuses with digits
+_NUMBER_LIKE = re.compile(r"\b[0-9OoIl|]{2,}\b")
+_DIGIT_FIXES = str.maketrans("OoIl|", "00111")
+
+# Laplacian-difference kernel; convolving pure noise of std s gives std 6s
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+def _step(report, name, func, *args, **kwargs):
+    """Call func and record its wall time in milliseconds under report['steps'][name]"""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        report.setdefault("steps", {})[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def target_size(size):
+    """Pixel size that puts a page of this shape at TARGET_DPI"""
+    width, height = size
+    long_side = max(width, height)
+    target_long = PAGE_LONG_SIDE_INCHES * TARGET_DPI
+    if long_side > target_long * 1.15:
+        scale = target_long / long_side
+    elif long_side < target_long / 2:
+        scale = min(MAX_UPSCALE, target_long / long_side)
+    else:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _open_image(source):
+    return Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def count_frames(source):
+    """Number of pages in an image file (multi-page TIFFs have several)"""
+    with _open_image(source) as img:
+        return getattr(img, "n_frames", 1)
+
+
+def load_image(source, report=None, frame=0):
+    """
+    Decode an image as greyscale at the OCR target resolution
+
+    Args:
+        source: Path, bytes, or a binary file object
+        report (dict): Receives the step timings and the original and final sizes
+        frame (int): Page of a multi-page image
+
+    Returns:
+        numpy.ndarray: 8-bit greyscale image
+    """
+    report = report if report is not None else {}
+
+    def _decode():
+        with _open_image(source) as img:
+            if frame:
+                img.seek(frame)
+            report["original_size"] = img.size
+            size = target_size(img.size)
+            if img.format == "JPEG" and size[0] < img.size[0]:
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the requested size)
+                img.draft("L", size)
+            gray = img.convert("L")
+            if gray.size != size:
+                gray = gray.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            report["size"] = gray.size
+            return np.asarray(gray)
+
+    return _step(report, "load", _decode)
+
+
+def estimate_noise(gray):
+    """
+    Estimate the noise standard deviation of a greyscale image
+
+    Uses the median absolute response to a Laplacian-difference kernel on a
+    2x subsampled image: text edges are a minority of pixels, so the median
+    reflects the background noise.
+    """
+    sample = gray[::2, ::2].astype(np.float32)
+    response = np.abs(cv2.filter2D(sample, -1, _NOISE_KERNEL, borderType=cv2.BORDER_REPLICATE))
+    return float(np.median(response)) / (0.6745 * 6)
+
 def process_image_resume(image_path):
     """Process an image of a resume using OCR and return extracted text"""
     if not OCR_AVAILABLE:
@@ -23,18 +147,9 @@ def process_image_resume(image_path):
         return "OCR functionality is not available. Please upload a PDF file instead."
         
     try:
-        # Read the image
-        img = cv2.imread(image_path)
-        
-        if img is None:
-            logging.error(f"Failed to read image: {image_path}")
-            return "Error: Could not read the image file."
-        
-        # Preprocess the image
-        img = preprocess_image(img)
-        
-        # Perform OCR
-        text = pytesseract.image_to_string(img)
+        # Load, preprocess and OCR the image, pages and bands in parallel
+        from utils.ocr_executor import ocr_document
+        text = ocr_document(image_path)["text"]
         
         # Post-process the text
         text = post_process_text(text)
@@ -45,35 +160,169 @@ def process_image_resume(image_path):
         logging.error(f"Error in OCR processing: {str(e)}")
         return "Error processing the resume image. Please try uploading a clearer image or a PDF file."
 
-def preprocess_image(img):
-    """Preprocess the image to improve OCR accuracy"""
+def preprocess_image(img, report=None):
+    """
+    Preprocess an image to improve OCR accuracy
+
+    Denoising only runs when estimate_noise() is above NOISE_THRESHOLD.
+
+    Args:
+        img (numpy.ndarray): Greyscale or BGR image
+        report (dict): Receives step timings, noise_sigma and denoised
+
+    Returns:
+        numpy.ndarray: Binarized image
+    """
+    report = report if report is not None else {}
+
     # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
-    # Apply slight Gaussian blur to reduce noise
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-    
-    # Apply adaptive thresholding
-    thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                  cv2.THRESH_BINARY, 11, 2)
-    
-    # Denoise
-    denoised = cv2.fastNlMeansDenoising(thresh, None, 10, 7, 21)
-    
-    return denoised
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+    sigma = _step(report, "noise_estimate", estimate_noise, gray)
+    report["noise_sigma"] = round(sigma, 2)
+    report["denoised"] = sigma > NOISE_THRESHOLD
+    if report["denoised"]:
+        # Denoise the greyscale image, before thresholding turns noise into specks
+        gray = _step(report, "denoise", cv2.fastNlMeansDenoising, gray, None, 10, 7, 21)
+
+    def _binarize(gray):
+        # Apply slight Gaussian blur, then adaptive thresholding
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        return cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY, 11, 2)
+
+    return _step(report, "threshold", _binarize, gray)
+
+def ocr_image(source, config=""):
+    """
+    Run the OCR pipeline on one image
+
+    Args:
+        source: Image path, bytes, or binary file object
+        config (str): Extra tesseract options
+
+    Returns:
+        dict: text, lines, confidence, steps (milliseconds per step),
+        noise_sigma, denoised, size
+
+    Raises:
+        RuntimeError: if OpenCV or pytesseract is not installed
+    """
+    if not OCR_AVAILABLE:
+        raise RuntimeError("OCR functionality is not available")
+
+    report = {}
+    gray = load_image(source, report)
+    ocr_array(gray, config, report)
+    logging.info(f"OCR of {report['original_size']} image at {report['size']}: noise {report['noise_sigma']}, "
+                 f"denoised={report['denoised']}, steps {report['steps']}")
+    return report
+
+def ocr_array(gray, config="", report=None):
+    """
+    Preprocess and OCR an already loaded greyscale image (or tile)
+
+    Returns:
+        dict: report with text, lines (see layout_lines), confidence (mean
+        word confidence), retried_lines and improved_lines added
+    """
+    report = report if report is not None else {}
+    processed = preprocess_image(gray, report)
+    data = _step(report, "tesseract", _read_data, processed, config)
+    lines = layout_lines(data)
+    _step(report, "retry", _retry_low_confidence, processed, lines, config, report)
+
+    words = [word for line in lines for word in line["words"]]
+    report["lines"] = lines
+    report["text"] = lines_to_text(lines)
+    report["confidence"] = round(sum(word["conf"] for word in words) / len(words), 1) if words else 0.0
+    return report
+
+def _read_data(image, config):
+    return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT,
+                                     timeout=TESSERACT_TIMEOUT)
+
+def layout_lines(data, left=0, top=0):
+    """
+    Group image_to_data output into lines of words
+
+    Args:
+        data (dict): pytesseract image_to_data output (Output.DICT)
+        left, top (int): Offset added to every box, for crops and bands
+
+    Returns:
+        list: lines in reading order, each a dict with text, conf (mean word
+        confidence), box [left, top, width, height], block, and words (each
+        with text, conf and box)
+    """
+    lines = {}
+    for i, text in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not text.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        box = [data["left"][i] + left, data["top"][i] + top, data["width"][i], data["height"][i]]
+        lines.setdefault(key, []).append({"text": text.strip(), "conf": conf, "box": box})
+    return [_make_line(words, key[0]) for key, words in lines.items()]
+
+def _make_line(words, block):
+    x0 = min(word["box"][0] for word in words)
+    y0 = min(word["box"][1] for word in words)
+    x1 = max(word["box"][0] + word["box"][2] for word in words)
+    y1 = max(word["box"][1] + word["box"][3] for word in words)
+    return {
+        "text": " ".join(word["text"] for word in words),
+        "conf": round(sum(word["conf"] for word in words) / len(words), 1),
+        "box": [x0, y0, x1 - x0, y1 - y0],
+        "block": block,
+        "words": words
+    }
+
+def lines_to_text(lines):
+    """Text of OCR lines: one line per line, a blank line between blocks"""
+    parts = []
+    previous_block = None
+    for line in lines:
+        if previous_block is not None and line["block"] != previous_block:
+            parts.append("")
+        parts.append(line["text"])
+        previous_block = line["block"]
+    return "\n".join(parts)
+
+def _retry_low_confidence(image, lines, config, report):
+    """Re-read low-confidence lines as single text lines, keeping the better reading (in place)"""
+    low = [i for i, line in enumerate(lines) if line["conf"] < LOW_CONFIDENCE][:MAX_RETRY_LINES]
+    retry_config = " ".join(_PSM_OPTION.sub("", config).split() + ["--psm", str(RETRY_PSM)])
+    improved = 0
+    for i in low:
+        x, y, w, h = lines[i]["box"]
+        pad = max(4, h // 4)
+        x0, y0 = max(0, x - pad), max(0, y - pad)
+        crop = image[y0:y + h + pad, x0:x + w + pad]
+        words = [word for line in layout_lines(_read_data(crop, retry_config), x0, y0) for word in line["words"]]
+        if words and sum(word["conf"] for word in words) / len(words) > lines[i]["conf"]:
+            lines[i] = _make_line(words, lines[i]["block"])
+            improved += 1
+    report["retried_lines"] = len(low)
+    report["improved_lines"] = improved
 
 def post_process_text(text):
     """Clean up the extracted text"""
     # Remove excessive newlines
     text = re.sub(r'\n{3,}', '\n\n', text)
     
-    # Fix common OCR errors
-    text = re.sub(r'l\b', '1', text)  # lowercase l at word end often mistaken for 1
-    text = re.sub(r'\bI\b', '1', text)  # capital I often mistaken for 1
-    text = re.sub(r'O', '0', text)  # capital O often mistaken for 0
+    # Fix common OCR confusions, but only in numbers ("2O19" -> "2019"),
+    # never in words, where O, I and l are almost always right
+    text = _NUMBER_LIKE.sub(_fix_number, text)
     
     return text
 
+def _fix_number(match):
+    token = match.group(0)
+    if sum(char.isdigit() for char in token) < 2:
+        return token
+    return token.translate(_DIGIT_FIXES)
+
 def extract_text_with_layout(image_path):
     """Extract text while attempting to preserve layout"""
     if not OCR_AVAILABLE:
@@ -81,12 +330,9 @@ def extract_text_with_layout(image_path):
         return "OCR functionality is not available. Please upload a PDF file instead."
         
     try:
-        # Use Tesseract with specific parameters to preserve layout
-        custom_config = r'--oem 3 --psm 6'
-        img = Image.open(image_path)
-        text = pytesseract.image_to_string(img, config=custom_config)
-        return text
+        # One pass gives words, boxes and line structure; the text follows the detected lines
+        from utils.ocr_executor import ocr_document
+        return post_process_text(ocr_document(image_path)["text"])
     except Exception as e:
         logging.error(f"Error in layout-preserving OCR: {str(e)}")
-        # Fall back to regular processing
-        return process_image_resume(image_path)
+        return "Error processing the resume image. Please try uploading a clearer image or a PDF file."
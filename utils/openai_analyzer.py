@@ -12,24 +12,14 @@ from collections import Counter
 from typing import List, Dict, Any, Tuple, Optional
 from openai import OpenAI
 
+from utils.prompt_compactor import compact_resume, compact_job_description
+
 # Initialize OpenAI client
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 client = OpenAI(api_key=OPENAI_API_KEY)
 
-# Load job descriptions dataset
-try:
-    job_data = pd.read_csv('attached_assets/job_title_des.csv')
-    job_titles = job_data['job_title'].tolist()
-    job_descriptions = job_data['description'].tolist()
-    JOB_DATA_LOADED = True
-except Exception as e:
-    logging.error(f"Error loading job data: {str(e)}")
-    job_titles = []
-    job_descriptions = []
-    JOB_DATA_LOADED = False
-
-# Create job title to description mapping
-JOB_DESCRIPTIONS_MAP = dict(zip(job_titles, job_descriptions)) if JOB_DATA_LOADED else {}
+# Job title -> description mapping comes from the shared, hot-reloaded job title catalog
+from utils.job_title_catalog import get_title_catalog
 
 # Sample job postings for each role to use for validation
 VALIDATION_JOB_DESCRIPTIONS = {
@@ -170,10 +160,10 @@ def analyze_resume_with_job(resume_text: str, job_description: str) -> Dict[str,
         
         user_prompt = f"""
         Job Description:
-        {job_description}
+        {compact_job_description(job_description, 'job_analysis')}
         
         Resume:
-        {resume_text}
+        {compact_resume(resume_text, 'job_analysis', job_description=job_description)}
         """
         
         response = client.chat.completions.create(
@@ -290,8 +280,9 @@ def find_best_matching_jobs(resume_text: str, skills_list: Optional[List[str]] =
     # If we don't have job data loaded, use validation job descriptions
     job_descriptions_to_use = {}
     
-    if JOB_DATA_LOADED and JOB_DESCRIPTIONS_MAP:
-        job_descriptions_to_use = JOB_DESCRIPTIONS_MAP
+    job_descriptions_map = get_title_catalog().description_map
+    if job_descriptions_map:
+        job_descriptions_to_use = job_descriptions_map
     else:
         # Use sample job descriptions for testing/validation
         for job_title, descriptions in VALIDATION_JOB_DESCRIPTIONS.items():
@@ -345,8 +336,9 @@ def get_improvement_suggestions(resume_text: str, job_title: str, job_descriptio
     """Generate personalized improvement suggestions for a resume based on a job title."""
     # If job description is not provided, try to find one based on job title
     if not job_description:
-        if job_title in JOB_DESCRIPTIONS_MAP:
-            job_description = JOB_DESCRIPTIONS_MAP[job_title]
+        job_descriptions_map = get_title_catalog().description_map
+        if job_title in job_descriptions_map:
+            job_description = job_descriptions_map[job_title]
         elif job_title in VALIDATION_JOB_DESCRIPTIONS:
             job_description = VALIDATION_JOB_DESCRIPTIONS[job_title][0]
     
@@ -379,10 +371,10 @@ def get_improvement_suggestions(resume_text: str, job_title: str, job_descriptio
         Job Title: {job_title}
         
         Job Description:
-        {job_description}
+        {compact_job_description(job_description, 'improvement_suggestions')}
         
         Resume:
-        {resume_text}
+        {compact_resume(resume_text, 'improvement_suggestions', job_description=job_description)}
         """
         
         response = client.chat.completions.create(
@@ -5,6 +5,8 @@ import os
 import json
 import logging
 
+from utils.prompt_compactor import compact_resume, compact_job_description
+
 # Setup OpenAI
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 GPT_MODEL = "gpt-4o"  # Latest model as of May 2024
@@ -55,15 +57,16 @@ def call_openai_api(prompt, system_role="You are a helpful AI assistant", max_to
         logging.error(f"OpenAI API error: {e}")
         return None
 
-def get_resume_prompt(resume_text, job_description=None, extra_context=None, max_resume_chars=2000, max_job_chars=1000):
-    """Standardized prompt builder for resume-related queries"""
+def get_resume_prompt(resume_text, job_description=None, extra_context=None, feature="default", max_resume_tokens=None):
+    """Standardized prompt builder for resume-related queries, packed into the feature's token budget"""
     prompt = ""
     
     if resume_text:
-        prompt += f"RESUME:\n{resume_text[:max_resume_chars]}\n\n"
+        resume_part = compact_resume(resume_text, feature, max_resume_tokens, job_description)
+        prompt += f"RESUME:\n{resume_part}\n\n"
         
     if job_description:
-        prompt += f"JOB DESCRIPTION:\n{job_description[:max_job_chars]}\n\n"
+        prompt += f"JOB DESCRIPTION:\n{compact_job_description(job_description, feature)}\n\n"
         
     if extra_context:
         prompt += f"{extra_context}\n\n"
@@ -79,7 +82,8 @@ def generate_improvement_suggestions(resume_text, job_description, extracted_ski
     prompt = get_resume_prompt(
         resume_text, 
         job_description,
-        f"SKILLS: {', '.join(extracted_skills[:20])}\n\nProvide 5 specific suggestions to improve this resume for the job. Focus on content gaps, skills presentation, achievements, formatting, and keywords. Format with clear headings and bullet points."
+        f"SKILLS: {', '.join(extracted_skills[:20])}\n\nProvide 5 specific suggestions to improve this resume for the job. Focus on content gaps, skills presentation, achievements, formatting, and keywords. Format with clear headings and bullet points.",
+        feature="improvement_suggestions"
     )
     
     result = call_openai_api(
@@ -97,7 +101,8 @@ def generate_job_search_tips(resume_text, extracted_skills, job_title):
     
     prompt = get_resume_prompt(
         resume_text, 
-        extra_context=f"SKILLS: {', '.join(extracted_skills[:20])}\nTARGET POSITION: {job_title}\n\nProvide 5-7 specific job search tips tailored to this person's background for a {job_title} position. Include application strategies, networking, skills to highlight, and interview preparation. Use headings and bullet points."
+        extra_context=f"SKILLS: {', '.join(extracted_skills[:20])}\nTARGET POSITION: {job_title}\n\nProvide 5-7 specific job search tips tailored to this person's background for a {job_title} position. Include application strategies, networking, skills to highlight, and interview preparation. Use headings and bullet points.",
+        feature="job_search_tips"
     )
     
     result = call_openai_api(
@@ -117,7 +122,8 @@ def analyze_resume_strengths_weaknesses(resume_text, job_description):
     prompt = get_resume_prompt(
         resume_text, 
         job_description,
-        "Analyze this resume against the job description and provide:\n1. 3-5 specific strengths\n2. 3-5 specific weaknesses\n3. 5 actionable improvement suggestions\n\nFormat as JSON with keys: 'strengths', 'weaknesses', 'suggestions', each containing arrays of strings."
+        "Analyze this resume against the job description and provide:\n1. 3-5 specific strengths\n2. 3-5 specific weaknesses\n3. 5 actionable improvement suggestions\n\nFormat as JSON with keys: 'strengths', 'weaknesses', 'suggestions', each containing arrays of strings.",
+        feature="strengths_weaknesses"
     )
     
     # Try with retry logic for rate limits
@@ -146,7 +152,8 @@ def analyze_resume_strengths_weaknesses(resume_text, job_description):
                 prompt = get_resume_prompt(
                     resume_text, 
                     job_description,
-                    "Analyze this resume and provide 3 strengths, 3 weaknesses, and 3 suggestions in JSON format with keys: 'strengths', 'weaknesses', 'suggestions'."
+                    "Analyze this resume and provide 3 strengths, 3 weaknesses, and 3 suggestions in JSON format with keys: 'strengths', 'weaknesses', 'suggestions'.",
+                    feature="strengths_weaknesses"
                 )
             else:
                 # Second attempt failed too
@@ -167,7 +174,8 @@ def generate_cover_letter(resume_text, job_description, company_name):
     prompt = get_resume_prompt(
         resume_text, 
         job_description,
-        f"COMPANY: {company_name}\n\nCreate a professional, concise cover letter (250-350 words) with:\n- Professional greeting\n- 3-4 paragraphs highlighting relevant achievements\n- Strong closing with call to action\n- Professional sign-off\n\nMake it specific to this company and role, avoid generic phrases like 'I believe I would be a good fit'."
+        f"COMPANY: {company_name}\n\nCreate a professional, concise cover letter (250-350 words) with:\n- Professional greeting\n- 3-4 paragraphs highlighting relevant achievements\n- Strong closing with call to action\n- Professional sign-off\n\nMake it specific to this company and role, avoid generic phrases like 'I believe I would be a good fit'.",
+        feature="cover_letter"
     )
     
     result = call_openai_api(
@@ -183,7 +191,7 @@ def create_resume_chatbot_response(resume_text, user_query):
     if not OPENAI_AVAILABLE:
         return fallback_chatbot_response(user_query)
     
-    prompt = f"RESUME:\n{resume_text[:2000]}\n\nQUESTION: {user_query}\n\nProvide a specific, helpful response that directly addresses the question with relevant details from the resume. Be conversational but professional."
+    prompt = f"RESUME:\n{compact_resume(resume_text, 'chatbot')}\n\nQUESTION: {user_query}\n\nProvide a specific, helpful response that directly addresses the question with relevant details from the resume. Be conversational but professional."
     
     result = call_openai_api(
         prompt=prompt,
@@ -0,0 +1,330 @@
+"""
+Page-parallel PDF text extraction
+
+Pages are handed one by one to a small, long-lived process pool, each with
+its own time budget, so a long PDF is read in parallel and no page - not even
+in a one page resume - can hold the caller longer than its budget. A page
+that runs over is reported as timed out and left out of the text, and the
+pool is replaced so the stuck worker does not keep a slot. Only the first
+PDF_MAX_PAGES pages are read at all.
+
+Plain text (the default) comes from pdfium, which reads the text layer
+without pdfplumber's character-level layout analysis and is roughly ten
+times faster. layout=True uses pdfplumber's extract_text() as before.
+
+The PDF can be given as a path or, for uploads processed in memory, as bytes.
+
+Scanned pages have no text layer (or one of unmapped glyphs). Each page's
+text is checked by text_layer_quality(); only pages that fail are rendered
+at the OCR resolution and OCRed (utils/ocr_executor.py), and their text is
+merged back in page order. A typed resume with a scanned certificate
+attached costs one page of OCR, not a whole document.
+"""
+import io
+import os
+import re
+import time
+import zlib
+import logging
+import threading
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pdfplumber
+
+from utils.ocr_processor import OCR_AVAILABLE, TARGET_DPI, PAGE_LONG_SIDE_INCHES
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    logger.warning("pypdfium2 not available, plain PDF text extraction will use pdfplumber")
+    PDFIUM_AVAILABLE = False
+
+MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "20"))
+PAGE_TIMEOUT = float(os.environ.get("PDF_PAGE_TIMEOUT", "5"))
+EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# OCR pages whose text layer is missing or garbage ("0" turns this off)
+OCR_FALLBACK = os.environ.get("PDF_OCR_FALLBACK", "1") != "0"
+# A page with fewer characters than this has no usable text layer
+MIN_PAGE_CHARS = int(os.environ.get("PDF_MIN_PAGE_CHARS", "25"))
+
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+_WORD_PATTERN = re.compile(r"[A-Za-z]{2,}")
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+# Worker side: the document most recently opened, so a worker handed several
+# pages of the same file parses it once
+_open_document = {"key": None, "doc": None}
+
+
+def _open(source, layout):
+    if layout or not PDFIUM_AVAILABLE:
+        return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+    return pdfium.PdfDocument(source)
+
+
+def _name(source):
+    return f"<{len(source)} byte PDF>" if isinstance(source, bytes) else os.path.basename(source)
+
+
+def _document(source, layout):
+    if isinstance(source, bytes):
+        key = ("bytes", len(source), zlib.crc32(source), layout)
+    else:
+        key = (source, os.path.getmtime(source), layout)
+    if _open_document["key"] != key:
+        previous = _open_document["doc"]
+        if previous is not None:
+            previous.close()
+        _open_document["doc"] = _open(source, layout)
+        _open_document["key"] = key
+    return _open_document["doc"]
+
+
+def _page_text(doc, index, layout):
+    if layout:
+        return doc.pages[index].extract_text() or ""
+    if PDFIUM_AVAILABLE:
+        text = doc[index].get_textpage().get_text_range()
+        return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").split("\n"))
+    return doc.pages[index].extract_text_simple() or ""
+
+
+def _timed_page(doc, index, layout):
+    start = time.perf_counter()
+    try:
+        text = _page_text(doc, index, layout)
+        return index, text, round((time.perf_counter() - start) * 1000, 1), None
+    except Exception as e:
+        return index, "", round((time.perf_counter() - start) * 1000, 1), str(e)
+
+
+def extract_page(source, index, layout=False):
+    """
+    Extract one page in a pool worker
+
+    Returns:
+        tuple: (index, text, milliseconds, error message or None)
+    """
+    try:
+        doc = _document(source, layout)
+    except Exception as e:
+        return index, "", 0.0, str(e)
+    return _timed_page(doc, index, layout)
+
+
+def _extract_inline(source, indexes, layout):
+    doc = _open(source, layout)
+    try:
+        return {index: _timed_page(doc, index, layout) for index in indexes}
+    finally:
+        doc.close()
+
+
+def count_pages(source):
+    """Number of pages in a PDF (path or bytes)"""
+    doc = _open(source, layout=False)
+    try:
+        return len(doc) if PDFIUM_AVAILABLE else len(doc.pages)
+    finally:
+        doc.close()
+
+
+def text_layer_quality(text):
+    """
+    Judge a page's extracted text
+
+    Returns:
+        str: "ok", "missing" (little or no text) or "garbage" (unmapped glyphs,
+        control characters or no recognisable words)
+    """
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return "missing"
+    cid_chars = sum(len(match) for match in _CID_PATTERN.findall(stripped))
+    if cid_chars > len(stripped) * 0.1:
+        return "garbage"
+    readable = sum(1 for char in stripped if char.isprintable() or char.isspace()) - stripped.count("\ufffd")
+    if readable < len(stripped) * 0.9:
+        return "garbage"
+    tokens = stripped.split()
+    words = sum(1 for token in tokens if _WORD_PATTERN.search(token))
+    if words < len(tokens) * 0.3:
+        return "garbage"
+    return "ok"
+
+
+def render_page(doc, index):
+    """Rasterize a page to greyscale at the OCR resolution (at most an 11 in long side)"""
+    page = doc[index]
+    width, height = page.get_size()
+    scale = min(TARGET_DPI / 72, PAGE_LONG_SIDE_INCHES * TARGET_DPI / max(width, height))
+    bitmap = page.render(scale=scale, grayscale=True)
+    return np.asarray(bitmap.to_pil().convert("L"))
+
+
+def _ocr_fallback(source, indexes):
+    """
+    OCR the given pages of a PDF
+
+    Returns:
+        dict: index -> (text, milliseconds, error or None, OCR lines)
+    """
+    from utils.ocr_executor import ocr_pages
+
+    start = time.perf_counter()
+    doc = pdfium.PdfDocument(source)
+    try:
+        images = [render_page(doc, index) for index in indexes]
+    finally:
+        doc.close()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    try:
+        result = ocr_pages(images)
+    except Exception as e:
+        return {index: ("", 0.0, str(e), []) for index in indexes}
+    share = render_ms / len(indexes)
+    return {
+        index: (page["text"], round(share + sum(page["steps"].values()), 1), page.get("error"),
+                [dict(line, page=index + 1) for line in result["lines"] if line["page"] == position + 1])
+        for position, (index, page) in enumerate(zip(indexes, result["pages"]))
+    }
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            if _pool_pid != os.getpid():
+                # First pool in this process. A forked upload worker inherits the
+                # parent's pool object but none of its processes, and exits without
+                # running atexit, so its pool is ended before its children are joined
+                multiprocessing.util.Finalize(None, _reset_pool, exitpriority=10)
+            _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_pool():
+    """Drop the pool, killing workers stuck on a page that ran over its budget"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and _pool_pid == os.getpid():
+        # ProcessPoolExecutor cannot cancel a running task, so end its processes directly
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_pdf(source, layout=False, max_pages=MAX_PAGES, page_timeout=PAGE_TIMEOUT):
+    """
+    Extract text from a PDF with page caps and per-page timings
+
+    Args:
+        source (str or bytes): PDF file path, or the file's contents
+        layout (bool): Use pdfplumber's layout-aware extraction instead of the fast path
+        max_pages (int): Pages beyond this are not read
+        page_timeout (float): Seconds each page may take; 0 or None reads the pages
+            in the calling process without a budget
+
+    Returns:
+        dict: text, page_count, pages_read, truncated, ocr_pages, lines (OCR
+        lines with boxes and confidences, for OCRed pages only; see
+        utils/ocr_processor.layout_lines) and pages (one entry per page read:
+        page, ms, chars, status of ok/error/timeout, and method, "text" or "ocr")
+    """
+    page_count = count_pages(source)
+    indexes = list(range(min(page_count, max_pages)))
+    if page_count > max_pages:
+        logger.warning(f"PDF {_name(source)} has {page_count} pages, reading the first {max_pages}")
+
+    if page_timeout and page_timeout > 0:
+        results = _extract_parallel(source, indexes, layout, page_timeout)
+    else:
+        # No budget asked for: skip the pool round trip
+        results = _extract_inline(source, indexes, layout)
+
+    ocr_indexes = []
+    lines = []
+    if OCR_FALLBACK and OCR_AVAILABLE and PDFIUM_AVAILABLE:
+        # Timed-out pages are not retried with the (slower) OCR
+        scanned = [index for index in indexes
+                   if results[index][3] != "timeout" and text_layer_quality(results[index][1]) != "ok"]
+        if scanned:
+            logger.info(f"OCR for pages {[index + 1 for index in scanned]} of {_name(source)}: no usable text layer")
+            for index, (text, ms, error, page_lines) in _ocr_fallback(source, scanned).items():
+                if error or not text.strip():
+                    logger.warning(f"OCR of page {index + 1} of {_name(source)} found no text: {error}")
+                    continue
+                results[index] = (index, text, round(results[index][2] + ms, 1), None)
+                ocr_indexes.append(index)
+                lines.extend(page_lines)
+
+    texts = []
+    pages = []
+    for index in indexes:
+        _, text, ms, error = results[index]
+        status = "timeout" if error == "timeout" else "error" if error else "ok"
+        if error and status == "error":
+            logger.warning(f"Could not extract page {index + 1} of {_name(source)}: {error}")
+        if text:
+            texts.append(text)
+        pages.append({"page": index + 1, "ms": ms, "chars": len(text), "status": status,
+                      "method": "ocr" if index in ocr_indexes else "text"})
+
+    logger.info(f"Extracted {len(indexes)}/{page_count} pages of {_name(source)}, "
+                f"page ms: {[page['ms'] for page in pages]}")
+    return {
+        "text": "\n".join(texts).strip(),
+        "page_count": page_count,
+        "pages_read": len(indexes),
+        "truncated": page_count > max_pages,
+        "ocr_pages": len(ocr_indexes),
+        "lines": lines,
+        "pages": pages
+    }
+
+
+def _extract_parallel(source, indexes, layout, page_timeout):
+    try:
+        pool = _get_pool()
+        futures = {index: pool.submit(extract_page, source, index, layout) for index in indexes}
+    except BrokenProcessPool:
+        _reset_pool()
+        return _extract_inline(source, indexes, layout)
+
+    # Pages queue behind each other, so page i may wait for earlier ones on the same worker
+    started = time.monotonic()
+    results = {}
+    timed_out = False
+    for position, index in enumerate(indexes):
+        budget = page_timeout * (position // EXTRACT_WORKERS + 1)
+        try:
+            results[index] = futures[index].result(timeout=max(0.0, started + budget - time.monotonic()))
+        except FutureTimeoutError:
+            timed_out = True
+            futures[index].cancel()
+            results[index] = (index, "", round(budget * 1000, 1), "timeout")
+        except BrokenProcessPool:
+            timed_out = True
+            results[index] = (index, "", 0.0, "worker crashed")
+
+    if timed_out:
+        logger.warning(f"PDF page extraction ran over budget for {_name(source)}, recycling the pool")
+        _reset_pool()
+    return results
+
+
+def extract_pdf_text(source, layout=False):
+    """Text of a PDF (first MAX_PAGES pages), for callers that do not need the page report"""
+    return extract_pdf(source, layout=layout)["text"]
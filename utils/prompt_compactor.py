@@ -0,0 +1,319 @@
+"""
+Token-budget-aware prompt compaction for resume prompts
+
+Instead of slicing the resume to a fixed number of characters, the resume is
+split into its sections and the sections that matter most for the feature
+(and, when given, the target job description) are packed into an explicit
+token budget. Job descriptions get a budget of their own per feature and keep
+their requirements ahead of the rest. Every call logs how many input tokens
+were saved.
+"""
+import re
+import logging
+import threading
+from functools import lru_cache
+
+from utils.resume_analyzer import resume_sections
+
+logger = logging.getLogger(__name__)
+
+# Use the OpenAI tokenizer when available, otherwise estimate
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Resume token budget per LLM feature
+FEATURE_TOKEN_BUDGETS = {
+    "improvement_suggestions": 600,
+    "job_search_tips": 350,
+    "job_search_context": 150,
+    "strengths_weaknesses": 600,
+    "cover_letter": 700,
+    "chatbot": 800,
+    "skills_extraction": 1000,
+    "resume_suggestions": 400,
+    "job_analysis": 900,
+    "default": 500,
+}
+
+# Token budget for job descriptions included alongside the resume; matching a
+# resume against the job needs the whole requirements list
+JOB_DESCRIPTION_TOKEN_BUDGETS = {
+    "job_analysis": 900,
+    "improvement_suggestions": 500,
+    "default": 250,
+}
+
+# Job description headings whose sections are kept first when trimming
+_REQUIREMENT_HEADING = re.compile(
+    r"requirement|qualification|must.have|nice.to.have|skills|experience|responsibilit|"
+    r"what you.ll (need|bring|do)|what we.re looking for|who you are|about you|you have",
+    re.IGNORECASE
+)
+
+# Sections ranked by how useful they are for each feature; unlisted sections come last
+FEATURE_SECTION_PRIORITY = {
+    "improvement_suggestions": ["Experience", "Skills", "Projects", "Achievements", "Education"],
+    "job_search_tips": ["Skills", "Experience", "Education"],
+    "job_search_context": ["Experience", "Skills"],
+    "strengths_weaknesses": ["Experience", "Skills", "Projects", "Achievements", "Education"],
+    "cover_letter": ["Experience", "Achievements", "Projects", "Skills"],
+    "chatbot": ["Experience", "Skills", "Projects", "Education", "Achievements"],
+    "skills_extraction": ["Skills", "Experience", "Projects", "Positions of Responsibility"],
+    "resume_suggestions": ["Experience", "Skills", "Projects", "Achievements"],
+    "job_analysis": ["Skills", "Experience", "Projects", "Education"],
+    "default": ["Experience", "Skills", "Projects", "Education"],
+}
+
+# The unlabelled top of the resume (name, contact, summary) is always kept
+HEADER_SECTION = "Header"
+MAX_HEADER_TOKENS = 80
+
+_header_lookup = {
+    variation.lower(): section
+    for section, variations in resume_sections.items()
+    for variation in variations
+}
+
+_stats = {"calls": 0, "original_tokens": 0, "compacted_tokens": 0}
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    The cl100k_base encoding, loaded on first use rather than at import
+    (the first load may download the encoding file)
+
+    Returns:
+        tiktoken.Encoding, or None to fall back to estimates
+    """
+    if not TIKTOKEN_AVAILABLE:
+        logger.warning("tiktoken not installed, using approximate token counts for prompt compaction")
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding file could not be downloaded
+        logger.warning(f"tiktoken encoding not available ({e}), using approximate token counts for prompt compaction")
+        return None
+
+
+def count_tokens(text):
+    """Count tokens with tiktoken, or estimate from characters and word pieces"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(len(text) // 4, len(re.findall(r"\w+|[^\w\s]", text)))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens, preferring a line boundary"""
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ""
+    if max_tokens <= 0:
+        return ""
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        truncated = encoding.decode(encoding.encode(text)[:max_tokens])
+    else:
+        truncated = text[:max_tokens * 4]
+        while truncated and count_tokens(truncated) > max_tokens:
+            truncated = truncated[:int(len(truncated) * 0.9)]
+
+    # Drop a trailing partial line if that does not lose too much
+    last_newline = truncated.rfind("\n")
+    if last_newline > len(truncated) * 0.6:
+        truncated = truncated[:last_newline]
+    return truncated.rstrip()
+
+
+def split_sections(resume_text):
+    """
+    Split resume text into sections using the headings from resume_analyzer
+
+    Returns:
+        list: (section_name, text) tuples in document order; text before the
+        first recognised heading is returned as the "Header" section
+    """
+    sections = []
+    current_name = HEADER_SECTION
+    current_lines = []
+
+    for line in resume_text.splitlines():
+        heading = line.strip().rstrip(":").strip().lower()
+        section = _header_lookup.get(heading) if len(heading) < 40 else None
+        if section:
+            if any(l.strip() for l in current_lines):
+                sections.append((current_name, "\n".join(current_lines).strip()))
+            current_name = section
+            current_lines = [line.strip()]
+        else:
+            current_lines.append(line)
+
+    if any(l.strip() for l in current_lines):
+        sections.append((current_name, "\n".join(current_lines).strip()))
+    return sections
+
+
+def _section_rank(feature, name, text, job_terms):
+    """Lower is better: feature priority first, then overlap with the job description"""
+    priority = FEATURE_SECTION_PRIORITY.get(feature, FEATURE_SECTION_PRIORITY["default"])
+    base = priority.index(name) if name in priority else len(priority)
+    if not job_terms:
+        return (base, 0)
+    words = set(re.findall(r"[a-z][a-z0-9+#.]{2,}", text.lower()))
+    return (base, -len(words & job_terms))
+
+
+def compact_resume(resume_text, feature="default", max_tokens=None, job_description=None):
+    """
+    Pack the most relevant resume sections into a token budget
+
+    Args:
+        resume_text (str): Full resume text
+        feature (str): Key into FEATURE_TOKEN_BUDGETS / FEATURE_SECTION_PRIORITY
+        max_tokens (int): Override for the feature's budget
+        job_description (str): Optional; sections sharing more terms with it win ties
+
+    Returns:
+        str: Compacted resume text, sections kept in their original order
+    """
+    if not resume_text:
+        return ""
+
+    budget = max_tokens or FEATURE_TOKEN_BUDGETS.get(feature, FEATURE_TOKEN_BUDGETS["default"])
+    original_tokens = count_tokens(resume_text)
+
+    if original_tokens <= budget:
+        _record(feature, original_tokens, original_tokens)
+        return resume_text
+
+    sections = split_sections(resume_text)
+    job_terms = set(re.findall(r"[a-z][a-z0-9+#.]{2,}", job_description.lower())) if job_description else set()
+
+    selected = {}
+    remaining = budget
+
+    # Always keep the header (name, title, summary) but cap it
+    for index, (name, text) in enumerate(sections):
+        if name == HEADER_SECTION:
+            header = truncate_to_tokens(text, min(MAX_HEADER_TOKENS, remaining))
+            selected[index] = header
+            remaining -= count_tokens(header)
+
+    ranked = sorted(
+        (index for index, (name, _) in enumerate(sections) if name != HEADER_SECTION),
+        key=lambda index: _section_rank(feature, sections[index][0], sections[index][1], job_terms)
+    )
+    for index in ranked:
+        if remaining <= 20:
+            break
+        text = sections[index][1]
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            text = truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+        selected[index] = text
+        remaining -= tokens + 1  # +1 for the separating blank line
+
+    compacted = "\n\n".join(selected[index] for index in sorted(selected))
+    _record(feature, original_tokens, count_tokens(compacted))
+    return compacted
+
+
+def split_job_description(job_description):
+    """
+    Split a job description into blocks at its headings
+
+    Returns:
+        list: (is_requirements, text) tuples in document order
+    """
+    blocks = []
+    current_lines = []
+    current_requirements = False
+
+    for line in job_description.splitlines():
+        heading = line.strip()
+        is_heading = heading.endswith(":") or (len(heading.split()) <= 5 and _REQUIREMENT_HEADING.search(heading))
+        if heading and len(heading) < 60 and is_heading and not heading.startswith(("-", "*", "\u2022")):
+            if any(l.strip() for l in current_lines):
+                blocks.append((current_requirements, "\n".join(current_lines).strip()))
+            current_requirements = bool(_REQUIREMENT_HEADING.search(heading))
+            current_lines = [heading]
+        else:
+            current_lines.append(line)
+
+    if any(l.strip() for l in current_lines):
+        blocks.append((current_requirements, "\n".join(current_lines).strip()))
+    return blocks
+
+
+def compact_job_description(job_description, feature="default", max_tokens=None):
+    """
+    Trim a job description to the feature's token budget
+
+    Requirement-like sections (requirements, qualifications, skills,
+    responsibilities) are kept before the rest (company blurb, benefits).
+
+    Args:
+        job_description (str): Full job description
+        feature (str): Key into JOB_DESCRIPTION_TOKEN_BUDGETS
+        max_tokens (int): Override for the feature's budget
+
+    Returns:
+        str: Trimmed job description, sections kept in their original order
+    """
+    if not job_description:
+        return ""
+
+    budget = max_tokens or JOB_DESCRIPTION_TOKEN_BUDGETS.get(feature, JOB_DESCRIPTION_TOKEN_BUDGETS["default"])
+    original_tokens = count_tokens(job_description)
+    stats_key = f"{feature}:job_description"
+
+    if original_tokens <= budget:
+        _record(stats_key, original_tokens, original_tokens)
+        return job_description
+
+    blocks = split_job_description(job_description)
+    ranked = sorted(range(len(blocks)), key=lambda index: (not blocks[index][0], index))
+
+    selected = {}
+    remaining = budget
+    for index in ranked:
+        if remaining <= 20:
+            break
+        text = blocks[index][1]
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            text = truncate_to_tokens(text, remaining)
+            tokens = count_tokens(text)
+        selected[index] = text
+        remaining -= tokens + 1  # +1 for the separating blank line
+
+    compacted = "\n\n".join(selected[index] for index in sorted(selected))
+    _record(stats_key, original_tokens, count_tokens(compacted))
+    return compacted
+
+
+def _record(feature, original_tokens, compacted_tokens):
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["original_tokens"] += original_tokens
+        _stats["compacted_tokens"] += compacted_tokens
+    saved = original_tokens - compacted_tokens
+    if saved > 0:
+        logger.info(f"Prompt compaction [{feature}]: {original_tokens} -> {compacted_tokens} tokens ({saved} saved)")
+
+
+def get_compaction_stats():
+    """Cumulative compaction totals for this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["original_tokens"] - stats["compacted_tokens"]
+    return stats
@@ -1,12 +1,12 @@
-import pdfplumber
 import spacy
 import nltk
+import io
 import re
 import pandas as pd
 import os
 import logging
-from PIL import Image
-import pytesseract
+from utils.pdf_extractor import extract_pdf, extract_pdf_text
+from utils.ocr_executor import ocr_document
 
 # Download necessary resources
 try:
@@ -36,54 +36,131 @@ resume_sections = {
     "Achievements": ["Achievements", "Awards & Honors", "Accomplishments", "Honors", "Recognitions"]
 }
 
+# NER runs on sentence-aligned chunks of at most NER_CHUNK_CHARS characters,
+# and only on the first NER_MAX_CHARS characters of a resume, so a huge pasted
+# document cannot blow up memory or latency
+NER_MAX_CHARS = int(os.environ.get("NER_MAX_CHARS", "100000"))
+NER_CHUNK_CHARS = int(os.environ.get("NER_CHUNK_CHARS", "5000"))
+NER_BATCH_SIZE = int(os.environ.get("NER_BATCH_SIZE", "16"))
+# Worker processes for bulk NER (ner_entities_bulk), e.g. rebuilding artifacts
+NER_PROCESSES = int(os.environ.get("NER_PROCESSES", "1"))
+
 # Set model to None as we're using the fallback mechanism
 model = None
 logging.warning("Using fallback functionality for resume analysis")
 
-def analyze_resume(file_path):
-    """Analyze a resume file (PDF or image) and return the extracted text"""
+def analyze_resume(file_path, data=None):
+    """Analyze a resume file (PDF or image) and return the extracted text
+
+    If data (the file's bytes) is given it is used instead of reading file_path,
+    which then only determines the file type.
+    """
+    return analyze_resume_document(file_path, data)["text"]
+
+def analyze_resume_document(file_path, data=None):
+    """Analyze a resume file and return its text with the OCR layout, if it was OCRed
+
+    Returns:
+        dict: text, and lines (OCR lines with boxes and confidences, see
+        utils/ocr_processor.layout_lines; empty when the text came from a
+        PDF text layer), for preprocess_and_segment(text, lines)
+    """
     try:
-        text = extract_text_from_file(file_path)
-        return text
+        return extract_document_from_file(file_path, data)
     except Exception as e:
         logging.error(f"Error analyzing resume: {str(e)}")
-        return "Error extracting text from resume."
+        return {"text": "Error extracting text from resume.", "lines": []}
 
-def extract_text_from_file(file_path):
+def extract_text_from_file(file_path, data=None):
     """Determine file type and extract text accordingly"""
+    return extract_document_from_file(file_path, data)["text"]
+
+def extract_document_from_file(file_path, data=None):
+    """Determine file type and extract text (and OCR layout) accordingly"""
     ext = os.path.splitext(file_path)[1].lower()
     if ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        result = extract_pdf(data if data is not None else file_path)
+        # Layout is only usable for headings if it covers the whole document
+        lines = result["lines"] if result["ocr_pages"] == result["pages_read"] else []
+        return {"text": result["text"], "lines": lines}
     elif ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']:
-        return extract_text_from_image(file_path)
+        return extract_document_from_image(io.BytesIO(data) if data is not None else file_path)
     else:
         logging.error(f"Unsupported file format: {ext}")
         raise ValueError(f"Unsupported file format: {ext}")
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text content from a PDF file"""
-    text = ""
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            extracted_text = page.extract_text()
-            if extracted_text:
-                text += extracted_text + "\n"
-    return text.strip()
+    """Extract text content from a PDF file or its bytes (page-capped, long PDFs in parallel; see utils/pdf_extractor.py)"""
+    return extract_pdf_text(pdf_path)
 
 def extract_text_from_image(image_path):
     """Extract text from an image using OCR"""
+    return extract_document_from_image(image_path)["text"]
+
+def extract_document_from_image(image_path):
+    """OCR an image once, returning its text and lines (with boxes and confidences)"""
     try:
-        image = Image.open(image_path)
-        # Use pytesseract to extract text (OCR)
-        text = pytesseract.image_to_string(image)
-        return text.strip()
+        # Size normalization, adaptive denoising and OCR, pages in parallel (see utils/ocr_executor.py)
+        result = ocr_document(image_path)
+        return {"text": result["text"].strip(), "lines": result["lines"]}
     except Exception as e:
         logging.error(f"Error during image OCR: {str(e)}")
         # If pytesseract not installed or error occurs
-        return "Error: Could not extract text from image. Make sure pytesseract is installed correctly."
+        return {"text": "Error: Could not extract text from image. Make sure pytesseract is installed correctly.",
+                "lines": []}
+
+def _heading_section(line, median_height):
+    """Section a layout line is the heading of, or None"""
+    text = line["text"].strip().rstrip(":").strip()
+    if len(text.split()) > 5:
+        return None
+    for section, variations in resume_sections.items():
+        for variation in variations:
+            if text.lower() == variation.lower():
+                return section
+            # Larger type than the body text, e.g. "EXPERIENCE 2019 - 2024"
+            if line["box"][3] > median_height * 1.2 and text.lower().startswith(variation.lower() + " "):
+                return section
+    return None
+
+def segment_layout(lines):
+    """
+    Segment OCR layout lines into sections, using lines that read as a
+    section heading (a known heading on its own, or in larger type)
+
+    Returns:
+        dict: section -> text, or None if no headings were found
+    """
+    heights = sorted(line["box"][3] for line in lines)
+    if not heights:
+        return None
+    median_height = heights[len(heights) // 2]
+
+    sections_extracted = {key: "" for key in resume_sections.keys()}
+    current = None
+    found = False
+    for line in lines:
+        section = _heading_section(line, median_height)
+        if section:
+            current = section
+            found = True
+        elif current:
+            sections_extracted[current] = f"{sections_extracted[current]} {line['text']}".strip()
+    return sections_extracted if found else None
+
+def preprocess_and_segment(text, layout=None):
+    """Preprocess the text and segment it into sections
+
+    Args:
+        text (str): Resume text
+        layout (list): OCR lines for the text (see analyze_resume_document); when
+            given and headings are found in it, sections follow the layout
+    """
+    if layout:
+        sections_extracted = segment_layout(layout)
+        if sections_extracted:
+            return sections_extracted
 
-def preprocess_and_segment(text):
-    """Preprocess the text and segment it into sections"""
     text = re.sub(r'\s+', ' ', text)
     sections_extracted = {key: "" for key in resume_sections.keys()}
     
@@ -139,12 +216,12 @@ def extract_basic_info(text):
             basic_info['phone'] = candidates[0][0]
     
     # Extract skills
-    doc = nlp(text)
     extracted_skills = []
+    lowered = text.lower()
     
     # Check for skills from our predefined list
     for skill in skills_list:
-        if skill.lower() in text.lower():
+        if skill.lower() in lowered:
             # Verify it's a standalone word, not part of another word
             skill_pattern = r'\b' + re.escape(skill) + r'\b'
             if re.search(skill_pattern, text, re.IGNORECASE):
@@ -191,8 +268,9 @@ def fallback_extract_basic_info(text):
     
     # Extract skills using basic matching
     skills_found = []
+    lowered = text.lower()
     for skill in skills_list:
-        if skill.lower() in text.lower():
+        if skill.lower() in lowered:
             # Verify it's a standalone word, not part of another word
             skill_pattern = r'\b' + re.escape(skill) + r'\b'
             if re.search(skill_pattern, text, re.IGNORECASE):
@@ -202,13 +280,96 @@ def fallback_extract_basic_info(text):
     
     return basic_info
 
-def extract_entities(text):
-    """Extracts named entities from text using spaCy or regex fallback."""
+def split_into_chunks(text, max_chars=None):
+    """
+    Split text into chunks of at most max_chars, cutting at line breaks or
+    sentence ends where possible (at spaces otherwise), never inside a word
+
+    Returns:
+        list: non-empty chunks, in order
+    """
+    max_chars = max_chars or NER_CHUNK_CHARS
+    pieces = []
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            window = line[:max_chars]
+            cut = max(window.rfind(". "), window.rfind("? "), window.rfind("! "))
+            cut = cut + 1 if cut > 0 else window.rfind(" ")
+            cut = cut if cut > 0 else max_chars
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip()
+        pieces.append(line)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+def _ner_chunks(text):
+    """Chunks of the first NER_MAX_CHARS characters of text"""
+    if len(text) > NER_MAX_CHARS:
+        logging.warning(f"Resume text is {len(text)} characters, running NER on the first {NER_MAX_CHARS}")
+        # Cut at the last line break (or space) before the budget
+        cut = text.rfind("\n", NER_MAX_CHARS // 2, NER_MAX_CHARS)
+        cut = cut if cut > 0 else text.rfind(" ", 0, NER_MAX_CHARS)
+        text = text[:cut if cut > 0 else NER_MAX_CHARS]
+    return split_into_chunks(text)
+
+def _unused_components():
+    """Pipeline components NER does not need (tagger, parser, lemmatizer, ...)"""
+    keep = {"ner"}
+    for name, component in nlp.pipeline:
+        # A shared tok2vec the NER listens to must keep running
+        if "ner" in getattr(component, "listening_components", []):
+            keep.add(name)
+    return [name for name in nlp.pipe_names if name not in keep]
+
+def ner_entities(text):
+    """
+    Named entities in text, from spaCy NER run chunk by chunk
+
+    Returns:
+        list: (entity text, label) tuples; empty if spaCy is unavailable
+    """
+    return ner_entities_bulk([text], n_process=1)[0]
+
+def ner_entities_bulk(texts, n_process=NER_PROCESSES):
+    """
+    Named entities of many texts, with their chunks streamed through nlp.pipe
+
+    Args:
+        texts (list): Resume texts
+        n_process (int): spaCy worker processes
+
+    Returns:
+        list: per text, a list of (entity text, label) tuples
+    """
+    results = [[] for _ in texts]
+    if not nlp:
+        return results
+    chunks = ((chunk, index) for index, text in enumerate(texts) for chunk in _ner_chunks(text or ""))
+    docs = nlp.pipe(chunks, as_tuples=True, batch_size=NER_BATCH_SIZE, n_process=n_process,
+                    disable=_unused_components())
+    for doc, index in docs:
+        results[index].extend((ent.text, ent.label_) for ent in doc.ents)
+    return results
+
+def extract_entities(text, ner=None):
+    """Extracts named entities from text using spaCy or regex fallback.
+
+    ner: (entity text, label) tuples already found for text (see ner_entities_bulk)
+    """
     if not nlp:
         # Fallback to basic regex extraction
         return fallback_extract_entities(text)
     
-    doc = nlp(text)
     entities = {
         "SKILLS": [],
         "COMPANIES": [],
@@ -217,13 +378,14 @@ def extract_entities(text):
     }
     
     # Extract entities based on spaCy's NER
-    for ent in doc.ents:
-        if ent.label_ == "ORG":
-            entities["COMPANIES"].append(ent.text)
+    for entity, label in (ner if ner is not None else ner_entities(text)):
+        if label == "ORG":
+            entities["COMPANIES"].append(entity)
         
     # Extract skills using our predefined list
+    lowered = text.lower()
     for skill in skills_list:
-        if skill and skill.lower() in text.lower():
+        if skill and skill.lower() in lowered:
             # Verify it's a standalone word
             skill_pattern = r'\b' + re.escape(skill) + r'\b'
             if re.search(skill_pattern, text, re.IGNORECASE):
@@ -267,8 +429,9 @@ def fallback_extract_entities(text):
     }
     
     # Extract skills
+    lowered = text.lower()
     for skill in skills_list:
-        if skill and skill.lower() in text.lower():
+        if skill and skill.lower() in lowered:
             # Verify it's a standalone word
             skill_pattern = r'\b' + re.escape(skill) + r'\b'
             if re.search(skill_pattern, text, re.IGNORECASE):
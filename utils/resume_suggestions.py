@@ -11,6 +11,8 @@ from time import sleep
 # Import the OpenAI library 
 from openai import OpenAI
 
+from utils.prompt_compactor import compact_resume
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -49,7 +51,7 @@ def generate_resume_suggestions(resume_text, skills=None, job_title=None, retry_
     I need you to review the following resume and provide specific, actionable improvement suggestions.
     
     Resume Text:
-    {resume_text[:1000]}...
+    {compact_resume(resume_text, 'resume_suggestions', job_description=job_title)}
     
     Skills Identified: {skills_str}
     
@@ -0,0 +1,83 @@
+"""
+In-place schema upgrades for existing databases
+
+db.create_all() creates missing tables but never alters existing ones, so
+columns added to a model later would be missing on any database created
+before them. upgrade_schema() runs after create_all() at startup and adds
+each missing column with ALTER TABLE ... ADD COLUMN; a scalar Python default
+becomes the column's SQL default, so existing rows get it too. Missing
+indexes are created, and named unique constraints of existing tables (e.g.
+uq_listing_query_source) are added as unique indexes. It is idempotent:
+columns and indexes that exist are left alone.
+
+Only nullable columns (or ones with a scalar default) can be added this way;
+give new columns on existing tables one of the two.
+"""
+import logging
+
+from sqlalchemy import UniqueConstraint, inspect, text
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect):
+    ddl = f"{dialect.identifier_preparer.quote(column.name)} {column.type.compile(dialect=dialect)}"
+    default = column.default
+    if default is not None and default.is_scalar:
+        value = default.arg
+        if isinstance(value, bool):
+            value = int(value)
+        literal = f"'{value}'" if isinstance(value, str) else str(value)
+        ddl += f" DEFAULT {literal}"
+    return ddl
+
+
+def _create_index(connection, preparer, table_name, name, columns, unique):
+    columns = ", ".join(preparer.quote(column.name) for column in columns)
+    connection.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {preparer.quote(name)} "
+        f"ON {preparer.quote(table_name)} ({columns})"
+    ))
+
+
+def upgrade_schema():
+    """
+    Add model columns missing from existing tables
+
+    Returns:
+        list: "table.column" names that were added
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    added = []
+
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.quote(table.name)} ADD COLUMN {_column_ddl(column, engine.dialect)}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+
+            for index in table.indexes:
+                _create_index(connection, preparer, table.name, index.name, index.columns, index.unique)
+
+            # Named unique constraints of an existing table become unique indexes
+            # (SQLite cannot add a constraint to an existing table)
+            constraints = {constraint["name"] for constraint in inspector.get_unique_constraints(table.name)}
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint) and constraint.name and constraint.name not in constraints:
+                    _create_index(connection, preparer, table.name, constraint.name, constraint.columns, True)
+
+    if added:
+        logger.info(f"Added missing columns: {added}")
+    return added
@@ -0,0 +1,176 @@
+"""
+Cross-process TTL cache backed by a local SQLite file
+
+All gunicorn workers on a node share one cache file, so a result fetched by
+one worker is reused by the others (unlike functools.lru_cache, which is
+per process and never expires). Entries carry their own expiry, so empty
+or error results can be cached for a shorter time than real results. When
+the table grows past SHARED_CACHE_MAX_ENTRIES, the least recently used
+entries are evicted.
+
+The cache fails open: if the file cannot be used, the wrapped function is
+simply called.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import functools
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "resumeai_shared_cache.sqlite")
+)
+MAX_ENTRIES = int(os.environ.get("SHARED_CACHE_MAX_ENTRIES", "2000"))
+# Check the size bound every N writes rather than on each one
+EVICTION_CHECK_INTERVAL = 50
+
+_local = threading.local()
+_stats = {"hits": 0, "negative_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_last_access ON cache_entries (last_access);
+"""
+
+
+def _connection():
+    """One connection per thread (and per process, since connections do not survive fork)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = sqlite3.connect(CACHE_PATH, timeout=2, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def _bump(stat, amount=1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+def cache_get(namespace, key):
+    """
+    Look up a cached value
+
+    Returns:
+        tuple: (found, value); expired entries count as not found
+    """
+    try:
+        conn = _connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, negative, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None or row[2] < now:
+            _bump("misses")
+            return False, None
+        conn.execute(
+            "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+            (now, namespace, key)
+        )
+        _bump("negative_hits" if row[1] else "hits")
+        return True, json.loads(row[0])
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning(f"Shared cache read failed: {str(e)}")
+        _bump("errors")
+        return False, None
+
+
+def cache_set(namespace, key, value, ttl, negative=False):
+    """Store a JSON-serializable value for ttl seconds"""
+    try:
+        conn = _connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, negative, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), int(negative), now + ttl, now)
+        )
+        _bump("sets")
+        if _stats["sets"] % EVICTION_CHECK_INTERVAL == 0:
+            _evict(conn, now)
+    except (sqlite3.Error, TypeError, ValueError) as e:
+        logger.warning(f"Shared cache write failed: {str(e)}")
+        _bump("errors")
+
+
+def _evict(conn, now):
+    """Drop expired entries, then least recently used ones beyond MAX_ENTRIES"""
+    removed = conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,)).rowcount
+    count = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+    if count > MAX_ENTRIES:
+        # Trim to 90% so we do not evict again on the very next write
+        excess = count - int(MAX_ENTRIES * 0.9)
+        removed += conn.execute(
+            "DELETE FROM cache_entries WHERE rowid IN "
+            "(SELECT rowid FROM cache_entries ORDER BY last_access LIMIT ?)",
+            (excess,)
+        ).rowcount
+    if removed:
+        _bump("evictions", removed)
+        logger.info(f"Shared cache evicted {removed} entries")
+
+
+def shared_cache(namespace, ttl, negative_ttl=None, is_negative=lambda value: not value):
+    """
+    Decorator caching a function's JSON-serializable result across workers
+
+    Args:
+        namespace (str): Keeps different functions' keys apart
+        ttl (int): Seconds to keep a normal result
+        negative_ttl (int): Seconds to keep a result for which is_negative()
+            is true (empty/error results); defaults to ttl
+        is_negative (callable): Classifies results for negative_ttl
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = json.dumps([args, sorted(kwargs.items())], default=str)
+            found, value = cache_get(namespace, key)
+            if found:
+                return value
+
+            value = func(*args, **kwargs)
+            negative = is_negative(value)
+            cache_set(namespace, key, value, negative_ttl if negative and negative_ttl is not None else ttl, negative)
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def get_cache_stats():
+    """
+    Hit/miss counters for this process plus the shared entry count
+
+    Returns:
+        dict: hits, negative_hits, misses, sets, evictions, errors, hit_rate, entries
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["hits"] + stats["negative_hits"]) / lookups, 3) if lookups else None
+    try:
+        stats["entries"] = _connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+    except sqlite3.Error:
+        stats["entries"] = None
+    return stats
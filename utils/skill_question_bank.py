@@ -0,0 +1,223 @@
+"""
+Persistent skill assessment question bank
+
+Questions live in the SkillQuestion table, pooled per normalized skill name.
+Starting a test is a single indexed query for the requested skills joined
+against the questions the user has already seen; generation (LLM or fallback)
+only happens in the background when a pool runs low for a user.
+"""
+import os
+import json
+import random
+import hashlib
+import logging
+import threading
+
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+
+from models import db, SkillQuestion, ServedSkillQuestion
+from utils.background_tasks import submit_task
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_PER_TEST = int(os.environ.get("SKILL_TEST_QUESTIONS", "5"))
+# Refill a pool once a user has fewer than this many unseen questions left in it
+POOL_LOW_WATERMARK = int(os.environ.get("SKILL_POOL_LOW_WATERMARK", "3"))
+# Stop generating once a pool holds this many questions
+MAX_POOL_SIZE = int(os.environ.get("SKILL_POOL_MAX_SIZE", "60"))
+
+_refills_in_flight = set()
+_refill_lock = threading.Lock()
+
+
+def normalize_skill(skill_name):
+    """Pool key for a skill name ("  React.JS " -> "react.js")"""
+    return " ".join(str(skill_name).lower().split())
+
+
+def _question_hash(question_text):
+    return hashlib.sha1(" ".join(question_text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def _is_valid_question(q):
+    return (
+        isinstance(q, dict)
+        and isinstance(q.get("question"), str) and q["question"].strip()
+        and isinstance(q.get("options"), list) and len(q["options"]) >= 2
+        and q.get("answer") in q["options"]
+    )
+
+
+def _to_payload(question, skill_name):
+    return {
+        "id": question.id,
+        "skill": skill_name,
+        "question": question.question,
+        "options": json.loads(question.options),
+        "answer": question.answer
+    }
+
+
+def add_questions(skill_name, questions, source):
+    """
+    Insert questions into a skill's pool, skipping duplicates
+
+    Args:
+        skill_name (str): Skill the questions test
+        questions (list): Dicts with 'question', 'options' and 'answer'
+        source (str): Where they came from (seed, curated, ai)
+
+    Returns:
+        list: Newly created SkillQuestion rows
+    """
+    skill_key = normalize_skill(skill_name)
+    existing = {h for (h,) in db.session.query(SkillQuestion.question_hash)
+                .filter(SkillQuestion.skill_key == skill_key)}
+
+    created = []
+    for q in questions or []:
+        if not _is_valid_question(q):
+            continue
+        question_hash = _question_hash(q["question"])
+        if question_hash in existing:
+            continue
+        existing.add(question_hash)
+        created.append(SkillQuestion(
+            skill_key=skill_key,
+            skill_name=skill_name,
+            question=q["question"],
+            question_hash=question_hash,
+            options=json.dumps(q["options"]),
+            answer=q["answer"],
+            source=source
+        ))
+
+    if not created:
+        return []
+    try:
+        db.session.add_all(created)
+        db.session.commit()
+    except IntegrityError:
+        # Another worker seeded the same pool concurrently
+        db.session.rollback()
+        logger.info(f"Skill pool '{skill_key}' was filled concurrently")
+        return []
+    return created
+
+
+def seed_skill_pool(skill_name):
+    """Fill an empty pool from the curated questions and the generic fallback"""
+    from utils.skills_extractor import PREDEFINED_SKILL_QUESTIONS
+    from utils.openai_helper import fallback_skill_questions
+
+    skill_key = normalize_skill(skill_name)
+    curated = [qs for known, qs in PREDEFINED_SKILL_QUESTIONS.items() if normalize_skill(known) == skill_key]
+    created = add_questions(skill_name, curated[0] if curated else [], "curated")
+    created += add_questions(skill_name, fallback_skill_questions(skill_name), "seed")
+    logger.info(f"Seeded skill pool '{skill_key}' with {len(created)} questions")
+    return created
+
+
+def refill_skill_pool(skill_name):
+    """Generate more questions for a skill; runs on the background task pool"""
+    from utils.openai_helper import generate_skill_questions, OPENAI_AVAILABLE
+
+    skill_key = normalize_skill(skill_name)
+    try:
+        pool_size = SkillQuestion.query.filter_by(skill_key=skill_key).count()
+        if pool_size >= MAX_POOL_SIZE:
+            return 0
+        questions = generate_skill_questions(skill_name)
+        if isinstance(questions, dict):
+            # JSON mode wraps the array in an object, e.g. {"questions": [...]}
+            questions = next((v for v in questions.values() if isinstance(v, list)), [])
+        created = add_questions(skill_name, questions, "ai" if OPENAI_AVAILABLE else "seed")
+        logger.info(f"Refilled skill pool '{skill_key}' with {len(created)} new questions")
+        return len(created)
+    finally:
+        with _refill_lock:
+            _refills_in_flight.discard(skill_key)
+
+
+def schedule_refill(app, skill_name):
+    """Queue a background refill unless one is already running for this skill"""
+    skill_key = normalize_skill(skill_name)
+    with _refill_lock:
+        if skill_key in _refills_in_flight:
+            return False
+        _refills_in_flight.add(skill_key)
+    submit_task(app, refill_skill_pool, skill_name)
+    return True
+
+
+def get_questions_for_user(app, user_id, skill_names, limit=QUESTIONS_PER_TEST):
+    """
+    Sample test questions for a user without repeating ones they have seen
+
+    Args:
+        app: Flask application, used for background refills
+        user_id (int): User taking the test
+        skill_names (list): Skills to test
+        limit (int): Number of questions to return
+
+    Returns:
+        list: Question dicts with 'id', 'skill', 'question', 'options', 'answer'
+    """
+    from utils.skills_extractor import GENERIC_SKILL_QUESTIONS
+
+    names_by_key = {}
+    for name in skill_names:
+        names_by_key.setdefault(normalize_skill(name), str(name).strip())
+
+    # One query: every pooled question for these skills, flagged if this user has seen it
+    rows = db.session.query(SkillQuestion, ServedSkillQuestion.id).outerjoin(
+        ServedSkillQuestion,
+        and_(ServedSkillQuestion.question_id == SkillQuestion.id,
+             ServedSkillQuestion.user_id == user_id)
+    ).filter(SkillQuestion.skill_key.in_(list(names_by_key))).all()
+
+    unseen = {key: [] for key in names_by_key}
+    seen = {key: [] for key in names_by_key}
+    for question, served_id in rows:
+        (seen if served_id else unseen)[question.skill_key].append(question)
+
+    for key, name in names_by_key.items():
+        if not unseen[key] and not seen[key]:
+            # First time anyone is tested on this skill
+            unseen[key] = seed_skill_pool(name)
+        elif not unseen[key]:
+            # User has seen the whole pool; start the rotation over
+            ServedSkillQuestion.query.filter(
+                ServedSkillQuestion.user_id == user_id,
+                ServedSkillQuestion.question_id.in_([q.id for q in seen[key]])
+            ).delete(synchronize_session=False)
+            unseen[key], seen[key] = seen[key], []
+        random.shuffle(unseen[key])
+
+    # Round-robin across skills so a test covers as many skills as possible
+    picked = []
+    while len(picked) < limit and any(unseen.values()):
+        for key in names_by_key:
+            if unseen[key] and len(picked) < limit:
+                picked.append((unseen[key].pop(), names_by_key[key]))
+
+    questions = [_to_payload(q, name) for q, name in picked]
+    pool_sizes = {key: len(unseen[key]) + len(seen[key]) + sum(1 for q, _ in picked if q.skill_key == key)
+                  for key in names_by_key}
+    try:
+        db.session.add_all(ServedSkillQuestion(user_id=user_id, question_id=q.id) for q, _ in picked)
+        db.session.commit()
+    except IntegrityError:
+        # The same user started another test concurrently and was served some of
+        # these questions too; they are still fine for this test
+        db.session.rollback()
+        logger.info(f"Questions for user {user_id} were recorded as served concurrently")
+
+    for key, name in names_by_key.items():
+        if len(unseen[key]) < POOL_LOW_WATERMARK and pool_sizes[key] < MAX_POOL_SIZE:
+            schedule_refill(app, name)
+
+    if len(questions) < limit:
+        questions.extend(GENERIC_SKILL_QUESTIONS[:limit - len(questions)])
+    return questions
@@ -5,6 +5,8 @@ import logging
 import json
 import os
 
+from utils.prompt_compactor import compact_resume
+
 # Import OpenAI helper
 try:
     from openai import OpenAI
@@ -25,32 +27,19 @@ except Exception as e:
     nlp = None
 
 # Load skills list
-try:
-    skills_dataset_path = 'attached_assets/expanded_skills_with_web_app_and_database.csv'
-    # Load CSV with explicit UTF-8 encoding and error handling
+skills_dataset_path = 'attached_assets/expanded_skills_with_web_app_and_database.csv'
+skills_list = []
+# The dataset has been saved as UTF-16 as well as UTF-8, so try the likely encodings in turn
+for encoding in ('utf-8-sig', 'utf-16', 'latin1'):
     try:
-        # Try with utf-8-sig first to handle BOM
-        skills_df = pd.read_csv(skills_dataset_path, encoding='utf-8-sig')
+        skills_df = pd.read_csv(skills_dataset_path, encoding=encoding)
         skills_list = [str(skill).strip().lower() for skill in skills_df['skill'].tolist() if pd.notna(skill)]
-    except UnicodeDecodeError:
-        try:
-            # Try with utf-8 if utf-8-sig fails
-            skills_df = pd.read_csv(skills_dataset_path, encoding='utf-8')
-            skills_list = [str(skill).strip().lower() for skill in skills_df['skill'].tolist() if pd.notna(skill)]
-        except UnicodeDecodeError:
-            try:
-                # Try with latin1 as a fallback
-                skills_df = pd.read_csv(skills_dataset_path, encoding='latin1')
-                skills_list = [str(skill).strip().lower() for skill in skills_df['skill'].tolist() if pd.notna(skill)]
-            except Exception as e:
-                logging.error(f"Error loading skills dataset with alternative encoding: {str(e)}")
-                skills_list = []
+        break
+    except (UnicodeError, KeyError) as e:
+        logging.debug(f"Skills dataset is not {encoding}: {str(e)}")
     except Exception as e:
         logging.error(f"Error loading skills dataset: {str(e)}")
-        skills_list = []
-except Exception as e:
-    logging.error(f"Error loading skills dataset: {str(e)}")
-    skills_list = []
+        break
 
 def extract_skills(text):
     """Extract skills from text using AI, NLP and pattern matching"""
@@ -122,7 +111,7 @@ def extract_skills_with_openai(text):
         Return only a JSON array of skills, with no other text.
         
         Resume text:
-        {text[:4000]}  # Limit text length to avoid token limits
+        {compact_resume(text, 'skills_extraction')}
         
         Format the response as a valid JSON array of strings, for example:
         ["Python", "JavaScript", "React", "Data Analysis", "Project Management"]
@@ -206,204 +195,258 @@ def categorize_skills(skills):
     # Remove empty categories
     return {k: v for k, v in categorized.items() if v}
 
-def generate_skill_test_questions(skills):
-    """Generate test questions for skills assessment"""
-    from utils.openai_helper import generate_skill_questions
-    
-    questions = []
-    
-    # Map skills to predefined questions as fallback
-    skill_questions = {
-        'Python': [
-            {
-                'question': 'What is the output of the following Python code?\n\nx = [1, 2, 3]\ny = x\ny.append(4)\nprint(x)',
-                'options': ['[1, 2, 3]', '[1, 2, 3, 4]', '[4, 1, 2, 3]', 'Error'],
-                'answer': '[1, 2, 3, 4]'
-            },
-            {
-                'question': 'Which of the following is NOT a built-in data type in Python?',
-                'options': ['List', 'Dictionary', 'Array', 'Tuple'],
-                'answer': 'Array'
-            },
-            {
-                'question': 'What is the time complexity of accessing an element in a dictionary?',
-                'options': ['O(1)', 'O(log n)', 'O(n)', 'O(n²)'],
-                'answer': 'O(1)'
-            },
-            {
-                'question': 'Which of the following is a Python decorator?',
-                'options': ['@property', '#include', '$parameter', '&reference'],
-                'answer': '@property'
-            },
-            {
-                'question': 'What will be the output of: print(list(filter(lambda x: x > 5, [2, 4, 6, 8, 10])))?',
-                'options': ['[6, 8, 10]', '[2, 4]', 'Error', '[2, 4, 6, 8, 10]'],
-                'answer': '[6, 8, 10]'
-            }
-        ],
-        'JavaScript': [
-            {
-                'question': 'What is the output of console.log(1 + "2" + "2");',
-                'options': ['122', '32', '14', 'Error'],
-                'answer': '122'
-            },
-            {
-                'question': 'Which of the following is NOT a JavaScript framework or library?',
-                'options': ['React', 'Vue', 'Django', 'Angular'],
-                'answer': 'Django'
-            },
-            {
-                'question': 'What does the "async" keyword do in JavaScript?',
-                'options': ['Marks a function as asynchronous', 'Increases execution speed', 'Creates a new thread', 'Blocks execution'],
-                'answer': 'Marks a function as asynchronous'
-            },
-            {
-                'question': 'What is the prototype chain in JavaScript?',
-                'options': ['A series of objects linked through prototypes', 'A data structure for storing arrays', 'A method for optimizing code', 'A way to encrypt data'],
-                'answer': 'A series of objects linked through prototypes'
-            },
-            {
-                'question': 'Which method would you use to create a deep copy of an object in JavaScript?',
-                'options': ['JSON.parse(JSON.stringify(obj))', 'Object.assign({}, obj)', 'obj.slice()', 'obj.clone()'],
-                'answer': 'JSON.parse(JSON.stringify(obj))'
-            }
-        ],
-        'Java': [
-            {
-                'question': 'What is the parent class of all classes in Java?',
-                'options': ['String', 'System', 'Object', 'Root'],
-                'answer': 'Object'
-            },
-            {
-                'question': 'Which of the following is not a valid access modifier in Java?',
-                'options': ['public', 'private', 'protected', 'friend'],
-                'answer': 'friend'
-            },
-            {
-                'question': 'Which collection in Java provides the fastest lookups?',
-                'options': ['HashMap', 'ArrayList', 'LinkedList', 'Vector'],
-                'answer': 'HashMap'
-            },
-            {
-                'question': 'What is the purpose of the "volatile" keyword in Java?',
-                'options': ['Indicates a variable may be changed by multiple threads', 'Makes a variable unchangeable', 'Optimizes variable access', 'Indicates a critical section'],
-                'answer': 'Indicates a variable may be changed by multiple threads'
-            },
-            {
-                'question': 'Which Java construct is used for exception handling?',
-                'options': ['try-catch-finally', 'if-else-endif', 'switch-case', 'for-next'],
-                'answer': 'try-catch-finally'
-            }
+# Curated questions for common skills, also used to seed the question bank
+PREDEFINED_SKILL_QUESTIONS = {
+    'Python': [
+        {
+            'question': 'What is the output of the following Python code?\n\nx = [1, 2, 3]\ny = x\ny.append(4)\nprint(x)',
+            'options': ['[1, 2, 3]', '[1, 2, 3, 4]', '[4, 1, 2, 3]', 'Error'],
+            'answer': '[1, 2, 3, 4]'
+        },
+        {
+            'question': 'Which of the following is NOT a built-in data type in Python?',
+            'options': ['List', 'Dictionary', 'Array', 'Tuple'],
+            'answer': 'Array'
+        },
+        {
+            'question': 'What is the time complexity of accessing an element in a dictionary?',
+            'options': ['O(1)', 'O(log n)', 'O(n)', 'O(n²)'],
+            'answer': 'O(1)'
+        },
+        {
+            'question': 'Which of the following is a Python decorator?',
+            'options': ['@property', '#include', '$parameter', '&reference'],
+            'answer': '@property'
+        },
+        {
+            'question': 'What will be the output of: print(list(filter(lambda x: x > 5, [2, 4, 6, 8, 10])))?',
+            'options': ['[6, 8, 10]', '[2, 4]', 'Error', '[2, 4, 6, 8, 10]'],
+            'answer': '[6, 8, 10]'
+        }
+    ],
+    'JavaScript': [
+        {
+            'question': 'What is the output of console.log(1 + "2" + "2");',
+            'options': ['122', '32', '14', 'Error'],
+            'answer': '122'
+        },
+        {
+            'question': 'Which of the following is NOT a JavaScript framework or library?',
+            'options': ['React', 'Vue', 'Django', 'Angular'],
+            'answer': 'Django'
+        },
+        {
+            'question': 'What does the "async" keyword do in JavaScript?',
+            'options': ['Marks a function as asynchronous', 'Increases execution speed', 'Creates a new thread', 'Blocks execution'],
+            'answer': 'Marks a function as asynchronous'
+        },
+        {
+            'question': 'What is the prototype chain in JavaScript?',
+            'options': ['A series of objects linked through prototypes', 'A data structure for storing arrays', 'A method for optimizing code', 'A way to encrypt data'],
+            'answer': 'A series of objects linked through prototypes'
+        },
+        {
+            'question': 'Which method would you use to create a deep copy of an object in JavaScript?',
+            'options': ['JSON.parse(JSON.stringify(obj))', 'Object.assign({}, obj)', 'obj.slice()', 'obj.clone()'],
+            'answer': 'JSON.parse(JSON.stringify(obj))'
+        }
+    ],
+    'Java': [
+        {
+            'question': 'What is the parent class of all classes in Java?',
+            'options': ['String', 'System', 'Object', 'Root'],
+            'answer': 'Object'
+        },
+        {
+            'question': 'Which of the following is not a valid access modifier in Java?',
+            'options': ['public', 'private', 'protected', 'friend'],
+            'answer': 'friend'
+        },
+        {
+            'question': 'Which collection in Java provides the fastest lookups?',
+            'options': ['HashMap', 'ArrayList', 'LinkedList', 'Vector'],
+            'answer': 'HashMap'
+        },
+        {
+            'question': 'What is the purpose of the "volatile" keyword in Java?',
+            'options': ['Indicates a variable may be changed by multiple threads', 'Makes a variable unchangeable', 'Optimizes variable access', 'Indicates a critical section'],
+            'answer': 'Indicates a variable may be changed by multiple threads'
+        },
+        {
+            'question': 'Which Java construct is used for exception handling?',
+            'options': ['try-catch-finally', 'if-else-endif', 'switch-case', 'for-next'],
+            'answer': 'try-catch-finally'
+        }
+    ],
+    'HTML': [
+        {
+            'question': 'Which HTML tag is used to define an internal style sheet?',
+            'options': ['<script>', '<style>', '<html>', '<css>'],
+            'answer': '<style>'
+        },
+        {
+            'question': 'Which HTML attribute is used to define inline styles?',
+            'options': ['styles', 'style', 'class', 'font'],
+            'answer': 'style'
+        },
+        {
+            'question': 'What does the "defer" attribute do in a script tag?',
+            'options': ['Postpones script execution until page is parsed', 'Loads the script faster', 'Prevents script execution', 'Compresses the script'],
+            'answer': 'Postpones script execution until page is parsed'
+        },
+        {
+            'question': 'Which element is used to create a dropdown list?',
+            'options': ['<select>', '<dropdown>', '<option>', '<list>'],
+            'answer': '<select>'
+        },
+        {
+            'question': 'Which HTML5 element is used to specify a footer for a document or section?',
+            'options': ['<footer>', '<bottom>', '<section>', '<end>'],
+            'answer': '<footer>'
+        }
+    ],
+    'CSS': [
+        {
+            'question': 'Which CSS property controls the text size?',
+            'options': ['text-size', 'font-size', 'text-style', 'font-style'],
+            'answer': 'font-size'
+        },
+        {
+            'question': 'What does CSS stand for?',
+            'options': ['Cascading Style Sheets', 'Computer Style Sheets', 'Creative Style Sheets', 'Colorful Style Sheets'],
+            'answer': 'Cascading Style Sheets'
+        },
+        {
+            'question': 'Which CSS selector has the highest specificity?',
+            'options': ['ID selector', 'Class selector', 'Tag selector', 'Universal selector'],
+            'answer': 'ID selector'
+        },
+        {
+            'question': 'What is the purpose of the z-index property?',
+            'options': ['Controls stacking order of elements', 'Controls element width', 'Controls element position', 'Controls element visibility'],
+            'answer': 'Controls stacking order of elements'
+        },
+        {
+            'question': 'Which unit is relative to the font-size of the element?',
+            'options': ['em', 'px', 'cm', 'vh'],
+            'answer': 'em'
+        }
+    ],
+    'SQL': [
+        {
+            'question': 'Which SQL statement is used to extract data from a database?',
+            'options': ['GET', 'EXTRACT', 'SELECT', 'OPEN'],
+            'answer': 'SELECT'
+        },
+        {
+            'question': 'Which SQL keyword is used to filter results?',
+            'options': ['FILTER', 'WHERE', 'LIMIT', 'HAVING'],
+            'answer': 'WHERE'
+        },
+        {
+            'question': 'What is a database index used for?',
+            'options': ['To improve query performance', 'To store metadata', 'To prevent data corruption', 'To normalize data'],
+            'answer': 'To improve query performance'
+        },
+        {
+            'question': 'Which SQL join returns rows when there is a match in both tables?',
+            'options': ['INNER JOIN', 'LEFT JOIN', 'RIGHT JOIN', 'FULL JOIN'],
+            'answer': 'INNER JOIN'
+        },
+        {
+            'question': 'What does ACID stand for in database transactions?',
+            'options': ['Atomicity, Consistency, Isolation, Durability', 'Advanced Connection, Integration, Data', 'Automatic, Concurrent, Isolated, Distributed', 'Array, Column, Index, Domain'],
+            'answer': 'Atomicity, Consistency, Isolation, Durability'
+        }
+    ],
+    'React.js': [
+        {
+            'question': 'What function is used to update state in a React class component?',
+            'options': ['this.state()', 'this.setState()', 'this.updateState()', 'this.changeState()'],
+            'answer': 'this.setState()'
+        },
+        {
+            'question': 'In React, what is used to pass data to a component from outside?',
+            'options': ['setState', 'props', 'render', 'PropTypes'],
+            'answer': 'props'
+        },
+        {
+            'question': 'What is the purpose of the useEffect hook?',
+            'options': ['To perform side effects in function components', 'To create state in class components', 'To optimize rendering', 'To handle form submissions'],
+            'answer': 'To perform side effects in function components'
+        },
+        {
+            'question': 'What is React Context used for?',
+            'options': ['To share data between components without prop drilling', 'To connect to databases', 'To handle form validation', 'To create animations'],
+            'answer': 'To share data between components without prop drilling'
+        },
+        {
+            'question': 'What is a Pure Component in React?',
+            'options': ['A component that only renders when props change', 'A component without state', 'A component without JSX', 'A component with no side effects'],
+            'answer': 'A component that only renders when props change'
+        }
+    ]
+}
+
+# Generic questions used to top up short tests
+GENERIC_SKILL_QUESTIONS = [
+    {
+        'skill': 'Problem Solving',
+        'question': 'What approach would you take to solve a complex programming problem?',
+        'options': [
+            'Break it down into smaller components and solve each one',
+            'Look for existing solutions online and adapt them',
+            'Ask a colleague for help immediately',
+            'Try solving the entire problem at once'
         ],
-        'HTML': [
-            {
-                'question': 'Which HTML tag is used to define an internal style sheet?',
-                'options': ['<script>', '<style>', '<html>', '<css>'],
-                'answer': '<style>'
-            },
-            {
-                'question': 'Which HTML attribute is used to define inline styles?',
-                'options': ['styles', 'style', 'class', 'font'],
-                'answer': 'style'
-            },
-            {
-                'question': 'What does the "defer" attribute do in a script tag?',
-                'options': ['Postpones script execution until page is parsed', 'Loads the script faster', 'Prevents script execution', 'Compresses the script'],
-                'answer': 'Postpones script execution until page is parsed'
-            },
-            {
-                'question': 'Which element is used to create a dropdown list?',
-                'options': ['<select>', '<dropdown>', '<option>', '<list>'],
-                'answer': '<select>'
-            },
-            {
-                'question': 'Which HTML5 element is used to specify a footer for a document or section?',
-                'options': ['<footer>', '<bottom>', '<section>', '<end>'],
-                'answer': '<footer>'
-            }
+        'answer': 'Break it down into smaller components and solve each one'
+    },
+    {
+        'skill': 'Software Development',
+        'question': 'Which development methodology emphasizes adaptive planning and continuous improvement?',
+        'options': ['Waterfall', 'Agile', 'Big Bang', 'Critical Path Method'],
+        'answer': 'Agile'
+    },
+    {
+        'skill': 'Critical Thinking',
+        'question': 'What is the most effective way to validate a solution?',
+        'options': [
+            'Test it against multiple scenarios and edge cases',
+            'Compare it with online solutions',
+            'Ask for peer approval',
+            'Go with your first instinct'
         ],
-        'CSS': [
-            {
-                'question': 'Which CSS property controls the text size?',
-                'options': ['text-size', 'font-size', 'text-style', 'font-style'],
-                'answer': 'font-size'
-            },
-            {
-                'question': 'What does CSS stand for?',
-                'options': ['Cascading Style Sheets', 'Computer Style Sheets', 'Creative Style Sheets', 'Colorful Style Sheets'],
-                'answer': 'Cascading Style Sheets'
-            },
-            {
-                'question': 'Which CSS selector has the highest specificity?',
-                'options': ['ID selector', 'Class selector', 'Tag selector', 'Universal selector'],
-                'answer': 'ID selector'
-            },
-            {
-                'question': 'What is the purpose of the z-index property?',
-                'options': ['Controls stacking order of elements', 'Controls element width', 'Controls element position', 'Controls element visibility'],
-                'answer': 'Controls stacking order of elements'
-            },
-            {
-                'question': 'Which unit is relative to the font-size of the element?',
-                'options': ['em', 'px', 'cm', 'vh'],
-                'answer': 'em'
-            }
+        'answer': 'Test it against multiple scenarios and edge cases'
+    },
+    {
+        'skill': 'Project Management',
+        'question': 'Which is a key principle of effective technical project management?',
+        'options': [
+            'Regular communication and progress tracking',
+            'Adding more developers to speed up a delayed project',
+            'Focusing on documentation over working code',
+            'Strictly following the initial plan regardless of changes'
         ],
-        'SQL': [
-            {
-                'question': 'Which SQL statement is used to extract data from a database?',
-                'options': ['GET', 'EXTRACT', 'SELECT', 'OPEN'],
-                'answer': 'SELECT'
-            },
-            {
-                'question': 'Which SQL keyword is used to filter results?',
-                'options': ['FILTER', 'WHERE', 'LIMIT', 'HAVING'],
-                'answer': 'WHERE'
-            },
-            {
-                'question': 'What is a database index used for?',
-                'options': ['To improve query performance', 'To store metadata', 'To prevent data corruption', 'To normalize data'],
-                'answer': 'To improve query performance'
-            },
-            {
-                'question': 'Which SQL join returns rows when there is a match in both tables?',
-                'options': ['INNER JOIN', 'LEFT JOIN', 'RIGHT JOIN', 'FULL JOIN'],
-                'answer': 'INNER JOIN'
-            },
-            {
-                'question': 'What does ACID stand for in database transactions?',
-                'options': ['Atomicity, Consistency, Isolation, Durability', 'Advanced Connection, Integration, Data', 'Automatic, Concurrent, Isolated, Distributed', 'Array, Column, Index, Domain'],
-                'answer': 'Atomicity, Consistency, Isolation, Durability'
-            }
+        'answer': 'Regular communication and progress tracking'
+    },
+    {
+        'skill': 'Version Control',
+        'question': 'What is the purpose of branching in version control systems?',
+        'options': [
+            'To work on features or fixes without affecting the main codebase',
+            'To speed up code execution',
+            'To compress the codebase',
+            'To limit developer access to code'
         ],
-        'React.js': [
-            {
-                'question': 'What function is used to update state in a React class component?',
-                'options': ['this.state()', 'this.setState()', 'this.updateState()', 'this.changeState()'],
-                'answer': 'this.setState()'
-            },
-            {
-                'question': 'In React, what is used to pass data to a component from outside?',
-                'options': ['setState', 'props', 'render', 'PropTypes'],
-                'answer': 'props'
-            },
-            {
-                'question': 'What is the purpose of the useEffect hook?',
-                'options': ['To perform side effects in function components', 'To create state in class components', 'To optimize rendering', 'To handle form submissions'],
-                'answer': 'To perform side effects in function components'
-            },
-            {
-                'question': 'What is React Context used for?',
-                'options': ['To share data between components without prop drilling', 'To connect to databases', 'To handle form validation', 'To create animations'],
-                'answer': 'To share data between components without prop drilling'
-            },
-            {
-                'question': 'What is a Pure Component in React?',
-                'options': ['A component that only renders when props change', 'A component without state', 'A component without JSX', 'A component with no side effects'],
-                'answer': 'A component that only renders when props change'
-            }
-        ]
+        'answer': 'To work on features or fixes without affecting the main codebase'
     }
+]
+
+def generate_skill_test_questions(skills):
+    """Generate test questions for skills assessment"""
+    from utils.openai_helper import generate_skill_questions
+    
+    questions = []
     
     # Use OpenAI to generate better questions first for each skill
     final_questions = []
@@ -428,7 +471,7 @@ def generate_skill_test_questions(skills):
             # Continue to fallback
             
         # If OpenAI fails or isn't available, use predefined questions
-        for known_skill, qs in skill_questions.items():
+        for known_skill, qs in PREDEFINED_SKILL_QUESTIONS.items():
             if skill.lower() == known_skill.lower():
                 # Add all questions for this skill
                 for q in qs:
@@ -440,63 +483,9 @@ def generate_skill_test_questions(skills):
                     })
                 break
     
-    # If we have too few questions, add some generic ones
-    generic_questions = [
-        {
-            'skill': 'Problem Solving',
-            'question': 'What approach would you take to solve a complex programming problem?',
-            'options': [
-                'Break it down into smaller components and solve each one',
-                'Look for existing solutions online and adapt them',
-                'Ask a colleague for help immediately',
-                'Try solving the entire problem at once'
-            ],
-            'answer': 'Break it down into smaller components and solve each one'
-        },
-        {
-            'skill': 'Software Development',
-            'question': 'Which development methodology emphasizes adaptive planning and continuous improvement?',
-            'options': ['Waterfall', 'Agile', 'Big Bang', 'Critical Path Method'],
-            'answer': 'Agile'
-        },
-        {
-            'skill': 'Critical Thinking',
-            'question': 'What is the most effective way to validate a solution?',
-            'options': [
-                'Test it against multiple scenarios and edge cases',
-                'Compare it with online solutions',
-                'Ask for peer approval',
-                'Go with your first instinct'
-            ],
-            'answer': 'Test it against multiple scenarios and edge cases'
-        },
-        {
-            'skill': 'Project Management',
-            'question': 'Which is a key principle of effective technical project management?',
-            'options': [
-                'Regular communication and progress tracking',
-                'Adding more developers to speed up a delayed project',
-                'Focusing on documentation over working code',
-                'Strictly following the initial plan regardless of changes'
-            ],
-            'answer': 'Regular communication and progress tracking'
-        },
-        {
-            'skill': 'Version Control',
-            'question': 'What is the purpose of branching in version control systems?',
-            'options': [
-                'To work on features or fixes without affecting the main codebase',
-                'To speed up code execution',
-                'To compress the codebase',
-                'To limit developer access to code'
-            ],
-            'answer': 'To work on features or fixes without affecting the main codebase'
-        }
-    ]
-    
     # Add generic questions if needed
     if len(final_questions) < 5:
         needed = 5 - len(final_questions)
-        final_questions.extend(generic_questions[:needed])
+        final_questions.extend(GENERIC_SKILL_QUESTIONS[:needed])
     
     return final_questions[:5]  # Return at most 5 questions
@@ -0,0 +1,352 @@
+"""
+Upload lifecycle: in-memory processing, retention and disk quotas
+
+accept_upload() is the single entry point for upload routes. It buffers and
+hashes the file (in memory when small, see utils/upload_store.py), enforces
+the per-user and global disk quotas, and puts the file into the
+content-addressed store.
+
+Stored files are kept for UPLOAD_RETENTION_DAYS after they were last
+uploaded. A background sweeper (start_upload_sweeper) then deletes them along
+with their cached stage results, evicts least recently used files while the
+store is over its global quota, and removes stray files such as pre-store
+`{uuid}_{filename}` uploads and abandoned spool files. Files a queued job
+still needs are never removed, unless the job has run past UPLOAD_JOB_TIMEOUT.
+
+The sweeper thread is started on a process's first request, so under gunicorn
+it runs in the workers (with or without --preload; threads started in the
+master would not survive the fork). Workers on one host take turns through a
+lock file (UPLOAD_SWEEP_LOCK): only the process holding it sweeps, and another
+worker takes over when that one exits. With several hosts sharing a database,
+set UPLOAD_SWEEP_INTERVAL=0 and run `flask resumeai sweep-uploads` from cron
+on one of them instead.
+
+get_upload_stats() reports disk usage and the I/O avoided by in-memory
+processing and de-duplicated re-uploads (counters are per process).
+"""
+import os
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from models import db, Candidate, ResumeAnalysis, StoredUpload, UploadStageResult
+from utils.upload_pipeline import JOB_TIMEOUT
+from utils.upload_store import buffer_upload, discard_upload, find_stored, store_upload, SPOOL_PREFIX
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): every process then sweeps
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+RETENTION_DAYS = float(os.environ.get("UPLOAD_RETENTION_DAYS", "30"))
+USER_QUOTA_BYTES = int(float(os.environ.get("UPLOAD_USER_QUOTA_MB", "50")) * MB)
+GLOBAL_QUOTA_BYTES = int(float(os.environ.get("UPLOAD_GLOBAL_QUOTA_MB", "2048")) * MB)
+# Seconds between sweeps; 0 disables the background sweeper
+SWEEP_INTERVAL = int(os.environ.get("UPLOAD_SWEEP_INTERVAL", "3600"))
+# Held by the one process per host that runs the background sweeps
+SWEEP_LOCK_PATH = os.environ.get("UPLOAD_SWEEP_LOCK", os.path.join(tempfile.gettempdir(), "resumeai_upload_sweeper.lock"))
+# Spool files older than this belong to requests that died mid-upload
+STALE_SPOOL_SECONDS = 3600
+
+_stats = {
+    "uploads": 0, "in_memory": 0, "spooled": 0,
+    "bytes_written": 0, "write_ms": 0.0,
+    "read_bytes_avoided": 0, "dedup_writes_avoided": 0, "dedup_bytes_avoided": 0,
+    "quota_rejections": 0, "evicted_files": 0, "expired_files": 0, "stray_files": 0, "freed_bytes": 0
+}
+_stats_lock = threading.Lock()
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+_sweep_lock_handle = None
+
+
+class QuotaExceededError(Exception):
+    """Raised when storing an upload would exceed the user's or the global disk quota"""
+
+
+def _bump(**amounts):
+    with _stats_lock:
+        for stat, amount in amounts.items():
+            _stats[stat] += amount
+
+
+def user_usage(user_id):
+    """Bytes of stored uploads referenced by this user's analyses"""
+    hashes = select(ResumeAnalysis.content_hash).join(
+        Candidate, ResumeAnalysis.candidate_id == Candidate.id
+    ).where(Candidate.user_id == user_id)
+    return db.session.execute(
+        select(func.coalesce(func.sum(StoredUpload.size), 0)).where(StoredUpload.sha256.in_(hashes))
+    ).scalar()
+
+
+def global_usage():
+    """Bytes of all stored uploads"""
+    return db.session.execute(select(func.coalesce(func.sum(StoredUpload.size), 0))).scalar()
+
+
+def _pending_hashes():
+    """Content hashes of uploads that queued jobs (within JOB_TIMEOUT) have yet to process"""
+    return set(db.session.execute(
+        select(ResumeAnalysis.content_hash).where(
+            ResumeAnalysis.status == "queued", ResumeAnalysis.content_hash.isnot(None),
+            ResumeAnalysis.created_at >= datetime.utcnow() - JOB_TIMEOUT
+        )
+    ).scalars())
+
+
+def _remove_file(path):
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+        return size
+    except FileNotFoundError:
+        return 0
+
+
+def _delete_stored(rows, drop_stage_results=False):
+    """Delete stored files and their rows (caller commits); returns bytes freed"""
+    freed = 0
+    for row in rows:
+        freed += _remove_file(row.path)
+        if drop_stage_results:
+            UploadStageResult.query.filter_by(sha256=row.sha256).delete()
+        db.session.delete(row)
+    return freed
+
+
+def evict_lru(bytes_needed):
+    """
+    Delete least recently uploaded files until bytes_needed have been freed
+
+    Cached stage results are kept, so a later re-upload of evicted content
+    is still served from the cache.
+
+    Returns:
+        tuple: (files deleted, bytes freed)
+    """
+    pending = _pending_hashes()
+    victims = []
+    freed = 0
+    for row in StoredUpload.query.order_by(StoredUpload.last_seen_at.asc()).yield_per(100):
+        if freed >= bytes_needed:
+            break
+        if row.sha256 in pending:
+            continue
+        victims.append(row)
+        freed += row.size
+    freed = _delete_stored(victims)
+    db.session.commit()
+    _bump(evicted_files=len(victims), freed_bytes=freed)
+    if victims:
+        logger.info(f"Evicted {len(victims)} stored uploads ({freed} bytes) to stay within the global quota")
+    return len(victims), freed
+
+
+def accept_upload(file, filename, user_id, upload_folder):
+    """
+    Buffer, quota-check and store an upload
+
+    Args:
+        file: werkzeug FileStorage from the request
+        filename (str): Sanitized original filename
+        user_id (int): Uploading user, for the per-user quota
+        upload_folder (str): Root of the upload store
+
+    Returns:
+        BufferedUpload: sha256, path in the store, and data (the file's bytes)
+        when it is small enough to be processed from memory
+
+    Raises:
+        QuotaExceededError: if the file is new and would not fit in a quota
+    """
+    upload = buffer_upload(file, upload_folder, filename)
+    try:
+        if find_stored(upload.sha256) is None:
+            if user_usage(user_id) + upload.size > USER_QUOTA_BYTES:
+                _bump(quota_rejections=1)
+                raise QuotaExceededError(
+                    f"Upload storage limit of {USER_QUOTA_BYTES // MB} MB reached. "
+                    f"Older uploads are removed after {RETENTION_DAYS:g} days."
+                )
+            overflow = global_usage() + upload.size - GLOBAL_QUOTA_BYTES
+            if overflow > 0 and evict_lru(overflow)[1] < overflow:
+                _bump(quota_rejections=1)
+                raise QuotaExceededError("Upload storage is full. Please try again later.")
+
+        start = time.perf_counter()
+        written = store_upload(upload, upload_folder)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        discard_upload(upload)
+
+    _bump(uploads=1)
+    if upload.data is not None:
+        _bump(in_memory=1, read_bytes_avoided=upload.size)
+    else:
+        _bump(spooled=1)
+    if written:
+        _bump(bytes_written=upload.size, write_ms=elapsed)
+    else:
+        _bump(dedup_writes_avoided=1, dedup_bytes_avoided=upload.size)
+    return upload
+
+
+def sweep_uploads(upload_folder, now=None):
+    """
+    Apply the retention policy and global quota to the upload store
+
+    Returns:
+        dict: expired, evicted and stray file counts and bytes freed
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=RETENTION_DAYS)
+    pending = _pending_hashes()
+
+    expired = [row for row in StoredUpload.query.filter(StoredUpload.last_seen_at < cutoff).all()
+               if row.sha256 not in pending]
+    freed = _delete_stored(expired, drop_stage_results=True)
+    db.session.commit()
+    _bump(expired_files=len(expired), freed_bytes=freed)
+
+    evicted = 0
+    overflow = global_usage() - GLOBAL_QUOTA_BYTES
+    if overflow > 0:
+        evicted, evicted_bytes = evict_lru(overflow)
+        freed += evicted_bytes
+
+    # Files the store does not know about: legacy uploads and abandoned spool files
+    known = {os.path.abspath(path) for path in db.session.execute(select(StoredUpload.path)).scalars()}
+    cutoff_ts = time.time() - RETENTION_DAYS * 86400
+    stray = 0
+    for root, _, names in os.walk(upload_folder):
+        for name in names:
+            path = os.path.abspath(os.path.join(root, name))
+            if path in known:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            limit = time.time() - STALE_SPOOL_SECONDS if name.startswith(SPOOL_PREFIX) else cutoff_ts
+            if mtime < limit:
+                freed += _remove_file(path)
+                stray += 1
+    # Shard directories left empty
+    for root, dirs, names in os.walk(upload_folder, topdown=False):
+        if root != upload_folder and not dirs and not names:
+            try:
+                os.rmdir(root)
+            except OSError:
+                pass
+    _bump(stray_files=stray)
+
+    result = {"expired": len(expired), "evicted": evicted, "stray": stray, "freed_bytes": freed}
+    logger.info(f"Upload sweep: {result}")
+    return result
+
+
+def disk_usage(upload_folder):
+    """Bytes and number of files actually in the upload folder"""
+    total = 0
+    count = 0
+    for root, _, names in os.walk(upload_folder):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+                count += 1
+            except FileNotFoundError:
+                continue
+    return total, count
+
+
+def get_upload_stats(upload_folder):
+    """
+    Upload store usage and I/O savings
+
+    estimated_io_ms_saved prices the avoided read-backs and duplicate writes
+    at this process's measured write throughput.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    disk_bytes, disk_files = disk_usage(upload_folder)
+    stats.update({
+        "stored_files": StoredUpload.query.count(),
+        "stored_bytes": global_usage(),
+        "disk_files": disk_files,
+        "disk_bytes": disk_bytes,
+        "global_quota_bytes": GLOBAL_QUOTA_BYTES,
+        "user_quota_bytes": USER_QUOTA_BYTES,
+        "retention_days": RETENTION_DAYS
+    })
+    ms_per_byte = stats["write_ms"] / stats["bytes_written"] if stats["bytes_written"] else 0.0
+    stats["estimated_io_ms_saved"] = round(
+        (stats["read_bytes_avoided"] + stats["dedup_bytes_avoided"]) * ms_per_byte, 1
+    )
+    stats["write_ms"] = round(stats["write_ms"], 1)
+    return stats
+
+
+def _hold_sweep_lock():
+    """True if this process is the host's sweeper, taking the lock if it is free"""
+    global _sweep_lock_handle
+    if fcntl is None or _sweep_lock_handle is not None:
+        return True
+    handle = open(SWEEP_LOCK_PATH, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _sweep_lock_handle = handle
+    logger.info(f"Process {os.getpid()} runs the upload sweeps")
+    return True
+
+
+def _run_sweeper(app):
+    """Run sweep_uploads() every SWEEP_INTERVAL seconds while holding the sweep lock"""
+    # First sweep shortly after startup, so short-lived workers still sweep
+    delay = min(60, SWEEP_INTERVAL)
+    while True:
+        time.sleep(delay)
+        delay = SWEEP_INTERVAL
+        if not _hold_sweep_lock():
+            # Another process on this host sweeps; try again next round in case it exits
+            continue
+        try:
+            with app.app_context():
+                sweep_uploads(app.config["UPLOAD_FOLDER"])
+                logger.info(f"Upload store stats: {get_upload_stats(app.config['UPLOAD_FOLDER'])}")
+        except Exception as e:
+            logger.error(f"Upload sweep failed: {str(e)}")
+
+
+def start_upload_sweeper(app):
+    """
+    Start the background sweeper on each process's first request
+
+    Only the process holding SWEEP_LOCK_PATH actually sweeps; the others check
+    for the lock every SWEEP_INTERVAL seconds. Does nothing if
+    UPLOAD_SWEEP_INTERVAL is 0 (sweeps then come from `flask resumeai sweep-uploads`).
+    """
+    if SWEEP_INTERVAL <= 0:
+        return
+
+    @app.before_request
+    def _start_upload_sweeper():
+        global _sweeper_pid
+        if _sweeper_pid == os.getpid():
+            return
+        with _sweeper_lock:
+            if _sweeper_pid == os.getpid():
+                return
+            _sweeper_pid = os.getpid()
+        threading.Thread(target=_run_sweeper, args=(app,), name="upload-sweeper", daemon=True).start()
@@ -0,0 +1,491 @@
+"""
+Background processing pipeline for resume uploads
+
+Upload routes only save the file, create placeholder Candidate/ResumeAnalysis
+rows and enqueue a job here. Text extraction, NER, skill extraction, scoring
+and LLM calls run in a local process pool so they never hold a web worker.
+The outcome (including per-stage timings) is written back to the
+ResumeAnalysis row, which /api/jobs/<job_id> reads for status and results.
+
+Workers never use the app's db.session: a forked worker would share the
+parent's pooled connections and has no app context. The job catalog search
+(the only query a job makes) goes through an engine each worker creates for
+itself in _init_worker().
+
+Stage outputs are cached against the upload's content hash
+(utils/upload_store.py): a job is handed the stages already cached for its
+file and skips them, and a re-upload whose stages are all cached is completed
+in the request by complete_from_cache() without touching the pool.
+
+A job still queued UPLOAD_JOB_TIMEOUT seconds after its upload (lost with a
+restarted web worker, or stuck on a pathological file) is treated as failed:
+job_pending() marks the analysis 'failed' when its status is polled, and the
+upload sweeper no longer keeps its file. A job that still finishes later
+stores its outcome as usual.
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from sqlalchemy import create_engine
+
+from models import db, ResumeAnalysis, CandidateSkill
+from utils.background_tasks import submit_task
+from utils.upload_store import save_stage_results
+from utils.resume_analyzer import analyze_resume_document, extract_basic_info, preprocess_and_segment, extract_entities
+from utils.skills_extractor import extract_skills
+from utils.extraction_artifact import ARTIFACT_VERSION, build_artifact, dump_artifact
+from utils.job_matcher import find_matching_jobs, suggest_job_types
+from utils.job_catalog import get_candidate_jobs
+from utils.job_title_catalog import get_title_catalog
+from utils.ats_scorer import calculate_role_specific_ats_scores
+from utils.advanced_analyzer import analyze_resume as advanced_analyze_resume, calculate_ats_score as advanced_ats_score
+from utils.openai_helper import analyze_resume_strengths_weaknesses
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes; extraction and NER are CPU bound
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Maximum queued + running jobs per web worker before uploads are rejected
+MAX_QUEUE_DEPTH = int(os.environ.get("UPLOAD_QUEUE_DEPTH", "16"))
+# Hint sent to clients in the Retry-After header when the queue is full
+RETRY_AFTER_SECONDS = int(os.environ.get("UPLOAD_RETRY_AFTER", "15"))
+# Queued jobs older than this are reported as failed
+JOB_TIMEOUT = timedelta(seconds=int(os.environ.get("UPLOAD_JOB_TIMEOUT", "300")))
+
+# Pipeline modes, one per upload route
+MODE_BASIC = "basic"        # /upload: text + basic info only
+MODE_STANDARD = "standard"  # /api/upload: ATS scoring + advanced analyzer
+MODE_ENHANCED = "enhanced"  # /api/enhanced-upload: MAANG scoring + OpenAI analysis
+
+# Stage outputs each mode needs; also the keys of the stage cache
+BASIC_STAGES = ("extract", "basic_info", "artifact")
+ANALYSIS_STAGES = BASIC_STAGES + ("skills", "sections", "ner")
+
+_pool = None
+_inflight = 0
+_lock = threading.Lock()
+
+# Worker process side: this worker's own engine for catalog searches
+_worker_engine = None
+
+
+class QueueFullError(Exception):
+    """Raised when MAX_QUEUE_DEPTH jobs are already queued or running"""
+
+
+def is_queue_full():
+    """Cheap pre-check so routes can reject uploads before creating any rows"""
+    return _inflight >= MAX_QUEUE_DEPTH
+
+
+def pipeline_stages(mode):
+    """Cached stage names a job in this mode uses"""
+    if mode == MODE_BASIC:
+        return BASIC_STAGES
+    return ANALYSIS_STAGES + (f"analysis_{mode}",)
+
+
+def is_fully_cached(mode, cached):
+    """True if every stage of mode is in cached, so no job needs to run"""
+    return all(stage in cached for stage in pipeline_stages(mode))
+
+
+def submit_upload_job(app, analysis_id, file_path, mode=MODE_BASIC, cached=None, data=None):
+    """
+    Enqueue a resume for background processing
+
+    Args:
+        app: Flask application, used to persist the outcome
+        analysis_id (int): Placeholder ResumeAnalysis row to fill in
+        file_path (str): Saved upload
+        mode (str): One of MODE_BASIC, MODE_STANDARD, MODE_ENHANCED
+        cached (dict): Stage outputs already cached for this file, which the job skips
+        data (bytes): The file's contents, for small uploads processed from memory
+
+    Raises:
+        QueueFullError: if the queue is at MAX_QUEUE_DEPTH
+    """
+    global _inflight
+
+    with _lock:
+        if _inflight >= MAX_QUEUE_DEPTH:
+            raise QueueFullError(f"Upload queue is full ({_inflight}/{MAX_QUEUE_DEPTH} jobs)")
+        _inflight += 1
+        pool = _get_pool(app)
+
+    try:
+        future = pool.submit(run_pipeline, file_path, mode, time.time(), cached, data)
+    except Exception:
+        _release_slot(broken_pool=pool)
+        raise
+
+    future.add_done_callback(lambda f: _on_job_finished(app, analysis_id, pool, f))
+    logger.info(f"Queued upload job for analysis {analysis_id} ({mode}), depth={_inflight}")
+
+
+def _get_pool(app):
+    """Create the process pool on first use (caller holds _lock)"""
+    global _pool
+    if _pool is None:
+        with app.app_context():
+            database_url = db.engine.url.render_as_string(hide_password=False)
+        engine_options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        _pool = ProcessPoolExecutor(max_workers=UPLOAD_WORKERS, initializer=_init_worker,
+                                    initargs=(database_url, engine_options))
+    return _pool
+
+
+def _release_slot(broken_pool=None):
+    """
+    Free a queue slot; broken_pool is the pool the job ran on, if it broke
+
+    Every job of a broken pool reports it, so the pool is only dropped if it
+    is still the current one, never a replacement created since.
+    """
+    global _inflight, _pool
+    with _lock:
+        _inflight = max(0, _inflight - 1)
+        if broken_pool is None or _pool is not broken_pool:
+            return
+        _pool = None
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _on_job_finished(app, analysis_id, pool, future):
+    """Process pool callback: free the queue slot and persist off the callback thread"""
+    try:
+        outcome = future.result()
+        _release_slot()
+    except BrokenProcessPool as e:
+        logger.error(f"Upload worker pool crashed: {str(e)}")
+        _release_slot(broken_pool=pool)
+        outcome = {"status": "failed", "error": "Resume processing worker crashed", "timings": {}}
+    except Exception as e:
+        _release_slot()
+        outcome = {"status": "failed", "error": str(e), "timings": {}}
+
+    submit_task(app, persist_job_outcome, analysis_id, outcome)
+
+
+def job_pending(analysis, now=None):
+    """
+    True while the analysis's upload job is queued or running
+
+    A job queued longer than JOB_TIMEOUT is marked 'failed' with a timeout error.
+    """
+    if analysis.status != "queued":
+        return False
+    now = now or datetime.utcnow()
+    if analysis.created_at is not None and now - analysis.created_at < JOB_TIMEOUT:
+        return True
+
+    logger.error(f"Upload job for analysis {analysis.id} did not finish within {JOB_TIMEOUT}")
+    analysis.status = "failed"
+    analysis.error_message = "Resume processing timed out, please try uploading again"
+    analysis.completed_at = now
+    db.session.commit()
+    return False
+
+
+def complete_from_cache(analysis_id, file_path, mode, cached):
+    """Fill in a placeholder ResumeAnalysis from cached stage outputs, in the calling request"""
+    start = time.perf_counter()
+    outcome = run_pipeline(file_path, mode, time.time(), cached)
+    outcome["timings"]["cached"] = round((time.perf_counter() - start) * 1000, 1)
+    persist_job_outcome(analysis_id, outcome)
+
+
+def persist_job_outcome(analysis_id, outcome):
+    """Write a pipeline outcome onto its ResumeAnalysis (and Candidate) rows"""
+    analysis = ResumeAnalysis.query.get(analysis_id)
+    if not analysis:
+        logger.warning(f"Analysis {analysis_id} disappeared before its upload job finished")
+        return
+
+    timings = json.loads(analysis.stage_timings or "{}")
+    timings.update(outcome.get("timings", {}))
+    analysis.stage_timings = json.dumps(timings)
+    analysis.completed_at = datetime.utcnow()
+
+    if outcome["status"] != "done":
+        analysis.status = "failed"
+        analysis.error_message = outcome.get("error", "Unknown error")
+        db.session.commit()
+        logger.error(f"Upload job for analysis {analysis_id} failed: {analysis.error_message}")
+        return
+
+    basic_info = outcome["basic_info"]
+    candidate = analysis.candidate
+    candidate.name = basic_info.get("name", "")
+    candidate.email = basic_info.get("email", "")
+    candidate.phone = basic_info.get("phone", "")
+
+    for skill in outcome["skills"]:
+        db.session.add(CandidateSkill(candidate_id=candidate.id, skill_name=skill))
+
+    analysis.resume_text = outcome["resume_text"]
+    analysis.ats_score = outcome.get("ats_score")
+    analysis.improvement_suggestions = outcome.get("improvement_suggestions")
+    if outcome.get("results") is not None:
+        analysis.analysis_results = json.dumps(outcome["results"], default=str)
+    if outcome.get("artifact", {}).get("version") == ARTIFACT_VERSION:
+        analysis.extraction_artifact = dump_artifact(outcome["artifact"])
+        analysis.extraction_version = ARTIFACT_VERSION
+    analysis.status = "done"
+    if analysis.content_hash:
+        save_stage_results(analysis.content_hash, outcome.get("stage_results"))
+    db.session.commit()
+
+    logger.info(f"Upload job for analysis {analysis_id} finished: {timings}")
+
+
+# ---------------------------------------------------------------------------
+# Worker process side
+# ---------------------------------------------------------------------------
+
+def _init_worker(database_url, engine_options):
+    """Pool initializer: give this worker process its own engine"""
+    global _worker_engine
+    _worker_engine = create_engine(database_url, **engine_options)
+
+
+def _candidate_jobs(resume_text, skills):
+    """Job catalog candidates, or the reference catalog if the search fails"""
+    try:
+        return get_candidate_jobs(resume_text, skills, engine=_worker_engine)
+    except Exception as e:
+        logger.error(f"Job catalog search failed, using the reference catalog: {str(e)}")
+        return get_title_catalog().as_frame()
+
+
+def _timed(timings, stage, func, *args, **kwargs):
+    """Call func and record its wall time in milliseconds under timings[stage]"""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _stage(timings, cached, fresh, stage, func, *args):
+    """Cached output of stage if there is one, otherwise run it and record it in fresh"""
+    if stage in cached:
+        return cached[stage]
+    value = _timed(timings, stage, func, *args)
+    fresh[stage] = value
+    return value
+
+
+def run_pipeline(file_path, mode, enqueued_at, cached=None, data=None):
+    """
+    Process one uploaded resume; runs in a worker process and never touches
+    db.session (the catalog search uses the worker's own engine)
+
+    Args:
+        cached (dict): Stage outputs to reuse instead of recomputing
+        data (bytes): File contents to extract from instead of reading file_path
+
+    Returns:
+        dict: status, resume_text, basic_info, skills, ats_score,
+        improvement_suggestions, results (API payload), timings and
+        stage_results (outputs computed by this run, for the stage cache)
+    """
+    timings = {"queue_wait": round((time.time() - enqueued_at) * 1000, 1)}
+    cached = cached or {}
+    fresh = {}
+    try:
+        document = _stage(timings, cached, fresh, "extract", analyze_resume_document, file_path, data)
+        resume_text = document["text"]
+        if resume_text.startswith("Error"):
+            # Extraction failures are reported as text; do not pin them in the cache
+            fresh.pop("extract", None)
+        basic_info = _stage(timings, cached, fresh, "basic_info", extract_basic_info, resume_text)
+
+        if mode == MODE_BASIC:
+            # Sections and entities for the result pages are computed here, not on every view
+            artifact = _stage(timings, cached, fresh, "artifact", build_artifact, resume_text, document["lines"],
+                              basic_info, basic_info.get("skills", []))
+            return {
+                "status": "done",
+                "resume_text": resume_text,
+                "basic_info": basic_info,
+                "skills": basic_info.get("skills", []),
+                "artifact": artifact,
+                "timings": timings,
+                "stage_results": fresh
+            }
+
+        skills = _stage(timings, cached, fresh, "skills", extract_skills, resume_text)
+        sections = _stage(timings, cached, fresh, "sections", preprocess_and_segment, resume_text, document["lines"])
+        entities = _stage(timings, cached, fresh, "ner", extract_entities, resume_text)
+        artifact = _stage(timings, cached, fresh, "artifact", build_artifact, resume_text, document["lines"],
+                          basic_info, skills, sections, entities)
+
+        analyze = _enhanced_analysis if mode == MODE_ENHANCED else _standard_analysis
+        analysis = _stage(timings, cached, fresh, f"analysis_{mode}", analyze, resume_text, skills, timings)
+
+        # Build the payload on copies so the cached analysis stays as computed
+        outcome = dict(analysis)
+        outcome["results"] = dict(analysis["results"], success=True, text=resume_text,
+                                  skills=skills, sections=sections, entities=entities)
+        outcome.update({
+            "status": "done",
+            "resume_text": resume_text,
+            "basic_info": basic_info,
+            "skills": skills,
+            "artifact": artifact,
+            "timings": timings,
+            "stage_results": fresh
+        })
+        return outcome
+
+    except Exception as e:
+        logger.error(f"Error processing resume {file_path}: {str(e)}")
+        return {"status": "failed", "error": f"Error processing resume: {str(e)}", "timings": timings}
+
+
+def _standard_analysis(resume_text, skills, timings):
+    """ATS scoring + advanced analyzer (the /api/upload payload)"""
+    start = time.perf_counter()
+    try:
+        # Get job descriptions for scoring
+        job_df = _candidate_jobs(resume_text, skills)
+
+        # Find top matching jobs using our ATS scoring and TF-IDF
+        job_matches = find_matching_jobs(resume_text, job_df, skills=skills, top_n=5)
+        job_descriptions = [match[2] for match in job_matches]
+        logger.info(f"Top 5 matched jobs based on ATS scoring and TF-IDF: {[match[0] for match in job_matches]}")
+
+        # Role-specific ATS scores using the original unmodified algorithm
+        role_ats_scores = calculate_role_specific_ats_scores(skills, job_matches)
+
+        if job_matches:
+            # Get the primary ATS score from the first match
+            primary_ats_details = job_matches[0][3]
+            ats_score = primary_ats_details.get('score', 65)
+            matched_keywords = primary_ats_details.get('matched_keywords', [])
+
+            # Find job description keywords missing from the resume
+            missing_keywords = []
+            job_doc = re.findall(r'\b[A-Za-z][A-Za-z0-9\+\#\.]+\b', job_descriptions[0].lower())
+            for token in [token for token in job_doc if len(token) > 3]:
+                if token not in matched_keywords and token not in missing_keywords:
+                    missing_keywords.append(token)
+            missing_keywords = missing_keywords[:5]
+
+            improvement_suggestions = [
+                f"Add these missing keywords to improve your ATS score: {', '.join(missing_keywords)}" if missing_keywords else "Your resume contains many keywords from the job description.",
+                "Use more action verbs and quantifiable achievements in your experience section.",
+                "Ensure your resume format is ATS-friendly with standard section headings."
+            ]
+        else:
+            logger.warning("No job matches available for ATS scoring")
+            ats_score = 65  # Default score
+            improvement_suggestions = [
+                "Add more specific skills relevant to your target role.",
+                "Include quantifiable achievements in your experience section.",
+                "Ensure your contact information is clearly visible."
+            ]
+            role_ats_scores = {}
+
+        # Use advanced analyzer for job matching to get additional data
+        advanced_results = advanced_analyze_resume(resume_text, skills)
+        advanced_results['ats_score'] = ats_score
+        advanced_results['role_ats_scores'] = role_ats_scores
+        advanced_results['job_type_recs'] = suggest_job_types(skills)
+        if 'improvement_suggestions' in advanced_results:
+            advanced_results['improvement_suggestions'] = improvement_suggestions
+
+    except Exception as e:
+        logger.error(f"Error using new ATS scorer: {str(e)}")
+        logger.info("Falling back to standard advanced analyzer")
+        advanced_results = advanced_analyze_resume(resume_text, skills)
+        if 'role_ats_scores' not in advanced_results:
+            advanced_results['role_ats_scores'] = {}
+    timings["scoring"] = round((time.perf_counter() - start) * 1000, 1)
+
+    # Format job recommendations for display
+    job_recommendations = [
+        (match['title'], match['score'] / 100)
+        for match in advanced_results['job_matches'][:5]
+    ]
+
+    return {
+        "ats_score": advanced_results['ats_score'],
+        "improvement_suggestions": "\n".join(advanced_results['improvement_suggestions']),
+        "results": {
+            'ats_score': advanced_results['ats_score'],
+            'top_job': advanced_results['top_job'],
+            'improvement_suggestions': advanced_results['improvement_suggestions'],
+            'job_recommendations': job_recommendations
+        }
+    }
+
+
+def _enhanced_analysis(resume_text, skills, timings):
+    """MAANG ATS scoring + OpenAI analysis (the /api/enhanced-upload payload)"""
+    from utils.maang_ats_scorer import calculate_resume_ats_score
+
+    start = time.perf_counter()
+    ats_score = None
+    score_breakdown = {}
+    catalog = get_title_catalog()
+    job_titles = list(catalog.titles[:5])
+    job_descriptions = list(catalog.descriptions[:5])
+
+    try:
+        if job_descriptions:
+            maang_result = calculate_resume_ats_score(resume_text, job_descriptions[0], skills)
+            ats_score = maang_result['ats_score']
+            score_breakdown = {
+                'skills_score': maang_result.get('skill_score', 0),
+                'experience_score': maang_result.get('experience_score', 0),
+                'education_score': maang_result.get('education_score', 0),
+                'skills_percentage': maang_result.get('skill_percentage', 0),
+                'experience_percentage': maang_result.get('experience_percentage', 0),
+                'education_percentage': maang_result.get('education_percentage', 0)
+            }
+            logger.info(f"[ENHANCED] MAANG ATS Score: {ats_score}")
+    except Exception as e:
+        logger.error(f"[ENHANCED] Error using MAANG ATS scorer: {str(e)}")
+    timings["scoring"] = round((time.perf_counter() - start) * 1000, 1)
+
+    job_description = job_descriptions[0] if job_descriptions else ""
+
+    # Fall back to the keyword-based scorer if MAANG scoring failed
+    if ats_score is None:
+        ats_score = advanced_ats_score(resume_text, job_titles[0] if job_titles else "Software Engineer", skills)
+
+    openai_analysis = _timed(timings, "llm", analyze_resume_strengths_weaknesses, resume_text, job_description)
+
+    try:
+        job_matches = _timed(timings, "matching", find_matching_jobs, resume_text,
+                             _candidate_jobs(resume_text, skills), skills=skills, top_n=5)
+    except Exception as e:
+        logger.error(f"[ENHANCED] Error matching jobs: {str(e)}")
+        job_matches = []
+
+    # Format improvement suggestions for storage
+    if isinstance(openai_analysis.get('suggestions', []), list):
+        improvement_text = "\n".join(openai_analysis.get('suggestions', []))
+    else:
+        improvement_text = str(openai_analysis.get('suggestions', ""))
+
+    return {
+        "ats_score": ats_score,
+        "improvement_suggestions": improvement_text,
+        "results": {
+            'ats_score': ats_score,
+            'analysis': openai_analysis,
+            'top_job': job_matches[0][0] if job_matches else "Unknown",
+            'job_recommendations': job_matches,
+            'score_breakdown': score_breakdown
+        }
+    }
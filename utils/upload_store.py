@@ -0,0 +1,203 @@
+"""
+Content-addressed store for uploaded resumes
+
+Uploads are saved once per distinct content, as
+uploads/<first two hex digits>/<sha256><ext>, and recorded in StoredUpload.
+Small uploads are hashed in memory and handed to the pipeline as bytes, so
+they are never read back from disk; larger ones are spooled to a temporary
+file in the store and moved into place.
+
+The upload pipeline's stage outputs (extracted text, basic info, skills,
+sections, entities and the per-mode analysis) are kept in UploadStageResult
+against the same hash. A byte-identical re-upload therefore reuses the
+stored file and every stage already computed for it; when all stages its
+mode needs are cached, the route fills in the Candidate/ResumeAnalysis rows
+without queueing a job.
+
+Bump STAGE_CACHE_VERSION when a stage's output format or algorithm changes,
+so older cached results are ignored.
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from dataclasses import dataclass
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, StoredUpload, UploadStageResult
+
+logger = logging.getLogger(__name__)
+
+STAGE_CACHE_VERSION = 3
+CHUNK_SIZE = 64 * 1024
+# Uploads up to this size are processed from memory rather than read back from disk
+IN_MEMORY_MAX_BYTES = int(os.environ.get("UPLOAD_IN_MEMORY_MAX_BYTES", str(2 * 1024 * 1024)))
+# Temporary files in the store start with this; the sweeper removes stale ones
+SPOOL_PREFIX = ".upload-"
+
+
+def blob_path(upload_folder, sha256, ext):
+    """Where the upload with this hash is stored"""
+    return os.path.join(upload_folder, sha256[:2], f"{sha256}{ext}")
+
+
+@dataclass
+class BufferedUpload:
+    """An upload read from the request, hashed, not yet in the store"""
+    sha256: str
+    size: int
+    ext: str
+    data: bytes = None  # the whole file, when it fit in memory
+    spool_path: str = None  # temporary file inside the store, otherwise
+    path: str = None  # location in the store, once stored
+
+
+def buffer_upload(file, upload_folder, filename, memory_limit=IN_MEMORY_MAX_BYTES):
+    """
+    Read and hash an upload, in memory if it is at most memory_limit bytes
+
+    Larger files are spooled to a temporary file inside the store so that
+    storing them is a rename. Call discard_upload() when done.
+
+    Args:
+        file: werkzeug FileStorage (or any object with a binary .stream)
+        upload_folder (str): Root of the upload store
+        filename (str): Sanitized original filename, for the extension
+        memory_limit (int): Largest file kept in memory
+
+    Returns:
+        BufferedUpload
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    spool = None
+    spool_path = None
+    try:
+        for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+            if spool is None and size > memory_limit:
+                fd, spool_path = tempfile.mkstemp(dir=upload_folder, prefix=SPOOL_PREFIX)
+                spool = os.fdopen(fd, "wb")
+                spool.writelines(chunks)
+                chunks = None
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                chunks.append(chunk)
+    except Exception:
+        if spool_path:
+            spool.close()
+            os.remove(spool_path)
+        raise
+    if spool is not None:
+        spool.close()
+
+    return BufferedUpload(
+        sha256=digest.hexdigest(),
+        size=size,
+        ext=os.path.splitext(filename)[1].lower(),
+        data=b"".join(chunks) if chunks is not None else None,
+        spool_path=spool_path
+    )
+
+
+def discard_upload(upload):
+    """Remove an upload's spool file, if it still has one"""
+    if upload.spool_path and os.path.exists(upload.spool_path):
+        os.remove(upload.spool_path)
+    upload.spool_path = None
+
+
+def find_stored(sha256):
+    """The StoredUpload for this content if its file is still on disk, else None"""
+    stored = StoredUpload.query.filter_by(sha256=sha256).first()
+    return stored if stored and os.path.exists(stored.path) else None
+
+
+def store_upload(upload, upload_folder):
+    """
+    Put a buffered upload into the store, unless that content is already there
+
+    Args:
+        upload (BufferedUpload): From buffer_upload(); its path is set
+        upload_folder (str): Root of the upload store
+
+    Returns:
+        bool: True if the file was written, False for a re-upload of stored content
+    """
+    stored = StoredUpload.query.filter_by(sha256=upload.sha256).first()
+    if stored and os.path.exists(stored.path):
+        stored.last_seen_at = datetime.utcnow()
+        db.session.commit()
+        upload.path = stored.path
+        return False
+
+    path = blob_path(upload_folder, upload.sha256, upload.ext)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if upload.spool_path:
+        os.replace(upload.spool_path, path)
+        upload.spool_path = None
+    else:
+        # Write under a temporary name so a crash never leaves a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=upload_folder, prefix=SPOOL_PREFIX)
+        with os.fdopen(fd, "wb") as out:
+            out.write(upload.data)
+        os.replace(tmp_path, path)
+    upload.path = path
+
+    if stored:
+        # Row outlived its file; point it at the fresh copy
+        stored.path = path
+        stored.size = upload.size
+        stored.last_seen_at = datetime.utcnow()
+    else:
+        db.session.add(StoredUpload(sha256=upload.sha256, path=path, size=upload.size))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker stored the same content concurrently; the file is identical
+        db.session.rollback()
+    return True
+
+
+def load_stage_results(sha256):
+    """
+    Cached pipeline stage outputs for an upload
+
+    Returns:
+        dict: stage name -> output, for stages computed with the current STAGE_CACHE_VERSION
+    """
+    rows = UploadStageResult.query.filter_by(sha256=sha256, version=STAGE_CACHE_VERSION).all()
+    results = {}
+    for row in rows:
+        try:
+            results[row.stage] = json.loads(row.result)
+        except ValueError:
+            logger.warning(f"Discarding unreadable cached {row.stage} result for upload {sha256[:12]}")
+    return results
+
+
+def save_stage_results(sha256, results):
+    """
+    Store freshly computed stage outputs for an upload (caller commits)
+
+    Args:
+        sha256 (str): Upload content hash
+        results (dict): stage name -> JSON-serializable output
+    """
+    if not results:
+        return
+    existing = {row.stage: row for row in UploadStageResult.query.filter_by(sha256=sha256).all()}
+    for stage, value in results.items():
+        row = existing.get(stage)
+        if row is None:
+            row = UploadStageResult(sha256=sha256, stage=stage)
+            db.session.add(row)
+        row.version = STAGE_CACHE_VERSION
+        row.result = json.dumps(value, default=str)
+        row.created_at = datetime.utcnow()